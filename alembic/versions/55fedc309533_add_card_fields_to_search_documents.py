@@ -0,0 +1,57 @@
+"""Add card fields to search_documents view
+
+Revision ID: 55fedc309533
+Revises: 6cdfeaceede5
+Create Date: 2026-10-17 01:12:40.518337
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '55fedc309533'
+down_revision: Union[str, Sequence[str], None] = '6cdfeaceede5'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _create_view(card_columns: str) -> None:
+    op.execute(f"""
+        CREATE MATERIALIZED VIEW search_documents AS
+        SELECT
+            r.dish_id || '_' || r.id AS doc_id,
+            d.id AS dish_id,
+            d.name AS dish_name,
+            d.semantic_description AS description,
+            r.id AS recipe_id,
+            r.title AS recipe_title,
+            r.name AS recipe_name,{card_columns}
+            array_remove(array_agg(i.name ORDER BY i.id), NULL) AS ingredients
+        FROM recipes AS r
+        JOIN dishes AS d ON d.id = r.dish_id
+        LEFT JOIN recipe_ingredients AS ri ON ri.recipe_id = r.id
+        LEFT JOIN ingredients AS i ON i.id = ri.ingredient_id
+        WHERE r.duplicate_of_id IS NULL
+        GROUP BY r.id, d.id
+    """)
+    op.create_index('ux_search_documents_recipe_id', 'search_documents', ['recipe_id'], unique=True)
+    op.create_index('ix_search_documents_dish_id', 'search_documents', ['dish_id'], unique=False)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # materialized view 에는 컬럼을 추가할 수 없어 카드 표시용 컬럼을 넣어 다시 만듭니다.
+    op.execute("DROP MATERIALIZED VIEW IF EXISTS search_documents")
+    _create_view("""
+            r.thumbnail_url,
+            r.cooking_time,
+            r.difficulty,""")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP MATERIALIZED VIEW IF EXISTS search_documents")
+    _create_view("")
@@ -0,0 +1,49 @@
+"""Add search_documents materialized view
+
+Revision ID: c41e7b2d9a10
+Revises: fa7deaa1c070
+Create Date: 2026-10-16 23:40:12.318204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c41e7b2d9a10'
+down_revision: Union[str, Sequence[str], None] = 'fa7deaa1c070'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # ES 문서({dish_id}_{recipe_id}) 한 건 = 한 행. 재료 이름은 미리 array_agg 로 모아둡니다.
+    op.execute("""
+        CREATE MATERIALIZED VIEW search_documents AS
+        SELECT
+            r.dish_id || '_' || r.id AS doc_id,
+            d.id AS dish_id,
+            d.name AS dish_name,
+            d.semantic_description AS description,
+            r.id AS recipe_id,
+            r.title AS recipe_title,
+            r.name AS recipe_name,
+            array_remove(array_agg(i.name ORDER BY i.id), NULL) AS ingredients
+        FROM recipes AS r
+        JOIN dishes AS d ON d.id = r.dish_id
+        LEFT JOIN recipe_ingredients AS ri ON ri.recipe_id = r.id
+        LEFT JOIN ingredients AS i ON i.id = ri.ingredient_id
+        WHERE r.duplicate_of_id IS NULL
+        GROUP BY r.id, d.id
+    """)
+    # REFRESH ... CONCURRENTLY 에는 unique 인덱스가 필요합니다 (keyset 페이지 조회에도 사용).
+    op.create_index('ux_search_documents_recipe_id', 'search_documents', ['recipe_id'], unique=True)
+    op.create_index('ix_search_documents_dish_id', 'search_documents', ['dish_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP MATERIALIZED VIEW IF EXISTS search_documents")
@@ -1,17 +1,22 @@
-from fastapi import APIRouter, Depends, BackgroundTasks
+from fastapi import APIRouter, Depends, BackgroundTasks, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 from typing import List, Optional
 import asyncio
 import models
-from schemas.dish import Dish, DishCreate, Recipe, RecipeCreate, SearchRequest, GroupedSearchResponse
+from schemas.dish import (
+    Dish, DishCreate, Recipe, RecipeCreate, SearchRequest, GroupedSearchResponse,
+    RecipeSummary, HydratedSearchRequest, HydratedSearchResponse,
+)
 from repositories.dishes import DishRepository
 from database import get_db
 from auth.dependencies import get_current_user, is_admin
 import json
 # 검색 관련
-from search_client import get_es_client, DISHES_INDEX_NAME
-from repositories.search import SearchRepository
-from elasticsearch import AsyncElasticsearch
+from search_client import get_es_client, DISHES_INDEX_NAME, validate_synonym_file
+from search_cache import bump_generation, normalize_search_request, get_cached_result, store_result, cache_stats
+from repositories.search import SearchRepository, is_missing_pit
+from elasticsearch import AsyncElasticsearch, NotFoundError
 
 router = APIRouter(tags=["Dishes"])
 
@@ -56,22 +61,129 @@ async def search_grouped_dishes(
     """
     **통합 검색 API (로그인 필수)**
     - Request Body로 받은 `ingredients` 목록을 사용하여 요리를 검색합니다.
+    - 같은 요청(재료 순서/중복 무관)의 결과는 Redis 에 TTL 동안 캐시합니다.
+    - 더 보기: 첫 요청에 `paginate: true` → 응답의 `next_cursor` 를 같은 조건과 함께 `cursor` 로 보내면 다음 페이지
+      (point-in-time 기준이라 그 사이 색인이 바뀌어도 페이지가 겹치거나 빠지지 않음. 만료되면 410)
     """
     # Body에 재료가 없으면(필수 필드이므로 그럴 일은 없지만) 빈 결과를 반환
     if not search_request.ingredients:
         return {"total": 0, "results": []}
 
+    return await _grouped_search(search_request, search_repo)
+
+async def _grouped_search(search_request: SearchRequest, search_repo: SearchRepository) -> dict:
+    # 캐시 키와 실제 검색이 같은 값을 보도록 정규화한 요청으로 검색
+    normalized = normalize_search_request(search_request)
+    paged = search_request.paginate or bool(search_request.cursor)
+    cache_key, cached = await get_cached_result(normalized) if not paged else (None, None)
+    if cached is not None:
+        return cached
+
     # 앱이 보내준 재료 목록을 사용하여 Elasticsearch 검색 수행
-    res = await search_repo.search_grouped_dishes(
-        query=search_request.q,
-        user_ingredients=search_request.ingredients,
-        size=search_request.size,
-        topk_per_dish=search_request.topk,
-        ing_mode=search_request.ing_mode,
-        ing_ratio=search_request.ing_ratio
-    )
+    try:
+        res = await search_repo.search_grouped_dishes(
+            query=normalized["q"],
+            user_ingredients=normalized["ingredients"],
+            size=normalized["size"],
+            topk_per_dish=normalized["topk"],
+            ing_mode=normalized["ing_mode"],
+            ing_ratio=normalized["ing_ratio"],
+            cursor=search_request.cursor,
+            paginate=search_request.paginate
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except NotFoundError as e:
+        if search_request.cursor and is_missing_pit(e):
+            # 커서의 point-in-time 이 만료됨 → 첫 페이지부터 다시
+            raise HTTPException(status_code=status.HTTP_410_GONE, detail="커서가 만료되었습니다. 처음부터 다시 검색해 주세요.")
+        # 인덱스/별칭이 없음 (재색인·복원 중 등) → 잠시 뒤 다시 시도
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="검색 인덱스를 사용할 수 없습니다. 잠시 후 다시 시도해 주세요.")
+    await store_result(cache_key, res)
     return res
 
+# === 사용자용: 검색 + 카드에 들어갈 레시피까지 한 번에 ===
+@router.post("/search/hydrated", response_model=HydratedSearchResponse, tags=["Dishes"])
+async def search_hydrated_dishes(
+    search_request: HydratedSearchRequest,
+    search_repo: SearchRepository = Depends(get_search_repo),
+    repo: DishRepository = Depends(get_repo),
+    current_user: models.User = Depends(get_current_user)
+):
+    """
+    **검색 + 레시피 상세 (로그인 필수)**
+    - /search/grouped 와 같은 검색(캐시 포함) 뒤, 모든 카드의 recipe_ids 를 SQL 한 번으로 순서대로 읽어 카드에 넣습니다.
+    - `detail`: `summary`(제목/썸네일/시간/난이도, 재료 조인 없음) 또는 `full`(/recipes/by-ids 와 같은 상세)
+    - 인덱스에 카드 표시 필드가 있으면(ES_CARD_FIELDS) summary 는 DB를 읽지 않습니다.
+    """
+    if not search_request.ingredients:
+        return {"total": 0, "results": []}
+
+    res = await _grouped_search(search_request, search_repo)
+    by_id = _summaries_from_cards(res) if search_request.detail == "summary" else None
+    if by_id is None:
+        recipe_ids = [rid for card in res["results"] for rid in card["recipe_ids"]]
+        recipes = await run_in_threadpool(repo.get_recipes_by_ids_ordered, recipe_ids, search_request.detail)
+        schema = Recipe if search_request.detail == "full" else RecipeSummary
+        by_id = {recipe.id: schema.model_validate(recipe) for recipe in recipes}
+    return {
+        "total": res["total"],
+        "results": [
+            {
+                "dish_id": card["dish_id"],
+                "dish_name": card["dish_name"],
+                "recipes": [by_id[rid] for rid in card["recipe_ids"] if rid in by_id],
+            }
+            for card in res["results"]
+        ],
+        "next_cursor": res.get("next_cursor"),
+    }
+
+# 카드 항목에 있어야 DB 없이 RecipeSummary 를 만들 수 있는 필드 (id 는 recipe_id 로 채움)
+SUMMARY_CARD_FIELDS = frozenset(RecipeSummary.model_fields) - {"id"}
+
+def _summaries_from_cards(res: dict) -> Optional[dict]:
+    """
+    카드 표시 필드(ES_CARD_FIELDS)가 색인돼 있으면 요약은 ES 결과만으로 충분 (DB 조회 없음).
+    카드가 없는 옛 인덱스/캐시 결과이거나, recipe_ids 중 하나라도 필드를 갖춘 카드 항목이 없으면 None (DB 에서 읽음).
+    """
+    items = {}
+    for card in res["results"]:
+        for item in card.get("recipes") or []:
+            if isinstance(item, dict) and SUMMARY_CARD_FIELDS <= item.keys():
+                items[item.get("recipe_id")] = item
+    if any(rid not in items for card in res["results"] for rid in card["recipe_ids"]):
+        return None
+    return {rid: RecipeSummary(id=rid, **{k: items[rid][k] for k in SUMMARY_CARD_FIELDS}) for rid in items}
+
+@router.get("/search/cache-stats", tags=["Dishes"])
+async def get_search_cache_stats(admin_user: models.User = Depends(is_admin)):
+    """검색 결과 캐시 hit/miss 누적 수, 현재 세대, TTL (관리자). Redis 장애 시 값은 null 이고 error 가 붙습니다."""
+    return await cache_stats()
+
+# === 관리자용: 동의어 핫 리로드 (재색인 없음) ===
+@router.post("/admin/reload-synonyms", tags=["Dishes"])
+async def reload_synonyms(
+    search_repo: SearchRepository = Depends(get_search_repo),
+    admin_user: models.User = Depends(is_admin)
+):
+    """
+    동의어 파일을 검사한 뒤 라이브 인덱스의 검색 분석기를 다시 읽히고, 검색 결과 캐시 세대를 올립니다.
+    - 잘못된 줄이 있으면 리로드하지 않고 422 로 줄 목록을 돌려줍니다.
+    - 사용자 사전(nori 토크나이저) 변경은 `es reindex` 가 필요합니다.
+    - Redis 장애로 세대를 못 올리면 리로드는 성공으로 두고 generation 이 null 입니다 (캐시는 TTL 뒤 만료).
+    """
+    rules, errors = validate_synonym_file()
+    if errors:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail={"message": "동의어 파일에 잘못된 줄이 있습니다.", "errors": errors[:50]},
+        )
+    result = await search_repo.reload_search_analyzers()
+    if result["shards_failed"]:
+        raise HTTPException(status_code=status.HTTP_502_BAD_GATEWAY, detail=result)
+    return {"rules": rules, **result, "generation": await bump_generation()}
+
 # (참고) 프런트가 dish 카드를 클릭했을 때, res.results[*].recipe_ids[] 를
 # 그대로 다른 API(예: POST /api/v1/recipes/by-ids)에 넘기고,
 # 서버는 UNNEST WITH ORDINALITY로 순서 보존 SELECT 하여 상세를 응답하면 된다.
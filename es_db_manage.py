@@ -2,37 +2,95 @@
 import sys
 import os
 import json
-import csv
+import time
 import asyncio
+import itertools
+import random
+import statistics
+from datetime import datetime, timedelta
 from abc import ABC, abstractmethod
 from sqlalchemy.orm import Session
-from sqlalchemy import text
+from sqlalchemy import func, select, text
 from elasticsearch import AsyncElasticsearch
 
 # --- 프로젝트 모듈 임포트 ---
 from database import SessionLocal
 import models
 from repositories.dishes import DishRepository
+from repositories.ingredients import IngredientRepository
 from repositories.search import SearchRepository
-from search_client import create_dishes_index, DISHES_INDEX_NAME, get_es_client, lifespan as es_lifespan
+from repositories.outbox import OutboxRepository
+from repositories.search_documents import SearchDocumentRepository
+from search_client import (
+    create_dishes_index, create_versioned_index, dish_index_versions, alias_targets,
+    swap_dishes_alias, prune_dish_indices, bulk_load_settings, DISHES_INDEX_NAME, get_es_client, lifespan as es_lifespan,
+    snapshot_dishes_index, restore_dishes_snapshot, list_dish_snapshots, SNAPSHOT_REPOSITORY,
+    dishes_index_body, INDEX_PROFILES, INDEX_LAYOUT, INDEX_LAYOUTS,
+    validate_synonym_file, SYNONYM_FILE_PATH, USERDICT_FILE_PATH, INGREDIENT_SYNONYM_FILE_PATH, INGREDIENT_ALIAS_FILE_PATH,
+)
+from importer.parsing import iter_recipe_rows
+from importer.normalize import IngredientNormalizer
+from importer.bulk import BulkRecipeWriter, upsert_dishes, upsert_ingredients
+from importer.pipeline import iter_parsed_rows
+from importer.manifest import ImportManifestStore
+from importer.checkpoint import ImportCheckpointStore
+from importer.synthetic import generate_catalog
+from importer.dedup import apply_near_duplicates
+from importer.hierarchy import IngredientHierarchy
+from utils.profiling import PipelineProfiler
+from search_cache import bump_generation
 
 # --------------------------------------------------------------------------
 # ⚙️ 설정 (Configuration)
 # --------------------------------------------------------------------------
-BASE_DATA_PATH = "/data"
+BASE_DATA_PATH = os.getenv("FRIDGE_DATA_PATH", "/data")  # 합성 데이터셋 등 다른 위치를 읽으려면 환경변수로 지정
 RECIPE_DIR_PATH = os.path.join(BASE_DATA_PATH, "레시피 모음")
 DESCRIPTION_DIR_PATH = os.path.join(BASE_DATA_PATH, "요리 설명")
 INGREDIENTS_FILE_PATH = os.path.join(BASE_DATA_PATH, "재료/ingredients.json")
+CHANGES_FILE_PATH = os.path.join(BASE_DATA_PATH, "import_changes.json")  # 증분 임포트 → ES 부분 동기화 대상 id
+BULK_BATCH_SIZE = 1000  # --bulk 모드에서 한 트랜잭션에 쓰는 레시피 행 수
+UPSERT_CHUNK_SIZE = 1000  # 마스터 재료/요리 설명 upsert 한 문장당 행 수
+PARSE_QUEUE_SIZE = 64   # 파싱 워커 → DB writer 사이 큐에 쌓아둘 최대 청크 수 (청크당 500행)
+DEDUP_THRESHOLD = 0.8  # --dedup: 추정 Jaccard 유사도가 이 이상이면 같은 레시피로 봄
+REINDEX_PAGE_SIZE = 1000  # 재색인 시 DB keyset 페이지 크기 (레시피 수)
+ES_BULK_CHUNK_SIZE = 2000  # 재색인 bulk 요청 하나에 담는 최대 문서 수
+ES_BULK_CHUNK_MB = 5  # 재색인 bulk 요청 하나의 최대 크기 (MB)
+ES_BULK_CONCURRENCY = 4  # 재색인 시 동시에 보내는 bulk 요청 수
+ES_KEEP_VERSIONS = 3  # 재색인 후 남겨둘 dishes_vN 인덱스 수 (현재 버전 포함, 롤백용)
+OUTBOX_BATCH_SIZE = 500  # outbox_worker 가 한 번에 가져오는 이벤트 수
+OUTBOX_POLL_SECONDS = 1.0  # outbox 가 비었을 때 다시 확인하기까지 대기 시간
+OUTBOX_RETENTION_DAYS = 3  # 처리된 이벤트 보관 기간 (재색인 중 이벤트 재반영에 사용)
+OUTBOX_REPLAY_MARGIN = timedelta(minutes=1)  # 재색인 시작 직전에 열린 트랜잭션의 이벤트까지 다시 반영
+SEARCH_DOCS_EXPORT_PATH = os.path.join(BASE_DATA_PATH, "search_documents")  # export_search_docs 기본 경로 (확장자는 형식에 따라)
+PROFILE_DIR_PATH = os.path.join(BASE_DATA_PATH, "profiles")  # --profile 리포트 기본 저장 위치
+BENCH_QUERIES = 200  # benchmark_*: 비교 대상마다 재는 검색 수 (워밍업 제외)
+BENCH_WARMUP = 20  # benchmark_*: 측정 전에 버리는 검색 수
+# 재료 이름 정규화 사전: 재료 동의어(search_client.INGREDIENT_SYNONYM_FILE_PATH) + ES 분석기와 같은 사용자 사전
+# 요리 이름 동의어(SYNONYM_FILE_PATH)는 --dish-synonyms 를 줄 때만 재료 별칭으로 씀
+# 별칭 테이블 {"대표 이름": ["별칭", ...]}, 없으면 생략. API 도 같은 파일로 검색/냉장고 재료를 바꿈 (FRIDGE_DATA_PATH 기준)
+ALIAS_FILE_PATH = INGREDIENT_ALIAS_FILE_PATH
+HIERARCHY_FILE_PATH = os.path.join(BASE_DATA_PATH, "재료/hierarchy.json")  # {"부모 재료": ["자식 재료", ...]}, 없으면 category 만 사용
+
+def _report_throughput(label: str, rows: int, started: float):
+    elapsed = max(time.perf_counter() - started, 1e-9)
+    print(f"  ⏱️ {label}: {rows}행 / {elapsed:.1f}초 ({rows / elapsed:,.0f} rows/sec)")
 
 # --------------------------------------------------------------------------
 # 🏛️ 베이스 관리자 클래스
 # --------------------------------------------------------------------------
 class BaseManager(ABC):
     """DB 연결 등 공통 로직을 처리하는 기본 클래스"""
-    def __init__(self):
+    def __init__(self, options: dict = None):
         self.db: Session = SessionLocal()
+        self.options = options or {}
+        # --profile 이면 단계별 시간/행 수/DB 왕복/읽은 바이트를 모아 종료 시 JSON으로 남김
+        self.profiler = PipelineProfiler(self.db.get_bind(), enabled=bool(self.options.get("profile")))
         print(f"[{self.__class__.__name__}] 데이터베이스 연결을 시작합니다.")
 
+    def _int_option(self, name: str, default: int) -> int:
+        value = self.options.get(name)
+        return int(value) if value not in (None, True) else default
+
     @abstractmethod
     async def run(self, command: str):
         pass
@@ -41,6 +99,9 @@ class BaseManager(ABC):
         return self
 
     async def __aexit__(self, exc_type, exc_val, exc_tb):
+        report_path = self.profiler.write(self.options.get("profile-out"), directory=PROFILE_DIR_PATH)
+        if report_path:
+            print(f"📊 프로파일 리포트를 저장했습니다: {report_path}")
         print(f"[{self.__class__.__name__}] 데이터베이스 연결을 닫습니다.")
         self.db.close()
 
@@ -49,12 +110,23 @@ class BaseManager(ABC):
 # --------------------------------------------------------------------------
 class DBManager(BaseManager):
     """데이터베이스 데이터 리셋 및 임포트를 담당합니다."""
+    def __init__(self, options: dict = None):
+        super().__init__(options)
+        # 임포트한 원본 파일/행의 내용 해시 (증분 임포트가 바뀐 것만 다시 쓰도록)
+        self.manifest = ImportManifestStore(self.db, BASE_DATA_PATH)
+        # 원본 재료 문자열 → 대표 재료 이름 (별칭 테이블 > 재료 동의어 사전 > 사용자 사전 복합어)
+        synonym_paths = [INGREDIENT_SYNONYM_FILE_PATH]
+        if self.options.get("dish-synonyms"):
+            synonym_paths.append(SYNONYM_FILE_PATH)
+        self.normalizer = IngredientNormalizer.from_files(
+            synonym_paths, USERDICT_FILE_PATH, self.options.get("aliases") or ALIAS_FILE_PATH
+        )
 
     async def _reset_data(self):
         print("--- 모든 데이터 삭제 및 ID 시퀀스 초기화를 시작합니다 (User 정보는 유지) ---")
         try:
             self.db.execute(text("""
-                TRUNCATE TABLE recipe_ingredients, user_ingredients, recipes, dishes, ingredients
+                TRUNCATE TABLE import_manifest, import_checkpoints, search_outbox, recipe_ingredients, user_ingredients, recipes, dishes, ingredients
                 RESTART IDENTITY CASCADE;
             """))
             self.db.commit()
@@ -63,26 +135,38 @@ class DBManager(BaseManager):
             print(f"❌ 데이터 리셋 중 오류 발생: {e}")
             self.db.rollback()
 
-    async def _import_dishes(self):
-        print("--- '요리 설명' 데이터 임포트를 시작합니다 ---")
-        descriptions = {}
+    def _description_files(self):
         try:
-            for filename in os.listdir(DESCRIPTION_DIR_PATH):
-                if filename.endswith(".json"):
-                    with open(os.path.join(DESCRIPTION_DIR_PATH, filename), "r", encoding="utf-8") as f:
-                        descriptions.update(json.load(f))
+            filenames = sorted(os.listdir(DESCRIPTION_DIR_PATH))
         except FileNotFoundError:
             print(f"⚠️ '요리 설명' 폴더를 찾을 수 없습니다: {DESCRIPTION_DIR_PATH}")
-            return
+            return None
+        return [os.path.join(DESCRIPTION_DIR_PATH, name) for name in filenames if name.endswith(".json")]
+
+    async def _import_dishes(self, paths: list = None) -> list:
+        """'요리 설명' JSON을 배치 upsert로 반영하고, 설명이 바뀐 기존 Dish의 id 목록을 반환합니다."""
+        print("--- '요리 설명' 데이터 임포트를 시작합니다 ---")
+        if paths is None:
+            paths = self._description_files()
+            if paths is None:
+                return []
+
+        descriptions = {}
+        for path in paths:
+            with open(path, "r", encoding="utf-8") as f:
+                descriptions.update(json.load(f))
+        self.profiler.add("dishes", rows=len(descriptions), files=paths)
             
-        new_count = 0
-        for dish_name, description in descriptions.items():
-            db_dish = self.db.query(models.Dish).filter(models.Dish.name == dish_name).first()
-            if not db_dish:
-                self.db.add(models.Dish(name=dish_name, semantic_description=description))
-                new_count += 1
+        started = time.perf_counter()
+        inserted_ids, updated_ids = upsert_dishes(
+            self.db, descriptions, chunk_size=self._int_option("chunk-size", UPSERT_CHUNK_SIZE)
+        )
+        for path in paths:
+            self.manifest.mark_file(path)
         self.db.commit()
-        print(f"✅ {new_count}개의 새로운 Dish를 추가했습니다.")
+        print(f"✅ {len(inserted_ids)}개의 새로운 Dish를 추가하고, {len(updated_ids)}개의 설명을 갱신했습니다.")
+        _report_throughput("요리 설명 upsert", len(descriptions), started)
+        return updated_ids
 
     async def _import_ingredients(self):
         print("--- '마스터 재료' 데이터 임포트를 시작합니다 ---")
@@ -93,17 +177,28 @@ class DBManager(BaseManager):
             print(f"❌ 파일을 찾을 수 없습니다: {INGREDIENTS_FILE_PATH}")
             return
         
-        count = 0
-        for ing_data in ingredients_data:
-            if not self.db.query(models.Ingredient).filter(models.Ingredient.name == ing_data["name"]).first():
-                self.db.add(models.Ingredient(
-                    name=ing_data["name"],
-                    category=ing_data.get("category"),
-                    storage_type=ing_data.get("storage_type")
-                ))
-                count += 1
+        self.profiler.add("ingredients", rows=len(ingredients_data), files=[INGREDIENTS_FILE_PATH])
+        # 레시피 재료와 같은 대표 이름으로 ('파' 와 '대파' 가 따로 생기지 않도록)
+        ingredients_data = [
+            {**entry, "name": self.normalizer.canonical(entry["name"]) or entry["name"]} if entry.get("name") else entry
+            for entry in ingredients_data
+        ]
+        started = time.perf_counter()
+        inserted, updated = upsert_ingredients(
+            self.db, ingredients_data, chunk_size=self._int_option("chunk-size", UPSERT_CHUNK_SIZE)
+        )
+        self.manifest.mark_file(INGREDIENTS_FILE_PATH)
         self.db.commit()
-        print(f"✅ {count}개의 새로운 재료를 DB에 추가했습니다.")
+        print(f"✅ {inserted}개의 새로운 재료를 DB에 추가하고, {updated}개의 재료 정보를 갱신했습니다.")
+        _report_throughput("마스터 재료 upsert", len(ingredients_data), started)
+
+    def _recipe_files(self):
+        try:
+            filenames = sorted(os.listdir(RECIPE_DIR_PATH))
+        except FileNotFoundError:
+            print(f"❌ '레시피 모음' 폴더를 찾을 수 없습니다: {RECIPE_DIR_PATH}")
+            return None
+        return [os.path.join(RECIPE_DIR_PATH, name) for name in filenames if name.endswith(".csv")]
 
     async def _import_recipes(self):
         print("--- '레시피' 데이터 임포트를 시작합니다 ---")
@@ -135,107 +230,339 @@ class DBManager(BaseManager):
             self.db.flush()
             return new_dish
 
-        try:
-            recipe_files = os.listdir(RECIPE_DIR_PATH)
-        except FileNotFoundError:
-            print(f"❌ '레시피 모음' 폴더를 찾을 수 없습니다: {RECIPE_DIR_PATH}")
+        recipe_files = self._recipe_files()
+        if recipe_files is None:
             return
 
-        for filename in recipe_files:
-            if not filename.endswith(".csv"): continue
-            print(f"\n--- '{filename}' 파일 처리 중 ---")
-            with open(os.path.join(RECIPE_DIR_PATH, filename), "r", encoding="utf-8") as f:
-                reader = csv.DictReader(f)
-                for row in reader:
-                    try:
-                        # ===== [수정된 부분] =====
-                        recipe_data = json.loads(row["data"])
-                        
-                        # 1. JSON 내부의 category를 우선적으로 사용
-                        dish_category = recipe_data.get("category")
-                        
-                        # 2. JSON 내부에 없으면, 외부 CSV 컬럼의 category를 차선책으로 사용
-                        if not dish_category or not dish_category.strip():
-                            dish_category = row.get("category")
-
-                        recipe_name = row.get("dish_name")
-
-                        if not dish_category or not dish_category.strip(): 
-                            print(f"  - ⚠️ 'category'가 없어 건너<binary data, 2 bytes>니다: {row}")
-                            continue
-                        if not recipe_name or not recipe_name.strip():
-                            print(f"  - ⚠️ 'dish_name'이 없어 건너<binary data, 2 bytes>니다: {row}")
-                            continue
-                        # ============================
-                        
-                        db_dish = _get_or_create_dish(dish_category)
-                        
-                        if not db_dish:
-                            print(f"  - ❌ Dish를 처리할 수 없어 레시피를 건너<binary data, 2 bytes>니다: {recipe_name}")
+        started, total_rows = time.perf_counter(), 0
+        for path in recipe_files:
+            print(f"\n--- '{os.path.basename(path)}' 파일 처리 중 ---")
+            file_ok = True
+            for parsed in iter_recipe_rows(path, normalizer=self.normalizer):
+                total_rows += 1
+                if parsed.error:
+                    print(f"  - {parsed.error}")
+                    continue
+                parsed = self.manifest.annotate(RECIPE_DIR_PATH, parsed)
+                record = parsed.record
+                try:
+                    db_dish = _get_or_create_dish(record["dish_name"])
+                    
+                    if not db_dish:
+                        print(f"  - ❌ Dish를 처리할 수 없어 레시피를 건너뜁니다: {record['name']}")
+                        continue
+
+                    new_recipe = models.Recipe(
+                        dish_id=db_dish.id, 
+                        name=record["name"],
+                        title=record["title"],
+                        difficulty=record["difficulty"],
+                        cooking_time=record["cooking_time"],
+                        instructions=record["instructions"],
+                        youtube_url=record["youtube_url"],
+                        thumbnail_url=record["thumbnail_url"]
+                    )
+                    self.db.add(new_recipe)
+                    self.db.flush()
+
+                    processed_ingredient_ids = set()
+                    for ing_name, quantity, raw_name in record["ingredients"]:
+                        ingredient = _get_or_create_ingredient(ing_name)
+                        if not ingredient: continue
+
+                        if ingredient.id in processed_ingredient_ids:
                             continue
 
-                        difficulty_val = row.get("difficulty")
-                        difficulty = int(difficulty_val) if difficulty_val and difficulty_val.isdigit() else None
-                        
-                        cooking_time_val = row.get("cooking_time")
-                        cooking_time = int(cooking_time_val) if cooking_time_val and cooking_time_val.isdigit() else None
-                        
-                        new_recipe = models.Recipe(
-                            dish_id=db_dish.id, 
-                            name=recipe_name.strip(),
-                            title=recipe_data.get("title", ""),
-                            difficulty=difficulty,
-                            cooking_time=cooking_time,
-                            instructions=recipe_data.get("recipe", []),
-                            youtube_url=recipe_data.get("url"),
-                            thumbnail_url=recipe_data.get("image_url")
-                        )
-                        self.db.add(new_recipe)
-                        self.db.flush()
-
-                        processed_ingredient_ids = set()
-                        for ing_data in recipe_data.get("ingredients", []):
-                            ing_name = ing_data.get("name")
-                            if not ing_name: continue
-                            
-                            ingredient = _get_or_create_ingredient(ing_name)
-                            if not ingredient: continue
-
-                            if ingredient.id in processed_ingredient_ids:
-                                continue
-
-                            self.db.add(models.RecipeIngredient(
-                                recipe_id=new_recipe.id,
-                                ingredient_id=ingredient.id,
-                                quantity_display=ing_data.get("quantity")
-                            ))
-                            processed_ingredient_ids.add(ingredient.id)
-                        
-                        self.db.commit()
-                    except json.JSONDecodeError:
-                        print(f"  - ❌ JSON 파싱 오류: {row.get('data')}")
-                        self.db.rollback()
-                    except Exception as e:
-                        print(f"  - ❌ 알 수 없는 에러 발생: {e}")
-                        self.db.rollback()
+                        self.db.add(models.RecipeIngredient(
+                            recipe_id=new_recipe.id,
+                            ingredient_id=ingredient.id,
+                            quantity_display=quantity,
+                            raw_name=raw_name,
+                        ))
+                        processed_ingredient_ids.add(ingredient.id)
+                    
+                    self.manifest.on_batch([(parsed, new_recipe.id)])
+                    self.db.commit()
+                except Exception as e:
+                    print(f"  - ❌ 알 수 없는 에러 발생: {e}")
+                    self.db.rollback()
+                    file_ok = False
+            if file_ok:
+                self.manifest.mark_file(path)
+                self.db.commit()
+        self.profiler.add("recipes", rows=total_rows, files=recipe_files)
+        _report_throughput("레시피 임포트", total_rows, started)
         print("\n🎉 모든 레시피 파일 처리가 완료되었습니다.")
 
+    async def _import_recipes_bulk(self):
+        """
+        dish/재료 이름 맵을 한 번만 만들고, 배치 단위 다중 행 INSERT 로 레시피를 적재합니다.
+        --workers N 이 주어지면 CSV/JSON 파싱은 프로세스 풀에서, DB 쓰기는 현재 프로세스 하나에서 수행합니다.
+        배치마다 파일별 진행 위치를 같은 트랜잭션에 기록하고, --resume 이면 그 다음 행부터 이어갑니다.
+        """
+        print("--- '레시피' 데이터 벌크 임포트를 시작합니다 ---")
+        recipe_files = self._recipe_files()
+        if recipe_files is None:
+            return
+
+        # 체크포인트는 import_all 시작 때 비우므로(--resume 제외) 여기엔 이번 임포트의 진행 위치만 있음
+        checkpoints = ImportCheckpointStore(self.db)
+        saved = checkpoints.load() if self.options.get("resume") else {}
+        if self.options.get("resume"):
+            if not saved:
+                print("  - ⚠️ 저장된 체크포인트가 없어 처음부터 적재합니다.")
+            done = [name for name, (_, completed) in saved.items() if completed]
+            print(f"  - ↩️ 체크포인트에서 재개합니다 (완료 파일 {len(done)}개 건너뜀)")
+            paths = {os.path.basename(path): path for path in recipe_files}
+            for name, (offset, completed) in sorted(saved.items()):
+                if not completed and name in paths:
+                    print(f"    · '{name}': {offset}행까지 완료, {offset + 1}행부터 이어서 처리")
+                    # 건너뛴 행의 키를 다시 세어 같은 키의 '#N' 번호가 끊김 없는 임포트와 같게 함
+                    self.manifest.replay_keys(RECIPE_DIR_PATH, paths[name], offset)
+            recipe_files = [path for path in recipe_files if os.path.basename(path) not in done]
+
+        workers = self._int_option("workers", 1)
+        if workers > 1:
+            print(f"  - 🧵 {workers}개 프로세스로 CSV 파싱을 병렬 실행합니다.")
+
+        def _on_file_done(filename: str, rows: int):
+            print(f"  - 📄 '{filename}' 파싱 완료 ({rows}행)")
+
+        writer = BulkRecipeWriter(
+            self.db,
+            batch_size=self._int_option("batch-size", BULK_BATCH_SIZE),
+            batch_hooks=[self.manifest.on_batch, checkpoints.on_batch],
+        )
+        started, total_rows = time.perf_counter(), 0
+        last_rows = {name: offset for name, (offset, _) in saved.items()}
+        parsed_rows = iter_parsed_rows(
+            recipe_files,
+            workers=workers,
+            queue_size=self._int_option("queue-size", PARSE_QUEUE_SIZE),
+            on_file_done=_on_file_done,
+            skip_rows=last_rows.copy(),
+            normalizer=self.normalizer,
+        )
+        for parsed in parsed_rows:
+            total_rows += 1
+            last_rows[parsed.source_file] = parsed.row_no
+            if parsed.error:
+                print(f"  - [{parsed.source_file} {parsed.row_no}행] {parsed.error}")
+                continue
+            writer.add(self.manifest.annotate(RECIPE_DIR_PATH, parsed))
+        writer.flush()
+        self._mark_recipe_files(recipe_files, writer)
+        checkpoints.mark_completed((os.path.basename(path) for path in recipe_files), last_rows)
+
+        self.profiler.add("recipes", rows=total_rows, files=recipe_files)
+        _report_throughput("레시피 벌크 임포트", total_rows, started)
+        print(f"\n🎉 모든 레시피 파일 처리가 완료되었습니다. (저장 {writer.written}건, 실패 {writer.failed}건)")
+
+    def _mark_recipe_files(self, recipe_files: list, writer: BulkRecipeWriter):
+        """쓰기 실패 행이 없는 파일만 매니페스트에 기록합니다 (실패한 파일은 다음 증분 임포트에서 다시 처리)."""
+        for path in recipe_files:
+            if os.path.basename(path) not in writer.failed_sources:
+                self.manifest.mark_file(path)
+        self.db.commit()
+
+    async def _import_incremental(self):
+        """매니페스트와 내용 해시를 비교해 바뀐 파일만 읽고, 바뀌었거나 새로 생긴 레시피만 upsert 합니다."""
+        print("--- 증분 임포트를 시작합니다 ---")
+        if (self.db.query(models.ImportManifest).first() is None
+                and self.db.query(models.Recipe.id).first() is not None):
+            print("❌ 매니페스트가 비어 있는데 레시피가 이미 존재합니다. 'db reset' 후 'db import_all'을 먼저 실행하세요.")
+            return
+
+        # 1) 마스터 재료 / 요리 설명: 파일 해시가 바뀐 경우만
+        if os.path.exists(INGREDIENTS_FILE_PATH) and self.manifest.file_changed(INGREDIENTS_FILE_PATH):
+            with self.profiler.phase("ingredients"):
+                await self._import_ingredients()
+        else:
+            print("  - ⏭️ 'ingredients.json' 변경 없음")
+
+        changed_dish_ids = []
+        description_files = [p for p in (self._description_files() or []) if self.manifest.file_changed(p)]
+        if description_files:
+            with self.profiler.phase("dishes"):
+                changed_dish_ids = await self._import_dishes(description_files)
+        else:
+            print("  - ⏭️ '요리 설명' 변경 없음")
+
+        # 2) 레시피: 바뀐 파일 안에서도 해시가 바뀐 행만
+        recipe_files = self._recipe_files() or []
+        with self.profiler.phase("recipes"):
+            writer = self._upsert_changed_recipes(recipe_files)
+        changes = {"dish_ids": sorted(changed_dish_ids), "recipe_ids": sorted(writer.written_recipe_ids)}
+        print(f"  - 설명이 바뀐 Dish {len(changes['dish_ids'])}개")
+        if self.options.get("dedup") and writer.written_dish_ids:
+            # 레시피가 바뀐 dish 안에서만 다시 계산
+            result = self._dedup_recipes(dish_ids=writer.written_dish_ids)
+            changes["removed_docs"] = result.removed_docs
+            changes["recipe_ids"] = sorted(set(changes["recipe_ids"]) | set(result.restored_ids))
+        with open(self.options.get("changes-out") or CHANGES_FILE_PATH, "w", encoding="utf-8") as f:
+            json.dump(changes, f)
+        print(f"  - 변경 id 목록: {self.options.get('changes-out') or CHANGES_FILE_PATH} "
+              f"(es sync_changes 로 해당 문서만 재색인)")
+
+    def _upsert_changed_recipes(self, recipe_files: list) -> BulkRecipeWriter:
+        writer = BulkRecipeWriter(
+            self.db,
+            batch_size=self._int_option("batch-size", BULK_BATCH_SIZE),
+            batch_hooks=[self.manifest.on_batch],
+        )
+        started, unchanged_rows, merged_rows = time.perf_counter(), 0, 0
+        changed_files = []
+        for path in recipe_files:
+            filename = os.path.basename(path)
+            if not self.manifest.file_changed(path):
+                print(f"  - ⏭️ '{filename}' 변경 없음")
+                continue
+            print(f"\n--- '{filename}' 변경 감지: 바뀐 행만 반영합니다 ---")
+            changed_files.append(path)
+            entries = self.manifest.row_entries(path)
+            for parsed in iter_recipe_rows(path, normalizer=self.normalizer):
+                if parsed.error:
+                    print(f"  - [{filename} {parsed.row_no}행] {parsed.error}")
+                    continue
+                parsed = self.manifest.annotate(RECIPE_DIR_PATH, parsed)
+                entry = entries.get(parsed.meta["row_key"])
+                if entry is not None and entry[1] is None:
+                    # dedup merge 로 대표 레시피에 합쳐 지운 행: 내용이 바뀌어도 다시 만들지 않음
+                    merged_rows += 1
+                    continue
+                content_hash, recipe_id = entry or (None, None)
+                if recipe_id is not None and content_hash == parsed.meta["content_hash"]:
+                    unchanged_rows += 1
+                    continue
+                writer.add(parsed, recipe_id=recipe_id)
+            writer.flush()
+        self._mark_recipe_files(changed_files, writer)
+
+        self.profiler.add("recipes", rows=writer.written + unchanged_rows, files=changed_files)
+        _report_throughput("증분 레시피 반영", writer.written, started)
+        print(f"\n🎉 증분 임포트 완료: 레시피 {writer.written}건 반영 (변경 없음 {unchanged_rows}건, 합쳐진 중복 {merged_rows}건, 실패 {writer.failed}건)")
+        print(f"  - 레시피가 바뀐 Dish {len(writer.written_dish_ids)}개, 변경된 레시피 {len(writer.written_recipe_ids)}개")
+        return writer
+
+    def _dedup_recipes(self, dish_ids=None):
+        """--dedup flag|merge: 같은 dish 안의 거의 같은 레시피(MinHash/LSH)를 표시하거나 지웁니다."""
+        mode = self.options.get("dedup")
+        mode = "flag" if mode in (None, True) else mode
+        threshold = float(self.options.get("dedup-threshold") or DEDUP_THRESHOLD)
+        print(f"--- 중복 레시피 정리를 시작합니다 (mode={mode}, threshold={threshold}) ---")
+        started = time.perf_counter()
+        with self.profiler.phase("dedup"):
+            result = apply_near_duplicates(self.db, mode=mode, threshold=threshold, dish_ids=dish_ids)
+            self.db.commit()
+        self.profiler.add("dedup", rows=len(result.duplicates))
+        action = "표시" if mode == "flag" else "삭제"
+        print(f"✅ 거의 같은 레시피 {len(result.duplicates)}개를 {action}했습니다. "
+              f"({time.perf_counter() - started:.1f}초)")
+        if result.restored_ids:
+            print(f"  - 중복 표시가 풀린 레시피 {len(result.restored_ids)}개 (es sync_changes 로 다시 색인)")
+        return result
+
+    async def _generate_synthetic(self):
+        """부하 측정용 합성 데이터셋을 --out 폴더에 만듭니다 (DB는 건드리지 않음)."""
+        out_dir = self.options.get("out") or os.path.join(BASE_DATA_PATH, "synthetic")
+        print(f"--- 합성 데이터셋 생성을 시작합니다: {out_dir} ---")
+        started = time.perf_counter()
+        summary = generate_catalog(
+            out_dir,
+            recipes=self._int_option("recipes", 10000),
+            dishes=self._int_option("dishes", 500),
+            ingredients=self._int_option("ingredients", 2000),
+            files=self._int_option("files", 4),
+            zipf_s=float(self.options.get("zipf") or 1.1),
+            seed=self._int_option("seed", 42),
+        )
+        _report_throughput("합성 레시피 생성", summary["recipes"], started)
+        print(f"✅ 레시피 {summary['recipes']}개 (CSV {summary['files']}개), Dish {summary['dishes']}개, "
+              f"재료 {summary['ingredients']}개를 만들었습니다.")
+        print(f"  - 임포트: FRIDGE_DATA_PATH={out_dir} python es_db_manage.py db import_all --bulk")
+
+    def _refresh_search_docs(self):
+        """search_documents 뷰를 다시 계산합니다 (CONCURRENTLY 라 갱신 중에도 읽기 가능)."""
+        print("--- 검색 문서 뷰(search_documents) 갱신을 시작합니다 ---")
+        repo = SearchDocumentRepository(self.db)
+        started = time.perf_counter()
+        with self.profiler.phase("refresh_search_docs") as phase:
+            repo.refresh(concurrently=True)
+            self.db.commit()
+            phase.rows += repo.count()
+        _report_throughput("검색 문서 뷰 갱신", phase.rows, started)
+
+    def _export_search_docs(self):
+        """search_documents 뷰를 COPY 로 그대로 파일에 씁니다 (--format csv|ndjson)."""
+        fmt = self.options.get("format") or "csv"
+        path = self.options.get("out") or f"{SEARCH_DOCS_EXPORT_PATH}.{fmt}"
+        print(f"--- 검색 문서를 내보냅니다: {path} ({fmt}) ---")
+        repo = SearchDocumentRepository(self.db)
+        started = time.perf_counter()
+        with self.profiler.phase("export_search_docs") as phase, open(path, "w", encoding="utf-8", newline="") as f:
+            repo.copy_to(f, fmt)
+            phase.rows += repo.count()
+        self.db.commit()
+        _report_throughput("검색 문서 내보내기", phase.rows, started)
+        print(f"✅ {os.path.getsize(path) / 1024 / 1024:.1f}MB 를 썼습니다.")
+
     async def run(self, command: str):
         if command == "reset":
             await self._reset_data()
         elif command == "import_all":
-            await self._import_ingredients()
-            await self._import_dishes()
-            await self._import_recipes()
+            if not self.options.get("resume"):
+                # 이전 (중단된) 벌크 임포트의 진행 위치가 남아 있으면 나중의 --resume 이 엉뚱한 행을 건너뜀
+                ImportCheckpointStore(self.db).reset()
+            with self.profiler.phase("ingredients"):
+                await self._import_ingredients()
+            with self.profiler.phase("dishes"):
+                await self._import_dishes()
+            with self.profiler.phase("recipes"):
+                if self.options.get("bulk") or self.options.get("resume"):
+                    await self._import_recipes_bulk()
+                else:
+                    await self._import_recipes()
+            if self.options.get("dedup"):
+                self._dedup_recipes()
+        elif command == "import_incremental":
+            await self._import_incremental()
+        elif command == "dedup_recipes":
+            result = self._dedup_recipes()
+            changes = {"dish_ids": [], "recipe_ids": result.restored_ids, "removed_docs": result.removed_docs}
+            with open(self.options.get("changes-out") or CHANGES_FILE_PATH, "w", encoding="utf-8") as f:
+                json.dump(changes, f)
+            print("  - ES 문서 정리: es sync_changes")
+        elif command == "generate_synthetic":
+            await self._generate_synthetic()
+        elif command == "refresh_search_docs":
+            self._refresh_search_docs()
+        elif command == "export_search_docs":
+            self._export_search_docs()
         else:
             print(f"알 수 없는 DB 관련 명령어입니다: {command}")
 
 
 class ESManager(BaseManager):
     """Elasticsearch 인덱스 생성 및 재색인을 담당합니다."""
-    def __init__(self):
-        super().__init__()
+    def __init__(self, options: dict = None):
+        super().__init__(options)
         self.es_client: AsyncElasticsearch = None
+        self._hierarchy: IngredientHierarchy = None
+
+    @property
+    def hierarchy(self) -> IngredientHierarchy:
+        """재료 계층 (부모 맵 파일 > Ingredient.category). 처음 쓸 때 한 번 읽습니다."""
+        if self._hierarchy is None:
+            self._hierarchy = IngredientHierarchy.from_sources(
+                IngredientRepository(self.db).get_categories(), self.options.get("hierarchy") or HIERARCHY_FILE_PATH
+            )
+            print(f"  - 재료 계층: 부모가 있는 재료 {len(self._hierarchy.parents)}개")
+        return self._hierarchy
+
+    def _with_expanded_ingredients(self, row) -> dict:
+        """projection 행에 재료 필터용 ingredients_expanded 를 붙입니다."""
+        ingredients = row["ingredients"] or []
+        return {**row, "ingredients": ingredients, "ingredients_expanded": self.hierarchy.expand(ingredients)}
 
     async def __aenter__(self):
         self.es_lifespan_context = es_lifespan(app=None)
@@ -248,64 +575,515 @@ class ESManager(BaseManager):
             await self.es_lifespan_context.__aexit__(exc_type, exc_val, exc_tb)
         await super().__aexit__(exc_type, exc_val, exc_tb)
 
+    def _shard_settings(self) -> dict:
+        """--shards / --replicas (없으면 ES_NUMBER_OF_SHARDS / ES_NUMBER_OF_REPLICAS 환경변수, 그다음 ES 기본값)"""
+        return {
+            "shards": self._int_option("shards", 0) or None,
+            "replicas": self._int_option("replicas", 0) if "replicas" in self.options else None,
+        }
+
     async def _create_index(self):
         print("--- Elasticsearch 인덱스 생성을 시작합니다 ---")
-        await create_dishes_index(self.es_client)
+        await create_dishes_index(self.es_client, self.options.get("index-profile"), **self._shard_settings())
         print("✅ 인덱스 생성 완료.")
 
     async def _delete_index(self):
-        print(f"--- Elasticsearch 인덱스 '{DISHES_INDEX_NAME}' 삭제를 시도합니다 ---")
-        if await self.es_client.indices.exists(index=DISHES_INDEX_NAME):
-            await self.es_client.indices.delete(index=DISHES_INDEX_NAME)
-            print(f"✅ 인덱스 '{DISHES_INDEX_NAME}'를 성공적으로 삭제했습니다.")
-        else:
+        print(f"--- Elasticsearch 인덱스 '{DISHES_INDEX_NAME}' (모든 버전) 삭제를 시도합니다 ---")
+        names = [name for _, name in await dish_index_versions(self.es_client)]
+        if not await alias_targets(self.es_client) and await self.es_client.indices.exists(index=DISHES_INDEX_NAME):
+            names.append(DISHES_INDEX_NAME)  # 별칭 도입 전의 실제 인덱스
+        if not names:
             print("✅ 인덱스가 이미 존재하지 않습니다.")
+            return
+        for name in names:
+            await self.es_client.indices.delete(index=name)
+        print(f"✅ 인덱스 {names}를 성공적으로 삭제했습니다.")
 
 
     async def _reindex_data(self):
+        """
+        새 버전 인덱스(dishes_vN)를 뒤에서 채운 뒤 별칭을 한 번에 옮깁니다 (blue-green).
+        재색인 중에도 검색은 기존 인덱스를 그대로 씁니다. 이전 버전은 --keep 개까지 롤백용으로 남깁니다.
+        """
         print("--- Elasticsearch 데이터 재색인을 시작합니다 ---")
-        dish_repo = DishRepository(self.db)
         search_repo = SearchRepository(self.es_client)
-        await search_repo.reset_index()
+        # 재색인 중 들어온 outbox 이벤트는 워커가 기존 인덱스(별칭)에 쓰므로, 별칭 전환 후 새 인덱스에 다시 반영합니다.
+        replay_since = self.db.scalar(select(func.now())) - OUTBOX_REPLAY_MARGIN
+        self.db.commit()
+        new_index = await create_versioned_index(
+            self.es_client, self.options.get("index-profile"), **self._shard_settings()
+        )
+        print(f"  - 새 인덱스 '{new_index}'에 색인합니다. (검색은 기존 인덱스 유지)")
 
-        offset, total = 0, 0
-        BATCH_SIZE = 200
+        started = time.perf_counter()
+        try:
+            # 적재 중에는 refresh/replica 를 끄고, 끝나면 원래 설정으로 되돌립니다.
+            async with bulk_load_settings(self.es_client, new_index):
+                stats = await search_repo.concurrent_bulk_index(
+                    self._iter_index_actions(new_index),
+                    concurrency=self._int_option("concurrency", ES_BULK_CONCURRENCY),
+                    max_chunk_bytes=self._int_option("chunk-mb", ES_BULK_CHUNK_MB) * 1024 * 1024,
+                    max_chunk_docs=self._int_option("bulk-size", ES_BULK_CHUNK_SIZE),
+                )
+        except BaseException:
+            # 중간에 실패한 인덱스는 별칭을 옮기지 않고 지웁니다.
+            await self.es_client.indices.delete(index=new_index)
+            raise
+        success, failed = stats["success"], stats["failed"]
+        # 문서 생성과 전송이 겹쳐 돌기 때문에 전송 시간은 따로 재지 않고 요청 수만 남깁니다.
+        self.profiler.add("bulk_send", rows=success + failed, es_requests=stats["requests"])
+
+        await self.es_client.indices.refresh(index=new_index)
+        _report_throughput("재색인", success, started)
+        print(f"  - bulk 요청 {stats['requests']}회, 429 거절 {stats['rejected']}건 (재시도됨)")
+        if failed and not self.options.get("force"):
+            print(f"❌ {failed}개 문서 색인 실패로 별칭을 옮기지 않습니다. '{new_index}'는 확인용으로 남겨둡니다. (--force 로 강제 전환)")
+            return
+
+        previous = await swap_dishes_alias(self.es_client, new_index)
+        print(f"  - 별칭 '{DISHES_INDEX_NAME}': {previous or '-'} → {new_index}")
+        dish_ids, recipe_ids = OutboxRepository(self.db).touched_since(replay_since)
+        if dish_ids or recipe_ids:
+            indexed, _ = await self._sync_recipes(recipe_ids, dish_ids=dish_ids, verbose=False)
+            print(f"  - 재색인 중 바뀐 레시피 문서 {indexed}개를 새 인덱스에 다시 반영했습니다.")
+        await self._invalidate_search_cache()
+        pruned = await prune_dish_indices(self.es_client, self._int_option("keep", ES_KEEP_VERSIONS))
+        if pruned:
+            print(f"  - 오래된 인덱스 삭제: {pruned}")
+        print(f"✅ 재색인 완료. 총 {success}개의 문서가 처리되었습니다. (실패 {failed}개)")
+
+    async def _rollback(self):
+        """별칭을 직전 버전(또는 --version N)으로 되돌립니다."""
+        versions = dict(await dish_index_versions(self.es_client))
+        live = await alias_targets(self.es_client)
+        live_versions = [v for v, name in versions.items() if name in live]
+        if self.options.get("version"):
+            target = versions.get(self._int_option("version", 0))
+        else:
+            older = [v for v in versions if live_versions and v < min(live_versions)]
+            target = versions[max(older)] if older else None
+        if not target:
+            print(f"❌ 되돌릴 인덱스가 없습니다. (현재: {live or '-'}, 보관 중: {sorted(versions.values())})")
+            return
+        await swap_dishes_alias(self.es_client, target)
+        await self._invalidate_search_cache()
+        print(f"✅ 별칭 '{DISHES_INDEX_NAME}'을 {live or '-'} → {target} 로 되돌렸습니다.")
+
+    def _search_row_pages(self, by_dish: bool = False):
+        """
+        --source tables(기본): 원본 테이블에서 바로 projection 을 읽음
+        --source view: search_documents 뷰를 먼저 갱신한 뒤 미리 모아둔 행을 읽음 (재료 집계를 매번 하지 않음)
+        by_dish 면 dish_id, recipe_id 순으로 읽음 (dish 레이아웃)
+        """
+        batch_size = self._int_option("batch-size", REINDEX_PAGE_SIZE)
+        source = self.options.get("source") or "tables"
+        if source == "view":
+            repo = SearchDocumentRepository(self.db)
+            with self.profiler.phase("refresh_search_docs"):
+                repo.refresh(concurrently=True)
+                self.db.commit()
+            return repo.iter_rows_by_dish(batch_size) if by_dish else repo.iter_rows(batch_size=batch_size)
+        if source != "tables":
+            raise ValueError(f"알 수 없는 --source 입니다: {source} (tables|view)")
+        dish_repo = DishRepository(self.db)
+        return dish_repo.iter_search_rows_by_dish(batch_size) if by_dish else dish_repo.iter_search_rows(batch_size=batch_size)
+
+    async def _snapshot(self):
+        """별칭이 가리키는 인덱스를 파일시스템 저장소에 스냅샷으로 남깁니다 (--name 으로 이름 지정)."""
+        print(f"--- '{DISHES_INDEX_NAME}' 인덱스 스냅샷을 시작합니다 (저장소 '{SNAPSHOT_REPOSITORY}') ---")
+        started = time.perf_counter()
+        info = await snapshot_dishes_index(self.es_client, self.options.get("name"))
+        shards = info.get("shards", {})
+        print(f"✅ 스냅샷 '{info['snapshot']}' 완료: {info['indices']} "
+              f"(샤드 {shards.get('successful', '?')}/{shards.get('total', '?')}, {time.perf_counter() - started:.1f}초)")
+
+    async def _list_snapshots(self):
+        snapshots = await list_dish_snapshots(self.es_client)
+        if not snapshots:
+            print(f"저장소 '{SNAPSHOT_REPOSITORY}' 에 스냅샷이 없습니다.")
+            return
+        for info in snapshots:
+            print(f"  - {info['snapshot']}  {info.get('start_time', '-')}  {info.get('state')}  {info['indices']}")
+
+    async def _restore(self):
+        """
+        스냅샷(--snapshot NAME, 기본: 가장 최근 성공본)을 새 버전 인덱스로 복원한 뒤 별칭을 옮깁니다.
+        Postgres 는 읽지 않습니다. 스냅샷 이후의 DB 변경은 outbox 워커나 es reindex 로 반영합니다.
+        """
+        name = self.options.get("snapshot")
+        if not name:
+            done = [info for info in await list_dish_snapshots(self.es_client) if info.get("state") == "SUCCESS"]
+            if not done:
+                print(f"❌ 저장소 '{SNAPSHOT_REPOSITORY}' 에 복원할 스냅샷이 없습니다.")
+                return
+            name = done[-1]["snapshot"]
+        print(f"--- 스냅샷 '{name}' 복원을 시작합니다 ---")
+        started = time.perf_counter()
+        restored = await restore_dishes_snapshot(self.es_client, name)
+        previous = await swap_dishes_alias(self.es_client, restored)
+        print(f"  - 별칭 '{DISHES_INDEX_NAME}': {previous or '-'} → {restored}")
+        await self._invalidate_search_cache()
+        pruned = await prune_dish_indices(self.es_client, self._int_option("keep", ES_KEEP_VERSIONS))
+        if pruned:
+            print(f"  - 오래된 인덱스 삭제: {pruned}")
+        print(f"✅ 복원 완료 ({time.perf_counter() - started:.1f}초).")
+
+    @staticmethod
+    async def _invalidate_search_cache():
+        """별칭 전환/분석기 리로드처럼 검색 결과가 바뀌는 작업 뒤에 Redis 검색 결과 캐시 세대를 올립니다."""
+        generation = await bump_generation()
+        if generation is None:
+            print("⚠️ Redis 에 연결하지 못해 검색 결과 캐시를 무효화하지 못했습니다.")
+        else:
+            print(f"  - 검색 결과 캐시 세대: {generation}")
+
+    async def _reload_synonyms(self):
+        """
+        동의어 파일을 검사한 뒤 라이브 인덱스의 검색 분석기를 다시 읽히고, 검색 결과 캐시 세대를 올립니다 (재색인 없음).
+        사용자 사전(nori 토크나이저)은 updateable 이 아니라서 바뀌면 es reindex 가 필요합니다.
+        """
+        print(f"--- 동의어 리로드를 시작합니다 ({SYNONYM_FILE_PATH}) ---")
+        rules, errors = validate_synonym_file()
+        if errors:
+            print(f"❌ 동의어 파일에 잘못된 줄이 {len(errors)}개 있어 리로드하지 않습니다:")
+            for error in errors[:20]:
+                print(f"  - {error}")
+            return
+        print(f"  - 규칙 {rules}개 확인")
+
+        result = await SearchRepository(self.es_client).reload_search_analyzers()
+        if result["shards_failed"]:
+            print(f"❌ {result['shards_failed']}개 샤드에서 리로드에 실패했습니다: {result}")
+            return
+        print(f"  - {result['indices']}: {result['reloaded_analyzers']} (노드 {len(result['reloaded_nodes'])}개)")
+
+        await self._invalidate_search_cache()
+
+        check = self.options.get("check")
+        if check:
+            analyzed = await self.es_client.indices.analyze(
+                index=DISHES_INDEX_NAME, analyzer="ko_search_analyzer", text=check
+            )
+            print(f"  - '{check}' → {[token['token'] for token in analyzed['tokens']]}")
+        print(f"✅ 동의어 리로드 완료. 사용자 사전({USERDICT_FILE_PATH})을 바꿨다면 es reindex 가 필요합니다.")
+
+    def _benchmark_queries(self, count: int, seed: int) -> list:
+        """무작위 레시피의 재료 2~5개를 '냉장고 재료'로 삼은 검색 요청 목록 (같은 seed면 같은 목록)."""
+        rng = random.Random(seed)
+        self.db.execute(select(func.setseed(rng.random())))
+        names = self.db.execute(
+            select(func.array_agg(models.Ingredient.name))
+            .join(models.RecipeIngredient, models.RecipeIngredient.ingredient_id == models.Ingredient.id)
+            .group_by(models.RecipeIngredient.recipe_id)
+            .order_by(func.random())
+            .limit(count)
+        ).scalars().all()
+        self.db.commit()
+        return [rng.sample(items, k=min(len(items), rng.randint(2, 5))) for items in names if items]
+
+    async def _benchmark_index(self, profile: str, layout: str, queries: list, warmup: list) -> dict:
+        """임시 인덱스(dishes_bench_<profile>_<layout>)를 같은 데이터로 채우고 검색 지연 시간을 잽니다."""
+        index = f"{DISHES_INDEX_NAME}_bench_{profile}_{layout}"
+        if await self.es_client.indices.exists(index=index):
+            await self.es_client.indices.delete(index=index)
+        settings, mappings = dishes_index_body(profile, layout=layout, **self._shard_settings())
+        await self.es_client.indices.create(index=index, settings=settings, mappings=mappings)
+        search_repo = SearchRepository(self.es_client, index=index, layout=layout)
+
+        started = time.perf_counter()
+        async with bulk_load_settings(self.es_client, index):
+            stats = await search_repo.concurrent_bulk_index(
+                self._iter_index_actions(index, layout),
+                concurrency=self._int_option("concurrency", ES_BULK_CONCURRENCY),
+                max_chunk_bytes=self._int_option("chunk-mb", ES_BULK_CHUNK_MB) * 1024 * 1024,
+                max_chunk_docs=self._int_option("bulk-size", ES_BULK_CHUNK_SIZE),
+            )
+        index_seconds = time.perf_counter() - started
+        await self.es_client.indices.refresh(index=index)
+        await self.es_client.indices.forcemerge(index=index, max_num_segments=1)
+        # 요청 캐시가 켜져 있으면 같은 요청이 캐시에서 나와 매핑 차이가 가려짐
+        await self.es_client.indices.put_settings(index=index, settings={"index": {"requests.cache.enable": False}})
+
+        ing_mode = self.options.get("ing-mode") or "RATIO"
+
+        async def run(query_ingredients):
+            return await search_repo.search_grouped_dishes(
+                None, query_ingredients, size=20, topk_per_dish=3, ing_mode=ing_mode, ing_ratio=0.6
+            )
+
+        for query_ingredients in warmup:
+            await run(query_ingredients)
+        latencies, matched = [], []
+        with self.profiler.phase(f"search_{profile}_{layout}") as phase:
+            for query_ingredients in queries:
+                t0 = time.perf_counter()
+                res = await run(query_ingredients)
+                latencies.append((time.perf_counter() - t0) * 1000)
+                matched.append(res["total"])
+            phase.rows += len(queries)
+            phase.es_requests += len(queries)
+
+        store = await self.es_client.indices.stats(index=index, metric="store")
+        result = {
+            "index": index,
+            "docs": stats["success"],
+            "index_seconds": round(index_seconds, 2),
+            "store_bytes": store["indices"][index]["total"]["store"]["size_in_bytes"],
+            "p50_ms": round(statistics.median(latencies), 2),
+            "p95_ms": round(statistics.quantiles(latencies, n=20)[-1], 2),
+            "mean_ms": round(statistics.fmean(latencies), 2),
+            "mean_matched": round(statistics.fmean(matched), 1),  # 재료 필터를 통과한 문서 수 (collapse 전 후보)
+        }
+        if not self.options.get("keep-indices"):
+            await self.es_client.indices.delete(index=index)
+        return result
+
+    async def _run_benchmark(self, kind: str, variants: list):
+        """variants: [(이름, profile, layout), ...] 를 같은 데이터·같은 검색으로 비교하고 JSON 리포트를 남깁니다."""
+        count = self._int_option("queries", BENCH_QUERIES)
+        queries = self._benchmark_queries(count + BENCH_WARMUP, self._int_option("seed", 42))
+        measured, warmup = queries[:count], queries[count:]
+        print(f"--- {kind} 벤치마크를 시작합니다 ({', '.join(name for name, _, _ in variants)}; 검색 {len(measured)}회) ---")
+        results = {}
+        for name, profile, layout in variants:
+            results[name] = r = await self._benchmark_index(profile, layout, measured, warmup)
+            print(f"  - {name:<11}: 문서 {r['docs']}개, 색인 {r['index_seconds']}초, {r['store_bytes'] / 1024 / 1024:.1f}MB, "
+                  f"검색 p50 {r['p50_ms']}ms / p95 {r['p95_ms']}ms, 후보 평균 {r['mean_matched']}개")
+
+        os.makedirs(PROFILE_DIR_PATH, exist_ok=True)
+        path = self.options.get("out") or os.path.join(
+            PROFILE_DIR_PATH, f"bench_index_{kind}_{datetime.now():%Y%m%d_%H%M%S}.json"
+        )
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"queries": len(measured), "source": self.options.get("source") or "tables",
+                       "ing_mode": self.options.get("ing-mode") or "RATIO", kind: results},
+                      f, ensure_ascii=False, indent=2)
+        print(f"✅ 벤치마크 리포트를 저장했습니다: {path}")
+
+    async def _iter_index_actions(self, index_name: str, layout: str = None):
+        """
+        DB 에서 가벼운 행만 페이지 단위로 읽어 bulk action 을 하나씩 내보냅니다.
+        dish 레이아웃은 dish_id 순으로 읽어 dish 하나당 문서 하나를 만들고, 페이지 끝에 걸친 dish 는 다음 페이지와 합칩니다.
+        """
+        by_dish = (layout or INDEX_LAYOUT) == "dish"
+        pages = self._search_row_pages(by_dish=by_dish)
+        carry, total = [], 0
         while True:
-            # DB에서 Dish와 관련 레시피 정보를 Eager Loading으로 한번에 가져옴
-            dishes_batch = dish_repo.get_all_dishes(skip=offset, limit=BATCH_SIZE)
-            if not dishes_batch: break
+            with self.profiler.phase("db_fetch") as phase:
+                page = next(pages, None)
+                phase.rows += len(page or ())
+            if page is None and not carry:
+                break
+            with self.profiler.phase("doc_build") as phase:
+                if by_dish:
+                    rows, carry = carry + list(page or ()), []
+                    if page is not None:
+                        # 마지막 dish 는 다음 페이지에 레시피가 더 있을 수 있어 넘겨둠
+                        last_dish = rows[-1]["dish_id"]
+                        cut = len(rows)
+                        while cut and rows[cut - 1]["dish_id"] == last_dish:
+                            cut -= 1
+                        rows, carry = rows[:cut], rows[cut:]
+                    actions = self._dish_documents(rows, index_name)
+                else:
+                    actions = [
+                        SearchRepository.build_recipe_document(**self._with_expanded_ingredients(row), index=index_name)
+                        for row in page
+                    ]
+                phase.rows += len(actions)
+            for action in actions:
+                yield action
+            total += len(actions)
+            print(f"  - 색인 대기열: {total}개")
 
-            actions = []
-            for dish in dishes_batch:
-                for recipe in dish.recipes:
+    def _dish_documents(self, rows, index_name: str = DISHES_INDEX_NAME) -> list:
+        """dish_id 순으로 정렬된 projection 행을 dish 별로 묶어 dish 문서(nested recipes)를 만듭니다."""
+        documents = []
+        for dish_id, group in itertools.groupby(rows, key=lambda r: r["dish_id"]):
+            recipes = [self._with_expanded_ingredients(row) for row in group]
+            documents.append(SearchRepository.build_dish_document(
+                dish_id=dish_id,
+                dish_name=recipes[0]["dish_name"],
+                description=recipes[0]["description"],
+                recipes=recipes,
+                index=index_name,
+            ))
+        return documents
 
-                    description = dish.semantic_description or ""
-                    
-                    ingredient_names = [item.ingredient.name for item in recipe.ingredients]
-                    
-                    actions.append({
-                        "_index": DISHES_INDEX_NAME,
-                        "_id": f"{dish.id}_{recipe.id}",
-                        "_source": {
-                            "dish_id": dish.id, "recipe_id": recipe.id,
-                            "dish_name": dish.name,
-                            "recipe_title": getattr(recipe, "title", "") or "",
-                            "recipe_name": getattr(recipe, "name", "") or "",
-                            "ingredients": ingredient_names,
-                            "description": description 
-                        }
-                    })
-            
+    def _recipe_document(self, dish: models.Dish, recipe: models.Recipe) -> dict:
+        ingredients = [item.ingredient.name for item in recipe.ingredients]
+        return SearchRepository.build_recipe_document(
+            dish_id=dish.id,
+            dish_name=dish.name,
+            description=dish.semantic_description,
+            recipe_id=recipe.id,
+            recipe_title=recipe.title,
+            recipe_name=recipe.name,
+            ingredients=ingredients,
+            ingredients_expanded=self.hierarchy.expand(ingredients),
+            thumbnail_url=recipe.thumbnail_url,
+            cooking_time=recipe.cooking_time,
+            difficulty=recipe.difficulty,
+        )
+
+    async def _sync_changes(self):
+        """증분 임포트가 남긴 변경 id 파일을 읽어, 해당 레시피 문서만 다시 색인합니다 (인덱스는 비우지 않음)."""
+        path = self.options.get("changes") or CHANGES_FILE_PATH
+        print(f"--- 변경분 재색인을 시작합니다: {path} ---")
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                changes = json.load(f)
+        except FileNotFoundError:
+            print(f"❌ 변경 id 파일을 찾을 수 없습니다: {path}")
+            return
+
+        # dedup 으로 지워졌거나 중복 표시된 레시피 문서는 인덱스에서 뺍니다.
+        total, removed = await self._sync_recipes(
+            changes.get("recipe_ids", []),
+            dish_ids=changes.get("dish_ids", []),
+            removed_docs=[tuple(doc) for doc in changes.get("removed_docs", [])],
+        )
+        if removed:
+            print(f"  - 삭제한 레시피 문서: {removed}개")
+        await self.es_client.indices.refresh(index=DISHES_INDEX_NAME)
+        await self._invalidate_search_cache()
+        print(f"✅ 변경분 재색인 완료. 총 {total}개의 문서가 처리되었습니다.")
+
+    async def _sync_recipes(
+        self, recipe_ids, *, dish_ids=(), removed_docs=(), recipe_dishes=None, verbose=True
+    ) -> tuple:
+        """
+        레시피 문서를 DB 기준으로 다시 만들어 upsert 하고, 지워야 할 문서는 삭제합니다.
+        - dish_ids: 그 Dish의 모든 레시피 문서를 다시 만듦 (설명 변경 등)
+        - removed_docs: 바로 지울 (dish_id, recipe_id)
+        - recipe_dishes: {recipe_id: dish_id}. DB에 없는 레시피는 이 정보로 문서를 지움
+        반환: (색인한 문서 수, 삭제한 문서 수)
+        """
+        if INDEX_LAYOUT == "dish":
+            return await self._sync_dish_documents(
+                recipe_ids, dish_ids=dish_ids, removed_docs=removed_docs, recipe_dishes=recipe_dishes, verbose=verbose
+            )
+        dish_repo = DishRepository(self.db)
+        search_repo = SearchRepository(self.es_client)
+        recipe_ids = sorted(set(recipe_ids) | set(dish_repo.get_recipe_ids_by_dish_ids(list(dish_ids))))
+        removed_docs = set(removed_docs)
+
+        total, BATCH_SIZE = 0, 500
+        for start in range(0, len(recipe_ids), BATCH_SIZE):
+            batch_ids = recipe_ids[start:start + BATCH_SIZE]
+            with self.profiler.phase("db_fetch") as phase:
+                recipes = dish_repo.get_recipes_with_dish(batch_ids)
+                phase.rows += len(recipes)
+            with self.profiler.phase("doc_build") as phase:
+                actions = [
+                    self._recipe_document(recipe.dish, recipe)
+                    for recipe in recipes
+                    if recipe.duplicate_of_id is None
+                ]
+                removed_docs.update((r.dish_id, r.id) for r in recipes if r.duplicate_of_id is not None)
+                found = {r.id for r in recipes}
+                removed_docs.update(
+                    (recipe_dishes[rid], rid) for rid in batch_ids if rid not in found and rid in (recipe_dishes or {})
+                )
+                phase.rows += len(actions)
             if actions:
-                await search_repo.bulk_index_dishes(actions, refresh=False)
+                with self.profiler.phase("bulk_send") as phase:
+                    await search_repo.bulk_index_dishes(actions, refresh=False)
+                    phase.rows += len(actions)
+                    phase.es_requests += 1
                 total += len(actions)
-                print(f"  - 색인된 문서: {len(actions)} (총 {total}개)")
+                if verbose:
+                    print(f"  - 색인된 문서: {len(actions)} (총 {total}개)")
 
-            offset += BATCH_SIZE
-            await asyncio.sleep(0.1)
+        if removed_docs:
+            with self.profiler.phase("bulk_send") as phase:
+                await search_repo.bulk_delete_documents(
+                    [f"{dish_id}_{recipe_id}" for dish_id, recipe_id in sorted(removed_docs)]
+                )
+                phase.es_requests += 1
+        return total, len(removed_docs)
 
-        await self.es_client.indices.refresh(index=DISHES_INDEX_NAME)
-        print(f"✅ 재색인 완료. 총 {total}개의 문서가 처리되었습니다.")
+    async def _sync_dish_documents(
+        self, recipe_ids, *, dish_ids=(), removed_docs=(), recipe_dishes=None, verbose=True
+    ) -> tuple:
+        """
+        dish 레이아웃용 _sync_recipes: 바뀐 레시피가 속한 dish 문서를 통째로 다시 만듭니다.
+        남은 레시피가 없는 dish(모두 삭제/중복 처리)는 문서를 지웁니다.
+        """
+        dish_repo = DishRepository(self.db)
+        search_repo = SearchRepository(self.es_client, layout="dish")
+        affected = set(dish_ids) | {dish_id for dish_id, _ in removed_docs} | set((recipe_dishes or {}).values())
+        affected = sorted(affected | set(dish_repo.get_dish_ids_by_recipe_ids(list(recipe_ids))))
+
+        total, emptied, BATCH_SIZE = 0, [], 200
+        for start in range(0, len(affected), BATCH_SIZE):
+            batch_ids = affected[start:start + BATCH_SIZE]
+            with self.profiler.phase("db_fetch") as phase:
+                rows = dish_repo.get_search_rows_by_dish_ids(batch_ids)
+                phase.rows += len(rows)
+            with self.profiler.phase("doc_build") as phase:
+                actions = self._dish_documents(rows)
+                found = {row["dish_id"] for row in rows}
+                emptied.extend(dish_id for dish_id in batch_ids if dish_id not in found)
+                phase.rows += len(actions)
+            if actions:
+                with self.profiler.phase("bulk_send") as phase:
+                    await search_repo.bulk_index_dishes(actions, refresh=False)
+                    phase.rows += len(actions)
+                    phase.es_requests += 1
+                total += len(actions)
+                if verbose:
+                    print(f"  - 색인된 dish 문서: {len(actions)} (총 {total}개)")
+
+        if emptied:
+            with self.profiler.phase("bulk_send") as phase:
+                await search_repo.bulk_delete_documents([str(dish_id) for dish_id in emptied])
+                phase.es_requests += 1
+        return total, len(emptied)
+
+    async def _outbox_worker(self):
+        """
+        search_outbox 를 계속 비우며 바뀐 레시피 문서만 upsert 합니다 (--once 면 한 번 비우고 종료).
+        반영한 배치마다 검색 결과 캐시 세대를 올립니다.
+        이벤트 처리 표시는 ES 반영이 성공한 뒤 같은 트랜잭션에서 커밋하므로, 실패하면 다음 회차에 다시 처리됩니다.
+        """
+        outbox = OutboxRepository(self.db)
+        batch_size = self._int_option("batch-size", OUTBOX_BATCH_SIZE)
+        interval = float(self.options.get("interval") or OUTBOX_POLL_SECONDS)
+        print(f"--- search_outbox 동기화 워커를 시작합니다 (batch={batch_size}, interval={interval}s) ---")
+        last_prune = 0.0
+        while True:
+            events = outbox.claim_batch(batch_size)
+            if events:
+                try:
+                    indexed, removed = await self._sync_recipes(
+                        [e.recipe_id for e in events if e.recipe_id is not None],
+                        dish_ids=[e.dish_id for e in events if e.recipe_id is None],
+                        recipe_dishes={e.recipe_id: e.dish_id for e in events if e.recipe_id is not None},
+                        verbose=False,
+                    )
+                    outbox.mark_processed([e.id for e in events])
+                    self.db.commit()
+                    # 반영된 변경이 캐시된 검색 결과에 바로 보이도록 세대를 올림 (Redis 장애면 TTL 뒤 만료)
+                    generation = await bump_generation()
+                    print(f"  - 이벤트 {len(events)}건 반영 (색인 {indexed}, 삭제 {removed}, 캐시 세대 {generation})")
+                except Exception as e:
+                    self.db.rollback()
+                    print(f"  - ⚠️ 동기화 실패, {interval}초 후 다시 시도합니다: {e}")
+                    await asyncio.sleep(interval)
+                continue
+            self.db.commit()  # 잠금 해제 (빈 결과라도 트랜잭션 종료)
+
+            if time.monotonic() - last_prune > 3600:
+                pruned = outbox.prune(timedelta(days=OUTBOX_RETENTION_DAYS))
+                self.db.commit()
+                last_prune = time.monotonic()
+                if pruned:
+                    print(f"  - 처리된 지 오래된 이벤트 {pruned}건 정리")
+            if self.options.get("once"):
+                print("✅ search_outbox 를 모두 처리했습니다.")
+                return
+            await asyncio.sleep(interval)
 
     async def run(self, command: str):
         # ===== [수정된 부분] =====
@@ -315,39 +1093,138 @@ class ESManager(BaseManager):
             await self._create_index()
         elif command == "reindex":
             await self._reindex_data()
+        elif command == "rollback":
+            await self._rollback()
+        elif command == "benchmark_profiles":
+            await self._run_benchmark("profiles", [(profile, profile, INDEX_LAYOUT) for profile in INDEX_PROFILES])
+        elif command == "benchmark_layouts":
+            profile = self.options.get("index-profile") or "default"
+            await self._run_benchmark("layouts", [(layout, profile, layout) for layout in INDEX_LAYOUTS])
+        elif command == "snapshot":
+            await self._snapshot()
+        elif command == "snapshots":
+            await self._list_snapshots()
+        elif command == "restore":
+            await self._restore()
+        elif command == "reload_synonyms":
+            await self._reload_synonyms()
+        elif command == "outbox_worker":
+            await self._outbox_worker()
+        elif command == "sync_changes":
+            await self._sync_changes()
         else:
             print(f"알 수 없는 ES 관련 명령어입니다: {command}")
         # ========================
 
 def print_usage():
     # ===== [수정된 부분] =====
-    print("\n사용법: docker-compose exec api uv run python es_db_manage.py [group] [command]")
+    print("\n사용법: docker-compose exec api uv run python es_db_manage.py [group] [command] [--option value ...]")
     print("\nGroups & Commands:")
     print("  db reset         : 요리/레시피/재료 관련 DB 데이터를 모두 삭제합니다.")
     print("  db import_all    : 모든 데이터를 DB로 가져옵니다.")
-    print("  es delete_index  : Elasticsearch의 'dishes' 인덱스를 삭제합니다.")
-    print("  es create_index  : Elasticsearch에 'dishes' 인덱스를 생성합니다.")
-    print("  es reindex       : DB의 모든 요리/레시피 데이터를 Elasticsearch에 재색인합니다.")
+    print("                     --bulk              레시피를 배치 단위 다중 행 INSERT로 적재")
+    print("                     --batch-size N      --bulk 배치 크기 (기본 1000)")
+    print("                     --workers N         --bulk 시 CSV 파싱 프로세스 수 (파일당 1개, 기본 1)")
+    print("                     --queue-size N      파싱 워커 → DB writer 큐 크기 (기본 64청크)")
+    print("                     --resume            마지막 체크포인트(배치 커밋마다 저장)부터 레시피 적재 재개")
+    print("                     --chunk-size N      마스터 재료/요리 설명 upsert 문장당 행 수 (기본 1000)")
+    print("                     --aliases PATH      재료 별칭 테이블 JSON (기본 /data/재료/aliases.json)")
+    print("                     --dish-synonyms     요리 이름 동의어 사전(synonym-set.txt)도 재료 별칭으로 사용")
+    print("                     --dedup flag|merge  같은 dish 안의 거의 같은 레시피를 표시(duplicate_of_id)하거나 삭제")
+    print("                     --dedup-threshold F 중복으로 볼 유사도 (기본 0.8)")
+    print("  db import_incremental : 바뀐 파일/행만 반영하고, 변경된 dish/recipe id를 파일로 남깁니다.")
+    print("                     --changes-out PATH  변경 id 파일 경로 (기본 /data/import_changes.json)")
+    print("                     --dedup flag|merge  레시피가 바뀐 dish 만 중복 정리")
+    print("  db dedup_recipes : 전체 레시피에 --dedup 정리를 실행합니다 (기본 flag). ES는 es sync_changes 로 반영")
+    print("  db generate_synthetic : 부하 측정용 합성 데이터셋(Zipf 분포)을 같은 파일 형식으로 만듭니다.")
+    print("                     --out PATH          출력 폴더 (기본 /data/synthetic)")
+    print("                     --recipes N --dishes N --ingredients N --files N  크기 (기본 10000/500/2000/4)")
+    print("                     --zipf S --seed N   분포 기울기(기본 1.1), 난수 시드(기본 42)")
+    print("                     FRIDGE_DATA_PATH 환경변수로 임포트 데이터 폴더를 바꿀 수 있습니다.")
+    print("  db refresh_search_docs : 검색 문서 뷰(search_documents)를 REFRESH ... CONCURRENTLY 로 갱신합니다.")
+    print("  db export_search_docs  : 검색 문서 뷰를 COPY 로 파일에 내보냅니다.")
+    print("                     --format csv|ndjson 출력 형식 (기본 csv)")
+    print("                     --out PATH          출력 경로 (기본 /data/search_documents.<format>)")
+    print("\n공통 옵션:")
+    print("  --profile          단계별 wall time/행 수/DB 왕복/읽은 바이트를 JSON 리포트로 저장")
+    print("  --profile-out PATH 리포트 경로 (기본 /data/profiles/profile_<group>_<command>_<시각>.json)")
+    print("")
+    print("  es delete_index  : Elasticsearch의 'dishes' 인덱스(모든 버전)를 삭제합니다.")
+    print("  es create_index  : 'dishes_v1' 인덱스를 만들고 'dishes' 별칭을 붙입니다.")
+    print("                     --index-profile default|performance  매핑/설정 프로필 (기본 ES_INDEX_PROFILE 또는 default)")
+    print("                     --shards N --replicas N  샤드/레플리카 수 (기본 ES_NUMBER_OF_SHARDS/ES_NUMBER_OF_REPLICAS)")
+    print("  es reindex       : 새 버전 인덱스에 재색인한 뒤 'dishes' 별칭을 옮깁니다 (무중단).")
+    print("                     --batch-size N      DB keyset 페이지 크기 (기본 1000)")
+    print("                     --bulk-size N       bulk 요청당 최대 문서 수 (기본 2000)")
+    print("                     --chunk-mb N        bulk 요청당 최대 크기 MB (기본 5)")
+    print("                     --concurrency N     동시에 보내는 bulk 요청 수 (기본 4)")
+    print("                     --index-profile default|performance  새 인덱스의 매핑/설정 프로필")
+    print("                     --shards N --replicas N  새 인덱스의 샤드/레플리카 수 (문서는 dish_id 로 라우팅)")
+    print("                     --source tables|view 원본 테이블(기본) 또는 search_documents 뷰(갱신 후)에서 읽기")
+    print("                     --hierarchy PATH    재료 계층 부모 맵 JSON (기본 /data/재료/hierarchy.json, 없으면 category 만)")
+    print("                     --keep N            남겨둘 dishes_vN 버전 수 (기본 3)")
+    print("                     --force             색인 실패 문서가 있어도 별칭 전환")
+    print("  es outbox_worker : search_outbox 이벤트를 받아 바뀐 레시피 문서만 계속 색인합니다.")
+    print("                     --once              쌓인 이벤트만 처리하고 종료")
+    print("                     --interval S        비었을 때 대기 시간 (기본 1초)")
+    print("  es rollback      : 'dishes' 별칭을 직전 버전 인덱스로 되돌립니다. (--version N 으로 지정 가능)")
+    print("  es benchmark_profiles : default/performance 프로필로 임시 인덱스를 만들어 색인 시간/크기/검색 지연을 비교합니다.")
+    print("                     --queries N         프로필마다 재는 검색 수 (기본 200) --seed N 질의 난수 시드")
+    print("                     --source tables|view --out PATH --keep-indices  (임시 인덱스를 지우지 않음)")
+    print("                     --ing-mode RATIO|CORE 검색에 쓸 재료 모드 (기본 RATIO, CORE 는 기본 재료 제외)")
+    print("  es benchmark_layouts : recipe(레시피 문서 + collapse) / dish(dish 문서 + nested recipes) 레이아웃을 같은 방식으로 비교합니다.")
+    print("                     --index-profile default|performance 와 위 benchmark_profiles 옵션을 함께 사용")
+    print("                     실제 레이아웃은 ES_INDEX_LAYOUT=recipe|dish 환경변수로 정합니다 (api/search_sync/재색인 공통).")
+    print("  es snapshot      : 'dishes' 별칭의 인덱스를 스냅샷 저장소(elasticsearch_snapshots 볼륨)에 저장합니다.")
+    print("                     --name NAME         스냅샷 이름 (기본 dishes-<UTC 시각>)")
+    print("  es snapshots     : 저장된 스냅샷 목록을 출력합니다.")
+    print("  es restore       : 스냅샷을 새 버전 인덱스로 복원하고 'dishes' 별칭을 옮깁니다 (DB 불필요).")
+    print("                     --snapshot NAME     복원할 스냅샷 (기본: 가장 최근 성공본)")
+    print("                     --keep N            남겨둘 dishes_vN 버전 수 (기본 3)")
+    print("  es reload_synonyms : 동의어 파일을 검사하고 라이브 인덱스의 검색 분석기를 다시 읽힙니다 (재색인 없음).")
+    print("                     --check TEXT        리로드 후 TEXT 를 검색 분석기로 분석해 토큰을 출력")
+    print("                     검색 결과 캐시(Redis search:generation)도 무효화합니다. 사용자 사전 변경은 es reindex 필요")
+    print("  es sync_changes  : 증분 임포트의 변경 id 파일에 있는 레시피 문서만 재색인합니다.")
+    print("                     --changes PATH      변경 id 파일 경로 (기본 /data/import_changes.json)")
     # ========================
 
+def parse_options(args: list) -> dict:
+    """'--name value' / '--name=value' / '--flag' 형태의 옵션을 dict로 변환합니다."""
+    options, i = {}, 0
+    while i < len(args):
+        arg = args[i]
+        if arg.startswith("--"):
+            key, sep, value = arg[2:].partition("=")
+            if sep:
+                options[key] = value
+            elif i + 1 < len(args) and not args[i + 1].startswith("--"):
+                options[key] = args[i + 1]
+                i += 1
+            else:
+                options[key] = True
+        i += 1
+    return options
+
 async def main():
     if len(sys.argv) < 3:
         print_usage()
         return
 
     group, command = sys.argv[1], sys.argv[2]
+    options = parse_options(sys.argv[3:])
 
     manager = None
     try:
         if group == "db":
-            manager = DBManager()
+            manager = DBManager(options)
         elif group == "es":
-            manager = ESManager()
+            manager = ESManager(options)
         else:
             print(f"알 수 없는 명령어 그룹입니다: {group}")
             print_usage()
             return
         
+        manager.profiler.label = f"{group} {command}"
         await manager.__aenter__()
         await manager.run(command)
     finally:
@@ -0,0 +1,220 @@
+# importer/bulk.py
+"""파싱된 레시피 행을 set-based 로 dishes / recipes / recipe_ingredients 에 기록합니다."""
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import delete, func, insert, literal_column, or_, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+
+import models
+from importer.parsing import ParsedRow
+
+BatchHook = Callable[[List[Tuple[ParsedRow, int]]], None]
+
+RECIPE_COLUMNS = (
+    "name", "title", "difficulty", "cooking_time",
+    "instructions", "youtube_url", "thumbnail_url",
+)
+
+
+class BulkRecipeWriter:
+    """
+    레시피를 배치로 모아 한 트랜잭션에 다중 행 INSERT 로 씁니다.
+    - dish/재료 이름 → id 맵은 실행당 한 번만 읽고, 이후에는 새로 만든 항목만 맵에 추가합니다.
+    - add(parsed, recipe_id=...) 로 기존 레시피를 넘기면 INSERT 대신 UPDATE 후 재료 연결을 다시 씁니다.
+    - batch_hooks 는 [(parsed, recipe_id), ...] 를 받아 commit 직전, 같은 트랜잭션 안에서 호출됩니다.
+    - 배치 쓰기가 실패하면 롤백한 뒤 같은 배치를 행 단위로 다시 써서 문제 행을 보고합니다.
+    """
+
+    def __init__(self, db: Session, batch_size: int = 1000, batch_hooks: Optional[List[BatchHook]] = None):
+        self.db = db
+        self.batch_size = batch_size
+        self.batch_hooks: List[BatchHook] = list(batch_hooks or [])
+        self.dish_ids: Dict[str, int] = dict(self.db.execute(select(models.Dish.name, models.Dish.id)).all())
+        self.ingredient_ids: Dict[str, int] = dict(
+            self.db.execute(select(models.Ingredient.name, models.Ingredient.id)).all()
+        )
+        self.written = 0
+        self.failed = 0
+        # 커밋까지 끝난 레시피/dish id (ES 부분 동기화 대상)
+        self.written_recipe_ids: Set[int] = set()
+        self.written_dish_ids: Set[int] = set()
+        self.failed_sources: Set[str] = set()  # 쓰기 실패 행이 있었던 파일 이름
+        self._pending: List[Tuple[ParsedRow, Optional[int]]] = []
+        # 아직 커밋되지 않은 트랜잭션에서 새로 만든 이름 (롤백 시 맵에서 제거)
+        self._uncommitted: List[tuple] = []
+
+    def add(self, parsed: ParsedRow, recipe_id: Optional[int] = None) -> None:
+        self._pending.append((parsed, recipe_id))
+        if len(self._pending) >= self.batch_size:
+            self.flush()
+
+    def flush(self) -> None:
+        batch, self._pending = self._pending, []
+        if not batch:
+            return
+        try:
+            results = self._write_batch(batch)
+            self._commit(results)
+        except Exception as e:
+            self._rollback()
+            print(f"  - ⚠️ 배치 쓰기 실패, 행 단위로 다시 시도합니다: {e}")
+            for item in batch:
+                try:
+                    results = self._write_batch([item])
+                    self._commit(results)
+                except Exception as row_error:
+                    self._rollback()
+                    self.failed += 1
+                    parsed = item[0]
+                    self.failed_sources.add(parsed.source_file)
+                    print(f"  - ❌ {parsed.source_file} {parsed.row_no}행 쓰기 실패: {row_error}")
+
+    # --- 내부 구현 ---
+    def _commit(self, results: List[Tuple[ParsedRow, int]]) -> None:
+        self.db.commit()
+        self._uncommitted.clear()
+        self.written += len(results)
+        for parsed, recipe_id in results:
+            self.written_recipe_ids.add(recipe_id)
+            self.written_dish_ids.add(self.dish_ids[parsed.record["dish_name"]])
+
+    def _rollback(self) -> None:
+        self.db.rollback()
+        for cache, name in self._uncommitted:
+            cache.pop(name, None)
+        self._uncommitted.clear()
+
+    def _recipe_values(self, record: dict) -> dict:
+        return {"dish_id": self.dish_ids[record["dish_name"]], **{col: record[col] for col in RECIPE_COLUMNS}}
+
+    def _write_batch(self, batch: List[Tuple[ParsedRow, Optional[int]]]) -> List[Tuple[ParsedRow, int]]:
+        records = [parsed.record for parsed, _ in batch]
+        self._ensure_names(models.Dish, self.dish_ids, (r["dish_name"] for r in records), announce=True)
+        self._ensure_names(
+            models.Ingredient, self.ingredient_ids,
+            (name for r in records for name, _, _ in r["ingredients"]),
+        )
+
+        new_items = [(parsed, rid) for parsed, rid in batch if rid is None]
+        existing_items = [(parsed, rid) for parsed, rid in batch if rid is not None]
+
+        results: List[Tuple[ParsedRow, int]] = []
+        if new_items:
+            new_ids = self.db.scalars(
+                insert(models.Recipe).returning(models.Recipe.id, sort_by_parameter_order=True),
+                [self._recipe_values(parsed.record) for parsed, _ in new_items],
+            ).all()
+            results.extend(zip((parsed for parsed, _ in new_items), new_ids))
+
+        if existing_items:
+            existing_ids = [rid for _, rid in existing_items]
+            self.db.execute(
+                update(models.Recipe),
+                [{"id": rid, **self._recipe_values(parsed.record)} for parsed, rid in existing_items],
+            )
+            self.db.execute(
+                delete(models.RecipeIngredient).where(models.RecipeIngredient.recipe_id.in_(existing_ids))
+            )
+            results.extend(existing_items)
+
+        links = [
+            {
+                "recipe_id": recipe_id,
+                "ingredient_id": self.ingredient_ids[name],
+                "quantity_display": quantity,
+                "raw_name": raw_name,
+            }
+            for parsed, recipe_id in results
+            for name, quantity, raw_name in parsed.record["ingredients"]
+        ]
+        if links:
+            self.db.execute(insert(models.RecipeIngredient), links)
+
+        for hook in self.batch_hooks:
+            hook(results)
+        return results
+
+    def _ensure_names(self, model, cache: Dict[str, int], names: Iterable[str], *, announce: bool = False) -> None:
+        """맵에 없는 이름만 INSERT ... ON CONFLICT DO NOTHING RETURNING 으로 한 번에 만듭니다."""
+        missing = sorted({name for name in names if name not in cache})
+        if not missing:
+            return
+
+        stmt = (
+            pg_insert(model)
+            .values([{"name": name} for name in missing])
+            .on_conflict_do_nothing(index_elements=["name"])
+            .returning(model.name, model.id)
+        )
+        inserted = dict(self.db.execute(stmt).all())
+        if announce:
+            for name in inserted:
+                print(f"  - ✨ Dish '{name}'이(가) 없어 새로 추가합니다.")
+
+        # 다른 프로세스가 먼저 만든 이름은 RETURNING 에 나오지 않으므로 한 번 더 조회
+        resolved = dict(inserted)
+        remaining = [name for name in missing if name not in inserted]
+        if remaining:
+            resolved.update(self.db.execute(select(model.name, model.id).where(model.name.in_(remaining))).all())
+
+        for name, new_id in resolved.items():
+            cache[name] = new_id
+            self._uncommitted.append((cache, name))
+
+
+def _chunks(items: list, size: int):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def upsert_ingredients(db: Session, entries: List[dict], chunk_size: int = 1000) -> Tuple[int, int]:
+    """
+    마스터 재료를 chunk_size 개씩 INSERT ... ON CONFLICT (name) DO UPDATE 로 반영합니다.
+    category/storage_type 이 실제로 바뀐 행만 갱신하고, JSON 값이 비어 있으면 기존 값을 유지합니다.
+    반환: (추가 건수, 갱신 건수). commit은 호출하는 쪽에서 합니다.
+    """
+    rows = list({e["name"]: e for e in entries if e.get("name")}.values())  # 같은 이름은 마지막 값 사용
+    inserted = updated = 0
+    for chunk in _chunks(rows, chunk_size):
+        stmt = pg_insert(models.Ingredient).values([
+            {"name": e["name"], "category": e.get("category"), "storage_type": e.get("storage_type")}
+            for e in chunk
+        ])
+        new_category = func.coalesce(stmt.excluded.category, models.Ingredient.category)
+        new_storage = func.coalesce(stmt.excluded.storage_type, models.Ingredient.storage_type)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["name"],
+            set_={"category": new_category, "storage_type": new_storage},
+            where=or_(
+                models.Ingredient.category.is_distinct_from(new_category),
+                models.Ingredient.storage_type.is_distinct_from(new_storage),
+            ),
+        ).returning(literal_column("xmax = 0"))  # 새로 INSERT 된 행이면 true
+        for (is_insert,) in db.execute(stmt):
+            if is_insert:
+                inserted += 1
+            else:
+                updated += 1
+    return inserted, updated
+
+
+def upsert_dishes(db: Session, descriptions: Dict[str, str], chunk_size: int = 1000) -> Tuple[List[int], List[int]]:
+    """
+    요리 설명을 chunk_size 개씩 INSERT ... ON CONFLICT (name) DO UPDATE 로 반영합니다.
+    semantic_description 이 바뀐 Dish만 갱신합니다. 반환: (추가된 id 목록, 갱신된 id 목록).
+    """
+    rows = [{"name": name, "semantic_description": desc} for name, desc in descriptions.items() if name]
+    inserted_ids: List[int] = []
+    updated_ids: List[int] = []
+    for chunk in _chunks(rows, chunk_size):
+        stmt = pg_insert(models.Dish).values(chunk)
+        new_description = func.coalesce(stmt.excluded.semantic_description, models.Dish.semantic_description)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["name"],
+            set_={"semantic_description": new_description, "updated_at": func.now()},
+            where=models.Dish.semantic_description.is_distinct_from(new_description),
+        ).returning(models.Dish.id, literal_column("xmax = 0"))
+        for dish_id, is_insert in db.execute(stmt):
+            (inserted_ids if is_insert else updated_ids).append(dish_id)
+    return inserted_ids, updated_ids
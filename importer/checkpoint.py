@@ -0,0 +1,65 @@
+# importer/checkpoint.py
+"""레시피 벌크 임포트의 파일별 진행 위치 (import_checkpoints 테이블)."""
+from typing import Dict, Iterable, List, Tuple
+
+from sqlalchemy import delete, func, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+
+import models
+from importer.parsing import ParsedRow
+
+
+class ImportCheckpointStore:
+    """
+    배치가 커밋될 때마다 파일별 마지막 행 번호를 같은 트랜잭션에 기록합니다.
+    데이터와 체크포인트가 함께 커밋되거나 함께 롤백되므로, --resume 은 체크포인트 다음 행부터 이어가면 됩니다.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def load(self) -> Dict[str, Tuple[int, bool]]:
+        """{파일 이름: (row_offset, completed)}"""
+        rows = self.db.execute(
+            select(
+                models.ImportCheckpoint.source_file,
+                models.ImportCheckpoint.row_offset,
+                models.ImportCheckpoint.completed,
+            )
+        ).all()
+        return {source: (offset, completed) for source, offset, completed in rows}
+
+    def reset(self) -> None:
+        self.db.execute(delete(models.ImportCheckpoint))
+        self.db.commit()
+
+    def on_batch(self, results: List[Tuple[ParsedRow, int]]) -> None:
+        """BulkRecipeWriter 훅: 배치에 포함된 파일별 최대 행 번호로 체크포인트를 올립니다."""
+        offsets: Dict[str, int] = {}
+        for parsed, _ in results:
+            offsets[parsed.source_file] = max(offsets.get(parsed.source_file, 0), parsed.row_no)
+        if offsets:
+            self._upsert([{"source_file": f, "row_offset": o, "completed": False} for f, o in offsets.items()])
+
+    def mark_completed(self, filenames: Iterable[str], row_counts: Dict[str, int]) -> None:
+        entries = [
+            {"source_file": name, "row_offset": row_counts.get(name, 0), "completed": True}
+            for name in filenames
+        ]
+        if entries:
+            self._upsert(entries)
+        self.db.commit()
+
+    def _upsert(self, entries: List[dict]) -> None:
+        stmt = pg_insert(models.ImportCheckpoint).values(entries)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["source_file"],
+            set_={
+                # 행 단위 재시도 등으로 순서가 섞여도 체크포인트가 뒤로 가지 않도록 합니다.
+                "row_offset": func.greatest(models.ImportCheckpoint.row_offset, stmt.excluded.row_offset),
+                "completed": stmt.excluded.completed,
+                "updated_at": func.now(),
+            },
+        )
+        self.db.execute(stmt)
@@ -0,0 +1,182 @@
+# importer/dedup.py
+"""같은 dish 안의 거의 같은 레시피를 MinHash/LSH 로 찾아 표시(flag)하거나 합칩니다(merge)."""
+import hashlib
+import random
+import re
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence, Set, Tuple
+
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.orm import Session
+
+import models
+from importer.bulk import _chunks
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 64) - 1
+_TOKEN_RE = re.compile(r"\w+")
+
+
+def recipe_shingles(title: Optional[str], ingredients: Iterable[str]) -> Set[str]:
+    """재료 이름 집합 + 제목 토큰. 회차 번호 같은 숫자만 있는 토큰은 뺍니다."""
+    tokens = {f"i:{name}" for name in ingredients if name}
+    tokens.update(f"t:{tok}" for tok in _TOKEN_RE.findall((title or "").lower()) if not tok.isdigit())
+    return tokens
+
+
+class MinHasher:
+    """num_perm 개의 (a*x + b) mod p 해시로 MinHash 시그니처를 만듭니다. 같은 seed면 같은 시그니처."""
+
+    def __init__(self, num_perm: int = 32, seed: int = 1):
+        rng = random.Random(seed)
+        self.num_perm = num_perm
+        self._perms = [(rng.randrange(1, _MERSENNE_PRIME), rng.randrange(0, _MERSENNE_PRIME)) for _ in range(num_perm)]
+
+    @staticmethod
+    def _token_hash(token: str) -> int:
+        return int.from_bytes(hashlib.blake2b(token.encode("utf-8"), digest_size=8).digest(), "big")
+
+    def signature(self, tokens: Iterable[str]) -> Tuple[int, ...]:
+        hashes = [self._token_hash(t) for t in tokens]
+        if not hashes:
+            return (_MAX_HASH,) * self.num_perm
+        return tuple(min((a * h + b) % _MERSENNE_PRIME for h in hashes) for a, b in self._perms)
+
+
+def estimated_jaccard(sig_a: Sequence[int], sig_b: Sequence[int]) -> float:
+    return sum(1 for x, y in zip(sig_a, sig_b) if x == y) / len(sig_a)
+
+
+class NearDuplicateIndex:
+    """
+    dish 하나 안의 LSH 인덱스. 시그니처를 bands 개 구간으로 나눠 한 구간이라도 같으면 후보로 보고,
+    추정 Jaccard 가 threshold 이상인 대표 레시피가 있으면 그 id를 돌려줍니다. 없으면 새 대표로 등록합니다.
+    """
+
+    def __init__(self, hasher: MinHasher, threshold: float = 0.8, bands: int = 8):
+        if hasher.num_perm % bands:
+            raise ValueError("num_perm 은 bands 의 배수여야 합니다.")
+        self.hasher = hasher
+        self.threshold = threshold
+        self.bands = bands
+        self._rows = hasher.num_perm // bands
+        self._buckets: Dict[Tuple[int, Tuple[int, ...]], List[int]] = {}
+        self._signatures: Dict[int, Tuple[int, ...]] = {}
+
+    def find_or_add(self, recipe_id: int, tokens: Set[str]) -> Optional[int]:
+        signature = self.hasher.signature(tokens)
+        keys = [(band, signature[band * self._rows:(band + 1) * self._rows]) for band in range(self.bands)]
+
+        best_id, best_score = None, self.threshold
+        for key in keys:
+            for candidate in self._buckets.get(key, ()):
+                score = estimated_jaccard(signature, self._signatures[candidate])
+                if score >= best_score and (best_id is None or score > best_score or candidate < best_id):
+                    best_id, best_score = candidate, score
+        if best_id is not None:
+            return best_id
+
+        self._signatures[recipe_id] = signature
+        for key in keys:
+            self._buckets.setdefault(key, []).append(recipe_id)
+        return None
+
+
+class DedupResult(NamedTuple):
+    duplicates: Dict[int, int]          # {중복 recipe_id: 대표 recipe_id}
+    removed_docs: List[Tuple[int, int]]  # ES에서 빼야 할 (dish_id, recipe_id)
+    restored_ids: List[int]              # 중복 표시가 풀려 다시 색인해야 할 recipe_id
+
+
+def find_near_duplicates(
+    rows: Iterable[Tuple[int, int, Optional[str], Sequence[str]]],
+    *,
+    threshold: float = 0.8,
+    num_perm: int = 32,
+    bands: int = 8,
+) -> Dict[int, Tuple[int, int]]:
+    """
+    rows: dish_id, recipe_id 순으로 정렬된 (dish_id, recipe_id, title, 재료 이름들).
+    반환: {중복 recipe_id: (dish_id, 대표 recipe_id)}. 대표는 묶음에서 가장 먼저(작은 id) 나온 레시피입니다.
+    """
+    hasher = MinHasher(num_perm)
+    duplicates: Dict[int, Tuple[int, int]] = {}
+    current_dish, index = None, None
+    for dish_id, recipe_id, title, ingredients in rows:
+        if dish_id != current_dish:
+            current_dish, index = dish_id, NearDuplicateIndex(hasher, threshold, bands)
+        canonical = index.find_or_add(recipe_id, recipe_shingles(title, ingredients))
+        if canonical is not None:
+            duplicates[recipe_id] = (dish_id, canonical)
+    return duplicates
+
+
+def apply_near_duplicates(
+    db: Session,
+    *,
+    mode: str = "flag",
+    threshold: float = 0.8,
+    dish_ids: Optional[Iterable[int]] = None,
+    num_perm: int = 32,
+    bands: int = 8,
+) -> DedupResult:
+    """
+    DB의 레시피(dish_ids 가 주어지면 그 dish만)를 dish 단위로 훑어 거의 같은 레시피를 처리합니다.
+    - flag : recipes.duplicate_of_id 에 대표 id를 기록 (대상 dish의 기존 표시는 다시 계산)
+    - merge: 중복 레시피와 재료 연결을 지우고, 매니페스트 행은 recipe_id 를 비워 둠(tombstone).
+             증분 임포트는 그 행을 건너뛰므로, 원본 행이 바뀌어도 대표 레시피를 덮어쓰거나 중복을 다시 만들지 않음
+    commit은 호출하는 쪽에서 합니다.
+    """
+    if mode not in ("flag", "merge"):
+        raise ValueError(f"알 수 없는 dedup 모드입니다: {mode}")
+
+    scope = []
+    if dish_ids is not None:
+        dish_ids = sorted(set(dish_ids))
+        if not dish_ids:
+            return DedupResult({}, [], [])
+        scope.append(models.Recipe.dish_id.in_(dish_ids))
+
+    stmt = (
+        select(
+            models.Recipe.dish_id,
+            models.Recipe.id,
+            models.Recipe.title,
+            func.array_remove(func.array_agg(models.Ingredient.name), None),
+        )
+        .outerjoin(models.RecipeIngredient, models.RecipeIngredient.recipe_id == models.Recipe.id)
+        .outerjoin(models.Ingredient, models.Ingredient.id == models.RecipeIngredient.ingredient_id)
+        .where(*scope)
+        .group_by(models.Recipe.id)
+        .order_by(models.Recipe.dish_id, models.Recipe.id)
+        .execution_options(yield_per=5000)
+    )
+    found = find_near_duplicates(db.execute(stmt), threshold=threshold, num_perm=num_perm, bands=bands)
+    duplicates = {recipe_id: canonical for recipe_id, (_, canonical) in found.items()}
+    removed_docs = [(dish_id, recipe_id) for recipe_id, (dish_id, _) in found.items()]
+
+    if mode == "flag":
+        # 이번에 다시 표시되지 않는 레시피는 검색 문서를 되살려야 하므로 기존 표시를 먼저 읽어 둠
+        flagged = set(db.scalars(select(models.Recipe.id).where(*scope, models.Recipe.duplicate_of_id.is_not(None))))
+        db.execute(
+            update(models.Recipe)
+            .where(*scope, models.Recipe.duplicate_of_id.is_not(None))
+            .values(duplicate_of_id=None)
+        )
+        if duplicates:
+            db.execute(
+                update(models.Recipe),
+                [{"id": recipe_id, "duplicate_of_id": canonical} for recipe_id, canonical in duplicates.items()],
+            )
+        return DedupResult(duplicates, removed_docs, sorted(flagged - set(duplicates)))
+
+    restored: Set[int] = set()
+    for ids in _chunks(list(duplicates), 1000):
+        db.execute(
+            update(models.ImportManifest).where(models.ImportManifest.recipe_id.in_(ids)).values(recipe_id=None)
+        )
+        # 지우는 레시피를 대표로 가리키던 (예전 flag) 표시는 풀리므로 다시 색인 대상
+        restored.update(db.scalars(select(models.Recipe.id).where(models.Recipe.duplicate_of_id.in_(ids))))
+        db.execute(update(models.Recipe).where(models.Recipe.duplicate_of_id.in_(ids)).values(duplicate_of_id=None))
+        db.execute(delete(models.RecipeIngredient).where(models.RecipeIngredient.recipe_id.in_(ids)))
+        db.execute(delete(models.Recipe).where(models.Recipe.id.in_(ids)))
+    return DedupResult(duplicates, removed_docs, sorted(restored - set(duplicates)))
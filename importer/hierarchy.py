@@ -0,0 +1,79 @@
+# importer/hierarchy.py
+"""
+재료 계층 (예: 삼겹살 → 돼지고기 → 육류). 색인 시점에 레시피 재료를 넓혀 두면 검색 쿼리는 그대로입니다 (DB 의존성 없음).
+"""
+import json
+import os
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+
+class IngredientHierarchy:
+    """
+    자식 → 부모 재료 맵.
+    1) 직접 정리한 부모 맵 (parents.json: {"부모": ["자식", ...]}) 이 우선
+    2) 부모가 정해지지 않은 재료는 Ingredient.category 를 부모로 둠
+    expand() 는 레시피 재료마다 '그 재료 자리에 쓸 수 있는' 이름, 즉 자신과 계층에서 그 아래에 있는 재료를 모읍니다.
+    ('돼지고기' 레시피 → 돼지고기, 삼겹살, 목살 ... → 냉장고의 '삼겹살' 로도 맞음)
+    """
+
+    def __init__(self, parents: Optional[Dict[str, str]] = None):
+        self.parents: Dict[str, str] = {}
+        self._children: Dict[str, Set[str]] = {}
+        self._descendants: Dict[str, Tuple[str, ...]] = {}
+        for child, parent in (parents or {}).items():
+            self.add_parent(child, parent)
+
+    def add_parent(self, child: str, parent: str) -> bool:
+        """child 의 부모를 parent 로 둡니다. 이미 부모가 있거나 순환이 생기면 무시하고 False."""
+        child, parent = (child or "").strip(), (parent or "").strip()
+        if not child or not parent or child in self.parents or child in self.ancestors(parent, include_self=True):
+            return False
+        self.parents[child] = parent
+        self._children.setdefault(parent, set()).add(child)
+        self._descendants.clear()
+        return True
+
+    @classmethod
+    def from_sources(
+        cls,
+        categories: Iterable[Tuple[str, Optional[str]]] = (),
+        parent_path: Optional[str] = None,
+    ) -> "IngredientHierarchy":
+        """
+        - categories: (재료 이름, category) 쌍 (DB ingredients 테이블)
+        - parent_path: {"부모": ["자식", ...]} JSON. 없는 파일은 건너뜁니다.
+        """
+        hierarchy = cls()
+        if parent_path and os.path.exists(parent_path):
+            with open(parent_path, "r", encoding="utf-8") as f:
+                for parent, children in json.load(f).items():
+                    for child in children:
+                        hierarchy.add_parent(child, parent)
+        for name, category in categories:
+            if category and name != category:
+                hierarchy.add_parent(name, category)
+        return hierarchy
+
+    def ancestors(self, name: str, include_self: bool = False) -> List[str]:
+        chain = [name] if include_self else []
+        while name in self.parents:
+            name = self.parents[name]
+            chain.append(name)
+        return chain
+
+    def descendants(self, name: str) -> Tuple[str, ...]:
+        if name not in self._descendants:
+            found, stack = [], sorted(self._children.get(name, ()))
+            while stack:
+                child = stack.pop()
+                found.append(child)
+                stack.extend(sorted(self._children.get(child, ())))
+            self._descendants[name] = tuple(sorted(found))
+        return self._descendants[name]
+
+    def expand(self, names: Iterable[str]) -> List[str]:
+        """레시피 재료 이름들 + 각 재료의 하위 재료 (중복 제거, 입력 순서 → 하위 재료 순)."""
+        expanded = dict.fromkeys(name for name in names if name)
+        for name in list(expanded):
+            expanded.update(dict.fromkeys(self.descendants(name)))
+        return list(expanded)
@@ -0,0 +1,134 @@
+# importer/manifest.py
+"""증분 임포트용 내용 해시 매니페스트 (import_manifest 테이블)."""
+import hashlib
+import json
+import os
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import func, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+
+import models
+from importer.parsing import ParsedRow, iter_recipe_rows
+
+FILE_ROW_KEY = ""  # 파일 단위 항목의 row_key
+
+
+def file_hash(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def record_hash(record: Dict[str, Any]) -> str:
+    payload = json.dumps(record, ensure_ascii=False, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def record_key(record: Dict[str, Any]) -> str:
+    """행 순서가 바뀌어도 유지되는 레시피 식별 키. 원본 URL이 없으면 dish/이름/제목을 조합합니다."""
+    return record.get("youtube_url") or f"{record['dish_name']}|{record['name']}|{record['title']}"
+
+
+class ImportManifestStore:
+    """
+    파일/행 해시를 읽고 씁니다. commit은 호출하는 쪽의 트랜잭션에 맡깁니다.
+    - file_changed(): 파일 해시가 매니페스트와 다르면 True
+    - annotate(): 행의 키/해시를 계산해 붙이고, BulkRecipeWriter 배치 훅(on_batch)에서 recipe_id와 함께 기록
+    """
+
+    def __init__(self, db: Session, base_path: str):
+        self.db = db
+        self.base_path = base_path
+        self._file_hashes: Dict[str, str] = {}
+        self._key_counts: Dict[Tuple[str, str], int] = {}
+
+    def source_name(self, path: str) -> str:
+        return os.path.relpath(path, self.base_path)
+
+    # --- 파일 단위 ---
+    def file_changed(self, path: str) -> bool:
+        source = self.source_name(path)
+        current = self._file_hashes.setdefault(source, file_hash(path))
+        stored = self.db.execute(
+            select(models.ImportManifest.content_hash).where(
+                models.ImportManifest.source_file == source,
+                models.ImportManifest.row_key == FILE_ROW_KEY,
+            )
+        ).scalar_one_or_none()
+        return stored != current
+
+    def mark_file(self, path: str) -> None:
+        source = self.source_name(path)
+        current = self._file_hashes.get(source) or file_hash(path)
+        self._upsert([{"source_file": source, "row_key": FILE_ROW_KEY, "content_hash": current, "recipe_id": None}])
+
+    # --- 행 단위 ---
+    def row_entries(self, path: str) -> Dict[str, Tuple[str, Optional[int]]]:
+        """{row_key: (content_hash, recipe_id)}. recipe_id 가 None 이면 dedup merge 로 지운 중복 행 (다시 쓰지 않음)"""
+        rows = self.db.execute(
+            select(
+                models.ImportManifest.row_key,
+                models.ImportManifest.content_hash,
+                models.ImportManifest.recipe_id,
+            ).where(
+                models.ImportManifest.source_file == self.source_name(path),
+                models.ImportManifest.row_key != FILE_ROW_KEY,
+            )
+        ).all()
+        return {key: (content_hash, recipe_id) for key, content_hash, recipe_id in rows}
+
+    def annotate(self, source_dir: str, parsed: ParsedRow) -> ParsedRow:
+        """
+        행에 매니페스트 키/해시를 붙여 돌려줍니다 (parsed.meta).
+        같은 파일 안에서 키가 겹치면 '#2', '#3'을 붙여 구분합니다.
+        """
+        source = self.source_name(os.path.join(source_dir, parsed.source_file))
+        base_key = record_key(parsed.record)
+        seen = self._key_counts.get((source, base_key), 0)
+        self._key_counts[(source, base_key)] = seen + 1
+        meta = {
+            "source_file": source,
+            "row_key": base_key if seen == 0 else f"{base_key}#{seen + 1}",
+            "content_hash": record_hash(parsed.record),
+        }
+        return parsed._replace(meta=meta)
+
+    def replay_keys(self, source_dir: str, path: str, row_offset: int) -> int:
+        """
+        --resume 으로 건너뛰는 row_offset 행까지의 키만 다시 셉니다. 재개 뒤 붙는 '#N' 이 끊김 없는 임포트와 같아집니다.
+        파싱 오류 행은 적재 때도 세지 않았으므로 건너뜁니다. 반환: 센 행 수
+        """
+        counted = 0
+        for parsed in iter_recipe_rows(path):
+            if parsed.row_no > row_offset:
+                break
+            if parsed.error is None:
+                self.annotate(source_dir, parsed)
+                counted += 1
+        return counted
+
+    def on_batch(self, results: List[Tuple[ParsedRow, int]]) -> None:
+        """BulkRecipeWriter 훅: 배치와 같은 트랜잭션에서 행 해시와 recipe_id를 기록합니다."""
+        entries = [
+            {**parsed.meta, "recipe_id": recipe_id}
+            for parsed, recipe_id in results
+            if parsed.meta
+        ]
+        if entries:
+            self._upsert(entries)
+
+    def _upsert(self, entries: List[Dict[str, Any]]) -> None:
+        stmt = pg_insert(models.ImportManifest).values(entries)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["source_file", "row_key"],
+            set_={
+                "content_hash": stmt.excluded.content_hash,
+                "recipe_id": stmt.excluded.recipe_id,
+                "updated_at": func.now(),
+            },
+        )
+        self.db.execute(stmt)
@@ -0,0 +1,103 @@
+# importer/normalize.py
+"""레시피 원본 재료 문자열을 대표(canonical) 재료 이름으로 바꿉니다 (DB 의존성 없음)."""
+import json
+import os
+import re
+from typing import Dict, Iterable, Optional
+
+# 재료 이름 뒤에 붙어 오는 수량/단위 (예: "대파 1대", "돼지고기300g", "설탕 1/2 큰술")
+# 단위 없는 숫자는 띄어 쓴 경우만 수량으로 봅니다 ("재료0", "비타민B1" 은 유지).
+_UNITS = r"kg|g|ml|l|cc|개|대|쪽|톨|알|장|줌|컵|큰술|작은술|스푼|숟가락|T|t|모|봉지|봉|팩|캔|마리|포기|근|줄기|뿌리|꼬집|인분"
+_NUMBER = r"\d+(?:[./]\d+)?"
+_QUANTITY_RE = re.compile(
+    rf"(?:{_NUMBER}\s*(?:{_UNITS})|(?<!\S){_NUMBER})(?![^\W\d_])",
+    re.IGNORECASE,
+)
+_BRACKET_RE = re.compile(r"[(\[{（【].*?[)\]}）】]")
+_NOISE_WORDS = {"약간", "적당량", "조금", "소량", "적당히", "약", "반개", "한줌", "한개", "선택", "기호에", "따라"}
+_SPACE_RE = re.compile(r"\s+")
+
+
+def clean_ingredient_name(raw: str) -> str:
+    """괄호 설명, 수량/단위, '약간' 같은 분량 표현을 걷어내고 공백을 정리합니다."""
+    name = _BRACKET_RE.sub(" ", raw or "")
+    name = _QUANTITY_RE.sub(" ", name)
+    tokens = [t for t in _SPACE_RE.split(name.strip(" ,.-~:")) if t and t not in _NOISE_WORDS]
+    return " ".join(tokens)
+
+
+class IngredientNormalizer:
+    """
+    원본 재료 문자열 → 대표 재료 이름.
+    1) clean_ingredient_name 으로 수량/괄호 제거
+    2) 별칭 테이블 → 재료 동의어 사전(각 줄의 첫 단어가 대표) 순으로 찾고, 공백을 뺀 형태로도 한 번 더 찾음
+       (요리 이름 동의어 사전을 재료에 쓰면 '떡볶이떡 → 떡볶이' 처럼 재료가 요리 이름으로 합쳐지므로 기본으로는 쓰지 않음)
+    3) 사용자 사전에 복합어로 등록된 이름은 띄어 써도 붙여 쓴 형태로 통일
+    사전에 없는 이름은 정리된 문자열을 그대로 씁니다. 프로세스 풀로 넘길 수 있도록 dict 만 들고 있습니다.
+    """
+
+    def __init__(self, aliases: Optional[Dict[str, str]] = None, compounds: Iterable[str] = ()):
+        self.aliases: Dict[str, str] = {}
+        self.compounds = {word.replace(" ", "") for word in compounds}
+        for alias, canonical in (aliases or {}).items():
+            self.add_alias(alias, canonical)
+
+    def add_alias(self, alias: str, canonical: str) -> None:
+        alias, canonical = alias.strip(), canonical.strip()
+        if alias and canonical:
+            self.aliases.setdefault(alias, canonical)
+            self.aliases.setdefault(alias.replace(" ", ""), canonical)
+
+    @classmethod
+    def from_files(
+        cls,
+        synonym_paths: Iterable[str] = (),
+        userdict_path: Optional[str] = None,
+        alias_path: Optional[str] = None,
+    ) -> "IngredientNormalizer":
+        """
+        - alias_path: {"대표 이름": ["별칭", ...]} JSON. 동의어 사전보다 먼저 적용
+        - synonym_paths: ES synonym 형식 ("a, b, c" 또는 "a, b => c") 파일들. 앞 파일이 우선
+        - userdict_path: nori 사용자 사전 ("복합어 분해1 분해2")
+        없는 파일은 건너뜁니다.
+        """
+        normalizer = cls()
+        if alias_path and os.path.exists(alias_path):
+            with open(alias_path, "r", encoding="utf-8") as f:
+                for canonical, aliases in json.load(f).items():
+                    normalizer.add_alias(canonical, canonical)
+                    for alias in aliases:
+                        normalizer.add_alias(alias, canonical)
+        for synonym_path in synonym_paths:
+            if not synonym_path or not os.path.exists(synonym_path):
+                continue
+            with open(synonym_path, "r", encoding="utf-8") as f:
+                for line in f:
+                    line = line.strip()
+                    if not line or line.startswith("#"):
+                        continue
+                    if "=>" in line:
+                        left, right = line.split("=>", 1)
+                        canonical = right.split(",")[0]
+                        terms = left.split(",")
+                    else:
+                        terms = line.split(",")
+                        canonical = terms[0]
+                    for term in terms:
+                        normalizer.add_alias(term, canonical)
+        if userdict_path and os.path.exists(userdict_path):
+            with open(userdict_path, "r", encoding="utf-8") as f:
+                normalizer.compounds.update(
+                    line.split()[0] for line in f if line.strip() and not line.startswith("#")
+                )
+        return normalizer
+
+    def canonical(self, raw: str) -> str:
+        name = clean_ingredient_name(raw)
+        if not name:
+            return ""
+        compact = name.replace(" ", "")
+        for key in (name, compact, name.lower(), compact.lower()):
+            if key in self.aliases:
+                return self.aliases[key]
+        return compact if compact in self.compounds else name
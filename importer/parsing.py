@@ -0,0 +1,99 @@
+# importer/parsing.py
+"""'레시피 모음' CSV 행을 DB에 쓰기 좋은 형태로 정규화합니다 (DB 의존성 없음)."""
+import csv
+import json
+import os
+from typing import TYPE_CHECKING, Any, Dict, Iterator, NamedTuple, Optional
+
+if TYPE_CHECKING:
+    from importer.normalize import IngredientNormalizer
+
+
+class RowParseError(ValueError):
+    """CSV 한 행을 레시피로 해석할 수 없을 때 발생합니다. 메시지는 그대로 출력됩니다."""
+
+
+class ParsedRow(NamedTuple):
+    source_file: str
+    row_no: int                         # 헤더를 제외한 1부터 시작하는 데이터 행 번호
+    record: Optional[Dict[str, Any]]    # 정상 파싱 시 정규화된 레코드
+    error: Optional[str] = None         # 파싱 실패 시 출력용 메시지
+    meta: Optional[Dict[str, Any]] = None  # 매니페스트 키/해시 등 writer 훅이 참고하는 부가 정보
+
+
+def _to_int(value: Optional[str]) -> Optional[int]:
+    return int(value) if value and value.isdigit() else None
+
+
+def parse_recipe_row(row: Dict[str, str], normalizer: Optional["IngredientNormalizer"] = None) -> Dict[str, Any]:
+    """
+    CSV 한 행(row["data"]의 JSON 포함)을 정규화된 레코드로 변환합니다.
+    - dish 이름은 JSON 내부 category → CSV category 컬럼 순으로 사용
+    - 재료는 (이름, 수량, 원본 이름) 목록. normalizer 가 있으면 이름을 대표 재료로 바꾸고,
+      바뀐 이름 기준으로 중복 제거 (먼저 나온 수량을 유지)
+    모양이 어긋난 행(짧은 행, 객체가 아닌 JSON, 문자열 재료 등)도 RowParseError 로 바꿔 그 행만 건너뛰게 합니다.
+    """
+    try:
+        return _parse_recipe_row(row, normalizer)
+    except RowParseError:
+        raise
+    except (TypeError, AttributeError, KeyError, ValueError) as e:
+        raise RowParseError(f"❌ 레시피 형식 오류 ({type(e).__name__}: {e}): {row}")
+
+
+def _parse_recipe_row(row: Dict[str, str], normalizer: Optional["IngredientNormalizer"]) -> Dict[str, Any]:
+    try:
+        recipe_data = json.loads(row["data"])
+    except json.JSONDecodeError:
+        raise RowParseError(f"❌ JSON 파싱 오류: {row.get('data')}")
+
+    dish_category = recipe_data.get("category")
+    if not dish_category or not dish_category.strip():
+        dish_category = row.get("category")
+
+    recipe_name = row.get("dish_name")
+
+    if not dish_category or not dish_category.strip():
+        raise RowParseError(f"⚠️ 'category'가 없어 건너뜁니다: {row}")
+    if not recipe_name or not recipe_name.strip():
+        raise RowParseError(f"⚠️ 'dish_name'이 없어 건너뜁니다: {row}")
+
+    ingredients = []
+    seen = set()
+    for ing_data in recipe_data.get("ingredients", []):
+        raw_name = (ing_data.get("name") or "").strip()
+        ing_name = normalizer.canonical(raw_name) if normalizer else raw_name
+        if not ing_name or ing_name in seen:
+            continue
+        seen.add(ing_name)
+        ingredients.append((ing_name, ing_data.get("quantity"), raw_name))
+
+    return {
+        "dish_name": dish_category.strip(),
+        "name": recipe_name.strip(),
+        "title": recipe_data.get("title", ""),
+        "difficulty": _to_int(row.get("difficulty")),
+        "cooking_time": _to_int(row.get("cooking_time")),
+        "instructions": recipe_data.get("recipe", []),
+        "youtube_url": recipe_data.get("url"),
+        "thumbnail_url": recipe_data.get("image_url"),
+        "ingredients": ingredients,
+    }
+
+
+def iter_recipe_rows(
+    path: str, skip_rows: int = 0, normalizer: Optional["IngredientNormalizer"] = None
+) -> Iterator[ParsedRow]:
+    """
+    CSV 파일을 한 행씩 읽어 ParsedRow로 돌려줍니다. 파싱 오류도 행 단위로 전달합니다.
+    skip_rows 이하 번호의 행은 JSON 파싱 없이 건너뜁니다 (체크포인트 재개용).
+    """
+    filename = os.path.basename(path)
+    with open(path, "r", encoding="utf-8") as f:
+        for row_no, row in enumerate(csv.DictReader(f), start=1):
+            if row_no <= skip_rows:
+                continue
+            try:
+                yield ParsedRow(filename, row_no, parse_recipe_row(row, normalizer))
+            except RowParseError as e:
+                yield ParsedRow(filename, row_no, None, str(e))
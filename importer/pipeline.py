@@ -0,0 +1,95 @@
+# importer/pipeline.py
+"""CSV/JSON 파싱을 프로세스 풀에서 돌리고, 결과를 bounded 큐로 단일 DB writer에 흘려보냅니다."""
+import multiprocessing
+import os
+import queue
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, Iterator, List, Optional
+
+from importer.normalize import IngredientNormalizer
+from importer.parsing import ParsedRow, iter_recipe_rows
+
+FileDoneCallback = Callable[[str, int], None]
+
+_FILE_DONE = "__file_done__"
+
+
+def _parse_file_into_queue(
+    path: str, out_queue, chunk_rows: int, skip_rows: int = 0, normalizer: Optional[IngredientNormalizer] = None
+) -> int:
+    """워커 프로세스: 파일 하나를 파싱해 chunk_rows 개씩 묶어 큐에 넣고, 끝나면 완료 표시를 보냅니다."""
+    chunk: List[ParsedRow] = []
+    count = 0
+    for parsed in iter_recipe_rows(path, skip_rows, normalizer):
+        chunk.append(parsed)
+        count += 1
+        if len(chunk) >= chunk_rows:
+            out_queue.put(chunk)  # 큐가 가득 차면 writer가 따라올 때까지 대기 (backpressure)
+            chunk = []
+    if chunk:
+        out_queue.put(chunk)
+    out_queue.put((_FILE_DONE, os.path.basename(path), count))
+    return count
+
+
+def iter_parsed_rows(
+    paths: List[str],
+    *,
+    workers: int = 1,
+    queue_size: int = 64,
+    chunk_rows: int = 500,
+    on_file_done: Optional[FileDoneCallback] = None,
+    skip_rows: Optional[Dict[str, int]] = None,
+    normalizer: Optional[IngredientNormalizer] = None,
+) -> Iterator[ParsedRow]:
+    """
+    레시피 CSV 파일들을 파싱한 ParsedRow를 순서대로 돌려줍니다.
+    - workers <= 1: 현재 프로세스에서 파일 순서대로 파싱
+    - workers > 1: 파일 하나당 워커 하나. 같은 파일 안의 행 순서는 유지되지만 파일끼리는 섞일 수 있음
+    - skip_rows: {파일 이름: 행 번호} 이하의 행은 건너뜀 (체크포인트 재개)
+    - normalizer: 재료 이름 정규화기. 워커 프로세스마다 pickle 로 한 번씩 전달됨
+    """
+    skip_rows = skip_rows or {}
+    if workers <= 1 or len(paths) <= 1:
+        for path in paths:
+            count = 0
+            for parsed in iter_recipe_rows(path, skip_rows.get(os.path.basename(path), 0), normalizer):
+                count += 1
+                yield parsed
+            if on_file_done:
+                on_file_done(os.path.basename(path), count)
+        return
+
+    with multiprocessing.Manager() as manager:
+        out_queue = manager.Queue(maxsize=queue_size)
+        with ProcessPoolExecutor(max_workers=min(workers, len(paths))) as pool:
+            futures = [
+                pool.submit(_parse_file_into_queue, path, out_queue, chunk_rows,
+                            skip_rows.get(os.path.basename(path), 0), normalizer)
+                for path in paths
+            ]
+            remaining = len(futures)
+            try:
+                while remaining:
+                    try:
+                        item = out_queue.get(timeout=1.0)
+                    except queue.Empty:
+                        for future in futures:
+                            if future.done() and future.exception():
+                                raise future.exception()
+                        continue
+                    if isinstance(item, tuple) and item[0] == _FILE_DONE:
+                        remaining -= 1
+                        if on_file_done:
+                            on_file_done(item[1], item[2])
+                        continue
+                    yield from item
+            finally:
+                # 소비가 중간에 끝나도 워커가 put()에서 영원히 막히지 않도록 큐를 비워줍니다.
+                for future in futures:
+                    future.cancel()
+                while not all(future.done() for future in futures):
+                    try:
+                        out_queue.get(timeout=0.1)
+                    except queue.Empty:
+                        pass
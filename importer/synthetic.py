@@ -0,0 +1,110 @@
+# importer/synthetic.py
+"""부하 측정용 가짜 데이터셋 생성기. '레시피 모음' CSV / '요리 설명' / '재료' JSON을 실제와 같은 형식으로 씁니다."""
+import csv
+import itertools
+import json
+import os
+import random
+from typing import Dict, List
+
+_BASE_INGREDIENTS = [
+    "대파", "양파", "마늘", "간장", "설탕", "소금", "참기름", "고춧가루", "돼지고기", "계란",
+    "김치", "두부", "감자", "당근", "애호박", "고추장", "된장", "소고기", "닭고기", "버섯",
+    "청양고추", "식용유", "후추", "양배추", "콩나물", "시금치", "떡", "어묵", "우유", "버터",
+    "밀가루", "생강", "깨", "멸치", "다시마", "새우", "오징어", "무", "배추", "쌀",
+]
+_BASE_DISHES = [
+    "김치찌개", "된장찌개", "부대찌개", "제육볶음", "불고기", "계란말이", "떡볶이", "잡채", "비빔밥", "김치볶음밥",
+    "카레라이스", "된장국", "미역국", "닭볶음탕", "감자조림", "어묵볶음", "콩나물국", "순두부찌개", "오므라이스", "짜장면",
+]
+_CATEGORIES = ["채소", "육류", "양념", "해산물", "유제품", "곡류", "가공식품"]
+_STORAGE_TYPES = ["냉장", "냉동", "실온"]
+_QUANTITIES = ["1개", "1/2개", "1대", "2큰술", "1작은술", "200g", "300g", "약간", "1컵", "적당량"]
+
+
+def _names(base: List[str], count: int) -> List[str]:
+    """base 를 먼저 쓰고, 모자라면 '대파2', '대파3' 처럼 번호를 붙여 count 개를 만듭니다 (순위 = 인기 순)."""
+    names = base[:count]
+    for n in itertools.count(2):
+        if len(names) >= count:
+            break
+        names.extend(f"{name}{n}" for name in base[:count - len(names)])
+    return names
+
+
+def _zipf_cum_weights(count: int, s: float) -> List[float]:
+    """순위 k 의 가중치가 1/k^s 인 누적 가중치 (random.choices 용)."""
+    return list(itertools.accumulate(1.0 / (rank ** s) for rank in range(1, count + 1)))
+
+
+def generate_catalog(
+    out_dir: str,
+    *,
+    recipes: int = 10000,
+    dishes: int = 500,
+    ingredients: int = 2000,
+    files: int = 4,
+    zipf_s: float = 1.1,
+    seed: int = 42,
+) -> Dict[str, int]:
+    """
+    out_dir 아래에 '레시피 모음/*.csv', '요리 설명/descriptions.json', '재료/ingredients.json' 을 씁니다.
+    - dish / 재료 선택은 Zipf 분포 (소수의 인기 dish·재료에 레시피가 몰림)
+    - 같은 seed 와 크기면 항상 같은 파일이 나옵니다.
+    반환: 파일별로 쓴 행 수 등 요약
+    """
+    rng = random.Random(seed)
+    dish_names = _names(_BASE_DISHES, dishes)
+    ingredient_names = _names(_BASE_INGREDIENTS, ingredients)
+    dish_weights = _zipf_cum_weights(len(dish_names), zipf_s)
+    ingredient_weights = _zipf_cum_weights(len(ingredient_names), zipf_s)
+
+    recipe_dir = os.path.join(out_dir, "레시피 모음")
+    description_dir = os.path.join(out_dir, "요리 설명")
+    ingredient_dir = os.path.join(out_dir, "재료")
+    for path in (recipe_dir, description_dir, ingredient_dir):
+        os.makedirs(path, exist_ok=True)
+
+    with open(os.path.join(ingredient_dir, "ingredients.json"), "w", encoding="utf-8") as f:
+        json.dump([
+            {"name": name, "category": _CATEGORIES[i % len(_CATEGORIES)],
+             "storage_type": _STORAGE_TYPES[i % len(_STORAGE_TYPES)]}
+            for i, name in enumerate(ingredient_names)
+        ], f, ensure_ascii=False)
+
+    with open(os.path.join(description_dir, "descriptions.json"), "w", encoding="utf-8") as f:
+        json.dump({name: f"{name}: 집에서 쉽게 만드는 요리 ({i}번)" for i, name in enumerate(dish_names)},
+                  f, ensure_ascii=False)
+
+    files = max(1, min(files, recipes or 1))
+    per_file, remainder = divmod(recipes, files)
+    recipe_no = 0
+    for file_no in range(files):
+        file_rows = per_file + (1 if file_no < remainder else 0)
+        path = os.path.join(recipe_dir, f"recipes_{file_no:03d}.csv")
+        with open(path, "w", encoding="utf-8", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=["data", "category", "dish_name", "difficulty", "cooking_time"])
+            writer.writeheader()
+            for _ in range(file_rows):
+                dish = rng.choices(dish_names, cum_weights=dish_weights)[0]
+                picked = dict.fromkeys(
+                    rng.choices(ingredient_names, cum_weights=ingredient_weights, k=rng.randint(3, 15))
+                )
+                data = {
+                    "category": dish,
+                    "title": f"{dish} 레시피 {recipe_no}",
+                    "recipe": [f"{step}단계: 재료를 손질하고 조리합니다." for step in range(1, rng.randint(3, 8))],
+                    "url": f"https://www.youtube.com/watch?v=syn{recipe_no:09d}",
+                    "image_url": f"https://img.example.com/syn{recipe_no:09d}.jpg",
+                    "ingredients": [{"name": name, "quantity": rng.choice(_QUANTITIES)} for name in picked],
+                }
+                writer.writerow({
+                    "data": json.dumps(data, ensure_ascii=False),
+                    "category": dish,
+                    "dish_name": f"{dish} {recipe_no}",
+                    "difficulty": rng.randint(1, 5),
+                    "cooking_time": rng.randrange(10, 125, 5),
+                })
+                recipe_no += 1
+
+    return {"recipes": recipe_no, "dishes": len(dish_names), "ingredients": len(ingredient_names), "files": files}
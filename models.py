@@ -1,8 +1,8 @@
 # /backend/models.py (최종 수정안)
 
 from sqlalchemy import (
-    Column, Integer, String, Date, ForeignKey, Boolean, Text, DateTime,
-    func
+    Column, Integer, String, Date, ForeignKey, Boolean, Text, DateTime, Index,
+    MetaData, Table, func
 )
 from sqlalchemy.orm import relationship
 from sqlalchemy.dialects.postgresql import ARRAY,JSONB
@@ -14,6 +14,7 @@ class RecipeIngredient(Base):
     recipe_id = Column(Integer, ForeignKey("recipes.id"), primary_key=True)
     ingredient_id = Column(Integer, ForeignKey("ingredients.id"), primary_key=True)
     quantity_display = Column(String) # e.g., "300g", "1/2개"
+    raw_name = Column(String, nullable=True) # 정규화 전 원본 재료 이름, e.g., "대파 1대"
 
     ingredient = relationship("Ingredient")
 
@@ -55,7 +56,7 @@ class Dish(Base):
 class Recipe(Base):
     __tablename__ = "recipes"
     id = Column(Integer, primary_key=True, index=True)
-    dish_id = Column(Integer, ForeignKey("dishes.id"), nullable=False)
+    dish_id = Column(Integer, ForeignKey("dishes.id"), nullable=False, index=True)
     name = Column(String, nullable=False)
     title = Column(String, nullable=False)
     difficulty = Column(Integer)
@@ -64,6 +65,7 @@ class Recipe(Base):
     instructions = Column(JSONB, nullable=False)
     youtube_url = Column(String, nullable=True)
     thumbnail_url = Column(String, nullable=True)
+    duplicate_of_id = Column(Integer, ForeignKey("recipes.id"), nullable=True, index=True) # 거의 같은 대표 레시피 (dedup flag)
     created_at = Column(DateTime, server_default=func.now(), nullable=False)
     updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now(), nullable=False)
 
@@ -82,4 +84,61 @@ class UserIngredient(Base):
     expiration_date = Column(Date)
     
     owner = relationship("User", back_populates="ingredients")
-    ingredient = relationship("Ingredient")
\ No newline at end of file
+    ingredient = relationship("Ingredient")
+
+
+# --- 임포트 관리 테이블 ---
+class ImportManifest(Base):
+    """원본 파일/행의 내용 해시. 증분 임포트가 바뀐 파일과 행만 다시 쓰도록 합니다."""
+    __tablename__ = "import_manifest"
+    source_file = Column(String, primary_key=True)  # 데이터 폴더 기준 상대 경로
+    row_key = Column(String, primary_key=True)      # 파일 단위 항목은 빈 문자열
+    content_hash = Column(String, nullable=False)
+    recipe_id = Column(Integer, ForeignKey("recipes.id"), nullable=True)
+    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now(), nullable=False)
+
+
+class ImportCheckpoint(Base):
+    """레시피 임포트 진행 위치. 데이터와 같은 트랜잭션에서 갱신되어 --resume 의 기준이 됩니다."""
+    __tablename__ = "import_checkpoints"
+    source_file = Column(String, primary_key=True)            # '레시피 모음' 안의 파일 이름
+    row_offset = Column(Integer, nullable=False, default=0)   # 커밋까지 끝난 마지막 데이터 행 번호
+    completed = Column(Boolean, nullable=False, default=False)
+    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now(), nullable=False)
+
+
+# --- 검색 동기화 ---
+class SearchOutbox(Base):
+    """
+    레시피 쓰기와 같은 트랜잭션에 남기는 ES 동기화 이벤트 (transactional outbox).
+    es outbox_worker 가 처리 후 processed_at 을 채우고, 재색인은 시작 이후 이벤트를 새 인덱스에 다시 반영합니다.
+    """
+    __tablename__ = "search_outbox"
+    id = Column(Integer, primary_key=True)
+    dish_id = Column(Integer, nullable=False)
+    recipe_id = Column(Integer, nullable=True)  # 비어 있으면 dish 의 모든 레시피
+    created_at = Column(DateTime, server_default=func.now(), nullable=False, index=True)
+    processed_at = Column(DateTime, nullable=True)
+
+    __table_args__ = (
+        Index("ix_search_outbox_pending", "id", postgresql_where=processed_at.is_(None)),
+    )
+
+
+# --- 검색 문서 읽기 모델 (materialized view) ---
+# alembic 마이그레이션이 만드는 뷰라서 Base.metadata 와 분리해 둡니다 (create_all 이 테이블로 만들지 않도록).
+search_documents = Table(
+    "search_documents",
+    MetaData(),
+    Column("doc_id", String, primary_key=True),  # "{dish_id}_{recipe_id}" = ES 문서 _id
+    Column("dish_id", Integer),
+    Column("dish_name", String),
+    Column("description", Text),
+    Column("recipe_id", Integer),
+    Column("recipe_title", String),
+    Column("recipe_name", String),
+    Column("thumbnail_url", String),
+    Column("cooking_time", Integer),
+    Column("difficulty", Integer),
+    Column("ingredients", ARRAY(String)),  # 재료가 없으면 빈 배열
+)
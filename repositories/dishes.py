@@ -1,8 +1,10 @@
 # /backend/repositories/dishes.py
 
-from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import select, distinct, text
+from typing import Iterator
+from sqlalchemy.orm import Session, joinedload, selectinload
+from sqlalchemy import select, distinct, text, func
 import models
+from repositories.outbox import OutboxRepository
 from schemas.dish import DishCreate, RecipeCreate
 from fastapi import HTTPException
 
@@ -55,6 +57,9 @@ class DishRepository:
                         quantity_display=ing_info.quantity_display
                     )
                     self.db.add(db_recipe_ingredient)
+
+            # 4. 검색 동기화 이벤트를 같은 트랜잭션에 기록 (es outbox_worker 가 색인)
+            OutboxRepository(self.db).enqueue(db_dish.id)
             
             self.db.commit()
 
@@ -106,6 +111,9 @@ class DishRepository:
                     quantity_display=ing_info.quantity_display
                 )
                 self.db.add(db_recipe_ingredient)
+
+            # 검색 동기화 이벤트를 같은 트랜잭션에 기록 (es outbox_worker 가 색인)
+            OutboxRepository(self.db).enqueue(dish_id, [db_recipe.id])
             
             self.db.commit()
 
@@ -153,14 +161,107 @@ class DishRepository:
             .joinedload(models.RecipeIngredient.ingredient)
         ).filter(models.Dish.id.in_(dish_ids)).all()
         
-    def get_recipes_by_ids_ordered(self, recipe_ids: list[int]) -> list[models.Recipe]:
+    def get_recipe_ids_by_dish_ids(self, dish_ids: list[int]) -> list[int]:
+        if not dish_ids:
+            return []
+        stmt = select(models.Recipe.id).where(models.Recipe.dish_id.in_(dish_ids)).order_by(models.Recipe.id)
+        return self.db.execute(stmt).scalars().all()
+
+    def get_recipes_with_dish(self, recipe_ids: list[int]) -> list[models.Recipe]:
+        """색인 문서 생성용: 레시피와 소속 Dish, 재료 이름을 한 번에 가져옵니다."""
+        if not recipe_ids:
+            return []
+        return self.db.query(models.Recipe).options(
+            joinedload(models.Recipe.dish),
+            joinedload(models.Recipe.ingredients).joinedload(models.RecipeIngredient.ingredient)
+        ).filter(models.Recipe.id.in_(recipe_ids)).all()
+
+    def get_dish_ids_by_recipe_ids(self, recipe_ids: list[int]) -> list[int]:
+        if not recipe_ids:
+            return []
+        stmt = select(distinct(models.Recipe.dish_id)).where(models.Recipe.id.in_(recipe_ids))
+        return self.db.execute(stmt).scalars().all()
+
+    def _search_rows_stmt(self):
+        """
+        색인용 가벼운 projection (ORM 객체 없음). 각 행: dish_id, dish_name, description, recipe_id,
+        recipe_title, recipe_name, ingredients(이름 배열, 재료가 없으면 None), 카드 표시용 thumbnail_url/cooking_time/difficulty.
+        dedup 으로 표시된 중복 레시피는 제외합니다.
+        """
+        ingredient_names = (
+            select(func.array_agg(models.Ingredient.name))
+            .join(models.RecipeIngredient, models.RecipeIngredient.ingredient_id == models.Ingredient.id)
+            .where(models.RecipeIngredient.recipe_id == models.Recipe.id)
+            .correlate(models.Recipe)
+            .scalar_subquery()
+        )
+        return (
+            select(
+                models.Dish.id.label("dish_id"),
+                models.Dish.name.label("dish_name"),
+                models.Dish.semantic_description.label("description"),
+                models.Recipe.id.label("recipe_id"),
+                models.Recipe.title.label("recipe_title"),
+                models.Recipe.name.label("recipe_name"),
+                ingredient_names.label("ingredients"),
+                models.Recipe.thumbnail_url,
+                models.Recipe.cooking_time,
+                models.Recipe.difficulty,
+            )
+            .join(models.Dish, models.Dish.id == models.Recipe.dish_id)
+            .where(models.Recipe.duplicate_of_id.is_(None))
+        )
+
+    def iter_search_rows(self, batch_size: int = 1000, after_recipe_id: int = 0) -> Iterator[list]:
+        """_search_rows_stmt 행을 recipe.id 기준 keyset 페이지로 돌려줍니다 (OFFSET 없음)."""
+        stmt = self._search_rows_stmt().order_by(models.Recipe.id).limit(batch_size)
+        last_id = after_recipe_id
+        while True:
+            rows = self.db.execute(stmt.where(models.Recipe.id > last_id)).mappings().all()
+            if not rows:
+                return
+            yield rows
+            last_id = rows[-1]["recipe_id"]
+
+    def iter_search_rows_by_dish(self, batch_size: int = 1000) -> Iterator[list]:
+        """
+        _search_rows_stmt 행을 dish_id, recipe_id 순으로 한 번의 서버 측 커서에서 batch_size 씩 흘려보냅니다.
+        dish 단위 문서(nested 레이아웃)를 만들 때 사용합니다. 한 dish 의 행이 두 묶음에 걸칠 수 있습니다.
+        """
+        stmt = (
+            self._search_rows_stmt()
+            .order_by(models.Recipe.dish_id, models.Recipe.id)
+            .execution_options(yield_per=batch_size)
+        )
+        yield from self.db.execute(stmt).mappings().partitions()
+
+    def get_search_rows_by_dish_ids(self, dish_ids: list[int]) -> list:
+        """주어진 dish 들의 _search_rows_stmt 행 (dish_id, recipe_id 순)."""
+        if not dish_ids:
+            return []
+        stmt = (
+            self._search_rows_stmt()
+            .where(models.Recipe.dish_id.in_(dish_ids))
+            .order_by(models.Recipe.dish_id, models.Recipe.id)
+        )
+        return self.db.execute(stmt).mappings().all()
+
+    def get_recipes_by_ids_ordered(self, recipe_ids: list[int], detail: str = "full") -> list[models.Recipe]:
+        """
+        recipe_ids 순서대로 한 번의 쿼리로 읽습니다.
+        detail="summary" 는 카드용 컬럼만 읽고 재료는 조인하지 않습니다 (나머지 속성은 읽지 않은 상태).
+        """
         if not recipe_ids:
             return []
-        stmt = text("""
-            SELECT r.*
+        columns = "r.*" if detail == "full" else "r.id, r.dish_id, r.title, r.difficulty, r.cooking_time, r.thumbnail_url"
+        stmt = text(f"""
+            SELECT {columns}
             FROM unnest(:recipe_ids) WITH ORDINALITY AS u(id, ord)
             JOIN recipes AS r ON r.id = u.id
             ORDER BY u.ord
         """)
-        orm_stmt = (select(models.Recipe).from_statement(stmt).params(recipe_ids=recipe_ids).options(joinedload(models.Recipe.ingredients).joinedload(models.RecipeIngredient.ingredient)))
+        orm_stmt = select(models.Recipe).from_statement(stmt).params(recipe_ids=recipe_ids)
+        if detail == "full":
+            # from_statement 에는 joinedload 조인이 붙지 않아 레시피마다 지연 로딩됨 → 재료는 IN 쿼리 한 번으로
+            orm_stmt = orm_stmt.options(selectinload(models.Recipe.ingredients).joinedload(models.RecipeIngredient.ingredient))
         return self.db.execute(orm_stmt).unique().scalars().all()
\ No newline at end of file
@@ -4,7 +4,9 @@ from sqlalchemy.orm import Session
 import models
 from schemas import ingredient
 from fastapi import FastAPI, HTTPException
-from typing import List
+from typing import List, Optional, Tuple
+
+from search_client import INGREDIENT_NORMALIZER
 
 class IngredientRepository:
     def __init__(self, db: Session):
@@ -19,6 +21,10 @@ class IngredientRepository:
             self.db.flush() # DB에 임시 반영하여 id를 얻지만, 트랜잭션은 커밋하지 않음
         return db_ingredient
 
+    def get_categories(self) -> List[Tuple[str, Optional[str]]]:
+        """(재료 이름, category) 목록. 색인 시 재료 계층을 만드는 데 씁니다."""
+        return self.db.query(models.Ingredient.name, models.Ingredient.category).all()
+
     def add_ingredients_to_user(
         self, user_id: int, ingredients_data: List[ingredient.UserIngredientCreate]
     ) -> List[models.UserIngredient]:
@@ -28,8 +34,9 @@ class IngredientRepository:
         created_ingredients = []
         try:
             for ingredient_data in ingredients_data:
-                # 1. 재료 가져오거나 생성
-                db_ingredient = self.get_or_create(name=ingredient_data.ingredient_name)
+                # 1. 재료 가져오거나 생성 (레시피 재료와 맞도록 대표 이름으로: '달걀' → '계란')
+                name = INGREDIENT_NORMALIZER.canonical(ingredient_data.ingredient_name) or ingredient_data.ingredient_name
+                db_ingredient = self.get_or_create(name=name)
 
                 # 2. 사용자 재료 모델 생성
                 db_user_ingredient = models.UserIngredient(
@@ -0,0 +1,67 @@
+# /backend/repositories/outbox.py
+
+from datetime import datetime, timedelta
+from typing import Iterable, List, Optional, Tuple
+
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.orm import Session
+
+import models
+
+
+class OutboxRepository:
+    """search_outbox 이벤트를 쓰고(쓰기 경로) 가져가는(동기화 워커) 쪽. commit 은 호출하는 쪽에서 합니다."""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def enqueue(self, dish_id: int, recipe_ids: Optional[Iterable[int]] = None) -> None:
+        """레시피별 이벤트를 남깁니다. recipe_ids 가 없으면 dish 전체 이벤트 하나를 남깁니다."""
+        recipe_ids = list(recipe_ids or [])
+        if not recipe_ids:
+            self.db.add(models.SearchOutbox(dish_id=dish_id))
+            return
+        self.db.add_all(models.SearchOutbox(dish_id=dish_id, recipe_id=rid) for rid in recipe_ids)
+
+    def claim_batch(self, limit: int = 500) -> List[models.SearchOutbox]:
+        """
+        아직 처리되지 않은 이벤트를 오래된 순으로 잠그고 가져옵니다.
+        FOR UPDATE SKIP LOCKED 라서 워커를 여러 개 띄워도 같은 이벤트를 두 번 가져가지 않습니다.
+        """
+        stmt = (
+            select(models.SearchOutbox)
+            .where(models.SearchOutbox.processed_at.is_(None))
+            .order_by(models.SearchOutbox.id)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        return self.db.execute(stmt).scalars().all()
+
+    def mark_processed(self, event_ids: List[int]) -> None:
+        if event_ids:
+            self.db.execute(
+                update(models.SearchOutbox)
+                .where(models.SearchOutbox.id.in_(event_ids))
+                .values(processed_at=func.now())
+            )
+
+    def touched_since(self, since: datetime) -> Tuple[List[int], List[int]]:
+        """since 이후 이벤트가 가리키는 (dish 전체 이벤트의 dish_id 목록, recipe_id 목록). 재색인 후 재반영용."""
+        rows = self.db.execute(
+            select(models.SearchOutbox.dish_id, models.SearchOutbox.recipe_id)
+            .where(models.SearchOutbox.created_at >= since)
+            .distinct()
+        ).all()
+        dish_ids = sorted({dish_id for dish_id, recipe_id in rows if recipe_id is None})
+        recipe_ids = sorted({recipe_id for _, recipe_id in rows if recipe_id is not None})
+        return dish_ids, recipe_ids
+
+    def prune(self, retention: timedelta) -> int:
+        """처리가 끝난 지 retention 보다 오래된 이벤트를 지웁니다 (DB 시계 기준)."""
+        result = self.db.execute(
+            delete(models.SearchOutbox).where(
+                models.SearchOutbox.processed_at.is_not(None),
+                models.SearchOutbox.processed_at < func.now() - retention,
+            )
+        )
+        return result.rowcount
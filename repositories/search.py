@@ -1,41 +1,118 @@
 # /backend/repositories/search.py
+import asyncio
+import base64
+import hashlib
+import json
 import logging
-from typing import List, Dict, Any, Optional
-from elasticsearch import AsyncElasticsearch
+from typing import List, Dict, Any, Optional, AsyncIterable, Tuple
+from elasticsearch import AsyncElasticsearch, ApiError, NotFoundError
 from elasticsearch.helpers import async_bulk
 
-from search_client import DISHES_INDEX_NAME
+from search_client import (
+    DISHES_INDEX_NAME, INDEX_LAYOUT, INDEX_LAYOUTS, STAPLE_INGREDIENTS, CARD_FIELDS, PIT_KEEP_ALIVE,
+    canonical_ingredients,
+)
 
 logger = logging.getLogger(__name__)
 
+# 텍스트 검색 대상 필드와 가중치 (dish 레이아웃에서는 레시피 필드가 recipes.* nested 아래에 있음)
+DISH_TEXT_FIELDS = ["dish_name^4", "description^1.6"]
+RECIPE_TEXT_FIELDS = ["recipe_title^2.5", "recipe_name^2.5", "ingredients.tok^2"]
+
+def _core_ingredients(names: List[str]) -> List[str]:
+    return [name for name in names if name not in STAPLE_INGREDIENTS]
+
+def is_missing_pit(error: NotFoundError) -> bool:
+    """커서의 point-in-time 이 만료/닫혀서 난 404 인지 (인덱스/별칭이 없어서 난 404 와 구분)."""
+    return "search_context_missing_exception" in json.dumps(error.body, default=str)
+
+def _card(
+    recipe_title: Optional[str],
+    ingredients: List[str],
+    thumbnail_url: Optional[str],
+    cooking_time: Optional[int],
+    difficulty: Optional[int],
+) -> Dict[str, Any]:
+    """검색 결과 카드에 바로 그릴 레시피 필드 (ES_CARD_FIELDS)."""
+    return {
+        "title": recipe_title or "",
+        "thumbnail_url": thumbnail_url,
+        "cooking_time": cooking_time,
+        "difficulty": difficulty,
+        "ingredient_count": len(ingredients),
+    }
+
+def _nested_recipe(r: Dict[str, Any]) -> Dict[str, Any]:
+    expanded = r.get("ingredients_expanded") or r.get("ingredients") or []
+    recipe = {
+        "recipe_id": r["recipe_id"],
+        "recipe_title": r.get("recipe_title") or "",
+        "recipe_name": r.get("recipe_name") or "",
+        "ingredients": r.get("ingredients") or [],
+        "ingredients_expanded": expanded,
+        "core_ingredients": _core_ingredients(expanded),
+    }
+    if CARD_FIELDS:
+        recipe["card"] = _card(
+            r.get("recipe_title"), recipe["ingredients"],
+            r.get("thumbnail_url"), r.get("cooking_time"), r.get("difficulty"),
+        )
+    return recipe
+
+def _recipe_card(inner_hit: Dict[str, Any], recipe_id: int) -> Dict[str, Any]:
+    return {"recipe_id": recipe_id, **(inner_hit.get("_source") or {}).get("card", {})}
+
 class SearchRepository:
-    def __init__(self, es_client: AsyncElasticsearch):
+    def __init__(
+        self,
+        es_client: AsyncElasticsearch,
+        index: str = DISHES_INDEX_NAME,
+        layout: Optional[str] = None,
+        card_fields: Optional[bool] = None,
+    ):
         self.es_client = es_client
+        self.index = index  # 검색 대상 (기본: dishes 별칭, 벤치마크는 임시 인덱스)
+        # 켜면 inner_hits 에서 card(_source)를 함께 읽어 results[*].recipes 로 돌려줌 (기본: ES_CARD_FIELDS)
+        self.card_fields = CARD_FIELDS if card_fields is None else card_fields
+        # recipe: 레시피 문서 + dish_id collapse / dish: dish 문서 + nested recipes (기본: ES_INDEX_LAYOUT)
+        self.layout = layout or INDEX_LAYOUT
+        if self.layout not in INDEX_LAYOUTS:
+            raise ValueError(f"알 수 없는 인덱스 레이아웃입니다: {self.layout}")
 
-    # === 내부 헬퍼: 재료 필터 (ALL / ANY / RATIO 지원) ===
+    # === 내부 헬퍼: 재료 필터 (ALL / ANY / RATIO / CORE 지원) ===
     def _ingredient_filter(
         self,
         user_ingredients: Optional[List[str]],
         mode: str = "RATIO",
-        ratio: float = 0.6
+        ratio: float = 0.6,
+        field: str = "ingredients_expanded",
+        core_field: str = "core_ingredients"
     ) -> Optional[Dict[str, Any]]:
         if not user_ingredients:
             return None
-        terms = [ing.strip() for ing in user_ingredients if ing and ing.strip()]
+        # 색인된 재료는 대표 이름이므로 요청 재료도 같은 이름으로 ('파' → '대파')
+        terms = canonical_ingredients(user_ingredients)
         if not terms:
             return None
 
+        # CORE: 기본 재료(소금/물 등)를 뺀 재료로 core_ingredients 에 RATIO. 기본 재료뿐이면 그대로 RATIO
+        if mode == "CORE":
+            core_terms = [ing for ing in terms if ing not in STAPLE_INGREDIENTS]
+            if core_terms:
+                terms, field = core_terms, core_field
+            mode = "RATIO"
+
         if mode == "ALL":
-            return {"bool": {"filter": [{"term": {"ingredients": ing}} for ing in terms]}}
+            return {"bool": {"filter": [{"term": {field: ing}} for ing in terms]}}
 
         if mode == "ANY":
-            return {"bool": {"should": [{"term": {"ingredients": ing}} for ing in terms],
+            return {"bool": {"should": [{"term": {field: ing}} for ing in terms],
                              "minimum_should_match": 1}}
 
         if mode == "RATIO":
             return {
                 "terms_set": {
-                    "ingredients": {
+                    field: {
                         "terms": terms,
                         "minimum_should_match_script": {
                             "source": "Math.ceil(params.num_terms * params.ratio)",
@@ -46,6 +123,18 @@ class SearchRepository:
             }
         return None
 
+    @staticmethod
+    def _text_query(query: str, fields: List[str]) -> Dict[str, Any]:
+        return {
+            "multi_match": {
+                "query": query,
+                "fields": fields,
+                "type": "best_fields",
+                "tie_breaker": 0.2,
+                "minimum_should_match": "75%" # 검색어의 75% 이상 일치해야 점수 부여
+            }
+        }
+
     # === dish_id로 그룹화하여 그룹당 상위 K개의 recipe_id를 가져오는 검색 ===
     async def search_grouped_dishes(
         self,
@@ -55,19 +144,35 @@ class SearchRepository:
         size: int = 20,      # dish 카드 개수
         topk_per_dish: int = 3,
         ing_mode: str = "RATIO",
-        ing_ratio: float = 0.6
+        ing_ratio: float = 0.6,
+        cursor: Optional[str] = None,
+        paginate: bool = False
     ) -> Dict[str, Any]:
         """
         - ES에서 dish_id 기준 collapse + inner_hits 로 그룹 단위 상위 K 레시피를 함께 반환.
         - 텍스트 검색: dish_name/recipe_title/ingredients.tok/description (nori)
-        - 재료 필터: ingredients(keyword) terms_set 등
+        - 재료 필터: ingredients_expanded(keyword, 색인 시 재료 계층으로 넓힌 재료) terms_set 등
+          CORE 는 기본 재료를 뺀 core_ingredients 로 RATIO (후보가 줄어 collapse 부담도 줄어듦)
+        - paginate / cursor: point-in-time 위에서 페이지를 넘기고 next_cursor 를 돌려줌 (색인이 바뀌어도 같은 스냅샷)
+          collapse 는 점수 정렬과 search_after 를 함께 쓸 수 없어 PIT + from 으로 넘깁니다 (max_result_window 까지).
+          dish 레이아웃은 [_score, dish_id] search_after 를 씁니다.
+        잘못된 커서는 ValueError, 만료된 PIT 는 NotFoundError 입니다 (is_missing_pit 로 다른 404 와 구분).
         """
         if not query and not user_ingredients:
             return {"total": 0, "results": []}
+        fingerprint = self._request_fingerprint(query, user_ingredients, topk_per_dish, ing_mode, ing_ratio)
+        page = await self._start_page(cursor, paginate, fingerprint)
+        if self.layout == "dish":
+            return await self._search_nested_dishes(
+                query, user_ingredients, size=size, topk_per_dish=topk_per_dish, ing_mode=ing_mode, ing_ratio=ing_ratio,
+                page=page
+            )
 
+        # _source 를 파싱하지 않고 doc values(컬럼 저장)에서 바로 읽음
         body: Dict[str, Any] = {
             "size": size,
-            "_source": ["dish_id", "dish_name"],
+            "_source": False,
+            "docvalue_fields": ["dish_id", "dish_name.raw"],
             "track_total_hits": True
         }
 
@@ -80,22 +185,7 @@ class SearchRepository:
 
         # 2) 텍스트 검색(있을 때만)
         if query:
-            # ===== [수정된 부분] =====
-            text_q = {
-                "multi_match": {
-                    "query": query,
-                    "fields": [
-                        "dish_name^4",
-                        "recipe_title^2.5",
-                        "recipe_name^2.5",
-                        "ingredients.tok^2",
-                        "description^1.6"
-                    ],
-                    "type": "best_fields",
-                    "tie_breaker": 0.2,
-                    "minimum_should_match": "75%" # 검색어의 75% 이상 일치해야 점수 부여
-                }
-            }
+            text_q = self._text_query(query, DISH_TEXT_FIELDS + RECIPE_TEXT_FIELDS)
             # dis_max 쿼리는 여러 쿼리 중 가장 높은 점수를 선택하므로, multi_match 하나만 쓸 때는 불필요
             bool_q["must"] = [text_q]
 
@@ -109,36 +199,266 @@ class SearchRepository:
                 "name": "top_recipes",
                 "size": topk_per_dish,
                 "sort": [{"_score": "desc"}],
-                "_source": ["recipe_id"]
+                "_source": {"includes": ["card"]} if self.card_fields else False,
+                "docvalue_fields": ["recipe_id"]
             }
         }
 
+        if page is not None:
+            body["from"] = page.get("from", 0)
+
         # 4) 실행 & 파싱
-        resp = await self.es_client.search(index=DISHES_INDEX_NAME, body=body)
+        resp = await self._search(body, page)
         hits = resp.get("hits", {}).get("hits", [])
         total = resp.get("hits", {}).get("total", {}).get("value", 0)
 
         results = []
         for h in hits:
-            src = h.get("_source") or {}
-            inner = h.get("inner_hits", {}).get("top_recipes", {}).get("hits", {}).get("hits", [])
-            recipe_ids = [r.get("_source", {}).get("recipe_id") for r in inner if r.get("_source")]
-            results.append({
-                "dish_id": src.get("dish_id"),
-                "dish_name": src.get("dish_name"),
-                "recipe_ids": recipe_ids
-            })
+            fields = h.get("fields") or {}
+            inner = [r for r in h.get("inner_hits", {}).get("top_recipes", {}).get("hits", {}).get("hits", [])
+                     if r.get("fields", {}).get("recipe_id")]
+            result = {
+                "dish_id": (fields.get("dish_id") or [None])[0],
+                "dish_name": (fields.get("dish_name.raw") or [None])[0],
+                "recipe_ids": [r["fields"]["recipe_id"][0] for r in inner]
+            }
+            if self.card_fields:
+                result["recipes"] = [_recipe_card(r, r["fields"]["recipe_id"][0]) for r in inner]
+            results.append(result)
 
-        return {"total": total, "results": results}
+        res = {"total": total, "results": results}
+        if page is not None:
+            res["next_cursor"] = await self._next_cursor(page, resp, size, {"from": body["from"] + len(hits)})
+        return res
 
-    # === 대량 색인 ===
-    async def reset_index(self):
-        if await self.es_client.indices.exists(index=DISHES_INDEX_NAME):
-            await self.es_client.delete_by_query(
-                index=DISHES_INDEX_NAME, query={"match_all": {}}, refresh=True
-            )
-            logger.info("Deleted all documents in index '%s'.", DISHES_INDEX_NAME)
+    async def _search_nested_dishes(
+        self,
+        query: Optional[str],
+        user_ingredients: Optional[List[str]],
+        *,
+        size: int,
+        topk_per_dish: int,
+        ing_mode: str,
+        ing_ratio: float,
+        page: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """
+        dish 레이아웃: dish 문서 하나에 레시피가 nested 로 들어 있어 collapse 가 필요 없음.
+        - 재료 조건을 만족하는 레시피가 있는 dish 만 (nested 쿼리), 상위 K 레시피는 nested inner_hits 로
+        - 텍스트는 dish 필드나 레시피 하나에 맞으면 통과, 점수는 dish 필드 + 가장 잘 맞는 레시피
+        - total 은 레시피 문서 수가 아니라 dish 수
+        """
+        nested_fields = [f"recipes.{name}" for name in RECIPE_TEXT_FIELDS]
+        recipe_q: Dict[str, Any] = {"bool": {"filter": [], "should": [], "minimum_should_match": 0}}
+        ing_filter = self._ingredient_filter(user_ingredients, mode=ing_mode, ratio=ing_ratio, field="recipes.ingredients_expanded",
+            core_field="recipes.core_ingredients")
+        if ing_filter:
+            recipe_q["bool"]["filter"].append(ing_filter)
+        if query:
+            recipe_q["bool"]["should"].append(self._text_query(query, nested_fields))
+
+        bool_q: Dict[str, Any] = {
+            "must": [{
+                "nested": {
+                    "path": "recipes",
+                    "score_mode": "max",
+                    "query": recipe_q,
+                    "inner_hits": {
+                        "name": "top_recipes",
+                        "size": topk_per_dish,
+                        "_source": {"includes": ["recipes.card"]} if self.card_fields else False,
+                        "docvalue_fields": ["recipes.recipe_id"]
+                    }
+                }
+            }]
+        }
+        if query:
+            bool_q["filter"] = [{"bool": {"should": [
+                self._text_query(query, DISH_TEXT_FIELDS),
+                {"nested": {"path": "recipes", "query": self._text_query(query, nested_fields)}},
+            ], "minimum_should_match": 1}}]
+            bool_q["should"] = [self._text_query(query, DISH_TEXT_FIELDS)]
+
+        body = {
+            "size": size,
+            "_source": False,
+            "docvalue_fields": ["dish_id", "dish_name.raw"],
+            "track_total_hits": True,
+            "query": {"bool": bool_q}
+        }
+        if page is not None:
+            # dish 문서마다 dish_id 가 하나라 [점수, dish_id] 로 순서가 정해짐
+            body["sort"] = [{"_score": "desc"}, {"dish_id": "asc"}]
+            if page.get("after"):
+                body["search_after"] = page["after"]
+        resp = await self._search(body, page)
+        hits = resp.get("hits", {}).get("hits", [])
+        results = []
+        for h in hits:
+            fields = h.get("fields") or {}
+            inner = [r for r in h.get("inner_hits", {}).get("top_recipes", {}).get("hits", {}).get("hits", [])
+                     if r.get("fields")]
+            result = {
+                "dish_id": (fields.get("dish_id") or [None])[0],
+                "dish_name": (fields.get("dish_name.raw") or [None])[0],
+                "recipe_ids": [r["fields"]["recipes.recipe_id"][0] for r in inner]
+            }
+            if self.card_fields:
+                result["recipes"] = [_recipe_card(r, r["fields"]["recipes.recipe_id"][0]) for r in inner]
+            results.append(result)
+        res = {"total": resp.get("hits", {}).get("total", {}).get("value", 0), "results": results}
+        if page is not None:
+            res["next_cursor"] = await self._next_cursor(page, resp, size, {"after": hits[-1]["sort"] if hits else None})
+        return res
 
+    # === 커서 페이지네이션 (point-in-time) ===
+    @staticmethod
+    def _request_fingerprint(query, user_ingredients, topk_per_dish, ing_mode, ing_ratio) -> str:
+        """커서를 만든 검색 조건 (size 는 페이지마다 바꿀 수 있어 제외)."""
+        key = [query or "", sorted(set(user_ingredients or [])), topk_per_dish, ing_mode, ing_ratio]
+        return hashlib.sha1(json.dumps(key, ensure_ascii=False).encode("utf-8")).hexdigest()[:16]
+
+    async def _start_page(self, cursor: Optional[str], paginate: bool, fingerprint: str) -> Optional[Dict[str, Any]]:
+        """커서가 있으면 풀고, paginate 면 새 PIT 를 엽니다. 둘 다 아니면 None (PIT 없는 단일 페이지)."""
+        if cursor:
+            try:
+                page = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+            except (ValueError, UnicodeError):
+                raise ValueError("잘못된 커서입니다.")
+            if not isinstance(page, dict) or "pit" not in page or page.get("fp") != fingerprint:
+                raise ValueError("커서와 검색 조건이 다릅니다.")
+            self._validate_page(page)
+            return page
+        if not paginate:
+            return None
+        pit = await self.es_client.open_point_in_time(index=self.index, keep_alive=PIT_KEEP_ALIVE)
+        return {"pit": pit["id"], "fp": fingerprint}
+
+    @staticmethod
+    def _validate_page(page: Dict[str, Any]) -> None:
+        """디코딩한 커서 값이 ES 로 보내도 되는 모양인지 확인합니다 (조작된 커서가 500 대신 400 이 되도록)."""
+        if not isinstance(page["pit"], str) or not page["pit"]:
+            raise ValueError("잘못된 커서입니다: pit")
+        start = page.get("from", 0)
+        if isinstance(start, bool) or not isinstance(start, int) or start < 0:
+            raise ValueError("잘못된 커서입니다: from")
+        # dish 레이아웃의 정렬 값: [점수, dish_id(, PIT 가 붙이는 _shard_doc)]
+        after = page.get("after")
+        if after is not None and not (
+            isinstance(after, list) and len(after) >= 2
+            and isinstance(after[0], (int, float)) and not isinstance(after[0], bool)
+            and all(isinstance(v, int) and not isinstance(v, bool) and v >= 0 for v in after[1:])
+        ):
+            raise ValueError("잘못된 커서입니다: search_after")
+
+    async def _search(self, body: Dict[str, Any], page: Optional[Dict[str, Any]]):
+        if page is None:
+            return await self.es_client.search(index=self.index, body=body)
+        # PIT 검색에는 index 를 주지 않습니다 (PIT 가 대상 인덱스를 고정).
+        body["pit"] = {"id": page["pit"], "keep_alive": PIT_KEEP_ALIVE}
+        return await self.es_client.search(body=body)
+
+    async def _next_cursor(
+        self, page: Dict[str, Any], resp: Dict[str, Any], size: int, position: Dict[str, Any]
+    ) -> Optional[str]:
+        """다음 페이지 커서. 이번 페이지가 size 보다 적으면 마지막으로 보고 PIT 를 닫습니다."""
+        pit = resp.get("pit_id") or page["pit"]
+        if len(resp.get("hits", {}).get("hits", [])) < size:
+            try:
+                await self.es_client.close_point_in_time(id=pit)
+            except NotFoundError:
+                pass
+            return None
+        state = {"pit": pit, "fp": page["fp"], **position}
+        return base64.urlsafe_b64encode(json.dumps(state).encode("utf-8")).decode("ascii")
+
+    # === 분석기 리로드 ===
+    async def reload_search_analyzers(self) -> Dict[str, Any]:
+        """
+        updateable 동의어 필터(synonym_filter_query)가 파일을 다시 읽게 하고, 이전 결과가 남은 ES 요청 캐시를 비웁니다.
+        색인 분석기와 nori 사용자 사전은 대상이 아닙니다 (바꾸면 재색인 필요).
+        """
+        resp = await self.es_client.indices.reload_search_analyzers(index=self.index)
+        await self.es_client.indices.clear_cache(index=self.index, request=True)
+        details = resp.get("reload_details", [])
+        return {
+            "indices": [d["index"] for d in details],
+            "reloaded_analyzers": sorted({a for d in details for a in d.get("reloaded_analyzers", [])}),
+            "reloaded_nodes": sorted({n for d in details for n in d.get("reloaded_node_ids", [])}),
+            "shards_failed": resp.get("_shards", {}).get("failed", 0),
+        }
+
+    # === 색인 문서 ===
+    @staticmethod
+    def build_recipe_document(
+        *,
+        dish_id: int,
+        dish_name: str,
+        description: Optional[str],
+        recipe_id: int,
+        recipe_title: Optional[str],
+        recipe_name: Optional[str],
+        ingredients: List[str],
+        ingredients_expanded: Optional[List[str]] = None,
+        thumbnail_url: Optional[str] = None,
+        cooking_time: Optional[int] = None,
+        difficulty: Optional[int] = None,
+        index: str = DISHES_INDEX_NAME,
+    ) -> Dict[str, Any]:
+        """
+        레시피 하나를 `{dish_id}_{recipe_id}` 문서(bulk action)로 만듭니다. index 를 주면 그 인덱스로 보냅니다.
+        같은 dish 의 레시피가 한 샤드에 모이도록 dish_id 로 라우팅합니다.
+        ingredients_expanded 는 재료 필터가 보는 필드로, 없으면 ingredients 를 그대로 씁니다.
+        core_ingredients 는 거기서 기본 재료(STAPLE_INGREDIENTS)를 뺀 것입니다.
+        thumbnail_url/cooking_time/difficulty 는 ES_CARD_FIELDS 가 켜졌을 때만 card 로 들어갑니다.
+        """
+        if ingredients_expanded is None:
+            ingredients_expanded = ingredients
+        action = {
+            "_index": index,
+            "_id": f"{dish_id}_{recipe_id}",
+            "_routing": str(dish_id),
+            "_source": {
+                "dish_id": dish_id, "recipe_id": recipe_id,
+                "dish_name": dish_name,
+                "recipe_title": recipe_title or "",
+                "recipe_name": recipe_name or "",
+                "ingredients": ingredients,
+                "ingredients_expanded": ingredients_expanded,
+                "core_ingredients": _core_ingredients(ingredients_expanded),
+                "description": description or ""
+            }
+        }
+        if CARD_FIELDS:
+            action["_source"]["card"] = _card(recipe_title, ingredients, thumbnail_url, cooking_time, difficulty)
+        return action
+
+    @staticmethod
+    def build_dish_document(
+        *,
+        dish_id: int,
+        dish_name: str,
+        description: Optional[str],
+        recipes: List[Dict[str, Any]],
+        index: str = DISHES_INDEX_NAME,
+    ) -> Dict[str, Any]:
+        """
+        dish 레이아웃용: dish 하나를 `{dish_id}` 문서로 만들고 레시피는 nested recipes 로 넣습니다.
+        recipes 항목: recipe_id, recipe_title, recipe_name, ingredients, (선택) ingredients_expanded, 카드 표시 필드
+        """
+        return {
+            "_index": index,
+            "_id": str(dish_id),
+            "_routing": str(dish_id),
+            "_source": {
+                "dish_id": dish_id,
+                "dish_name": dish_name,
+                "description": description or "",
+                "recipes": [_nested_recipe(r) for r in recipes]
+            }
+        }
+
+    # === 대량 색인 ===
     async def bulk_index_dishes(self, documents: List[Dict[str, Any]], *, refresh: bool = True):
         """
         documents: [{"_index": ..., "_id": "...", "_source": {...}}, ...]
@@ -152,7 +472,8 @@ class SearchRepository:
                 idx = doc.get("_index", DISHES_INDEX_NAME)
                 _id = doc.get("_id")
                 src = {k: v for k, v in doc.items() if not k.startswith("_")}
-                actions.append({"_index": idx, "_id": _id, "_source": src})
+                routing = doc.get("_routing", src.get("dish_id"))
+                actions.append({"_index": idx, "_id": _id, "_routing": str(routing), "_source": src})
 
         success, failed = await async_bulk(self.es_client, actions, refresh=refresh)
         if failed:
@@ -160,3 +481,107 @@ class SearchRepository:
         else:
             logger.info("Successfully indexed %s documents.", success)
         return {"success": success, "failed": len(failed)}
+
+    async def concurrent_bulk_index(
+        self,
+        actions: AsyncIterable[Dict[str, Any]],
+        *,
+        concurrency: int = 4,
+        max_chunk_bytes: int = 5 * 1024 * 1024,
+        max_chunk_docs: int = 2000,
+        max_retries: int = 5,
+        initial_backoff: float = 0.5,
+    ) -> Dict[str, int]:
+        """
+        비동기 제너레이터에서 나오는 bulk action 을 바이트 크기 기준 청크로 묶어 concurrency 개까지 동시에 보냅니다.
+        - 청크는 max_chunk_bytes 또는 max_chunk_docs 중 먼저 닿는 쪽에서 끊음
+        - 429(큐 가득 참) 문서/요청은 지수 backoff 로 max_retries 번까지 다시 보냄
+        - 그 밖의 오류(429 가 아닌 ApiError, 연결 오류)로 실패한 청크는 남은 문서 수만큼 failed 로 셈
+        - 문서를 메모리에 모으지 않으므로 카탈로그 크기와 무관하게 메모리는 (동시 청크 수 x 청크 크기) 수준
+        반환: {"success", "failed", "rejected"(429 응답 누적), "requests"}
+        """
+        stats = {"success": 0, "failed": 0, "rejected": 0, "requests": 0}
+        slots = asyncio.Semaphore(concurrency)
+        in_flight: set = set()
+
+        async def send(chunk: List[Tuple[dict, dict]]):
+            pending = chunk
+            try:
+                backoff = initial_backoff
+                for attempt in range(max_retries + 1):
+                    retry = []
+                    try:
+                        resp = await self.es_client.bulk(operations=[line for pair in pending for line in pair])
+                        stats["requests"] += 1
+                    except ApiError as e:
+                        stats["requests"] += 1
+                        if e.meta.status != 429:
+                            raise
+                        retry = pending
+                    else:
+                        for pair, item in zip(pending, resp["items"]):
+                            result = next(iter(item.values()))
+                            status = result.get("status", 500)
+                            if status == 429:
+                                retry.append(pair)
+                            elif status >= 300:
+                                stats["failed"] += 1
+                                if stats["failed"] <= 10:
+                                    logger.error("Failed to index document %s: %s", result.get("_id"), result.get("error"))
+                            else:
+                                stats["success"] += 1
+                    if not retry:
+                        return
+                    stats["rejected"] += len(retry)
+                    if attempt == max_retries:
+                        stats["failed"] += len(retry)
+                        logger.error("Gave up on %d documents after %d retries (429).", len(retry), max_retries)
+                        return
+                    await asyncio.sleep(backoff)
+                    pending, backoff = retry, min(backoff * 2, 30.0)
+            except Exception as e:
+                # 태스크 예외는 아무도 await 하지 않으므로 여기서 실패로 세어 호출하는 쪽(별칭 전환 여부)이 알게 함
+                stats["failed"] += len(pending)
+                logger.error("Bulk request for %d documents failed: %s", len(pending), e)
+            finally:
+                slots.release()
+
+        async def dispatch(chunk):
+            await slots.acquire()  # 동시에 날아가는 요청 수 제한 (backpressure)
+            task = asyncio.create_task(send(chunk))
+            in_flight.add(task)
+            task.add_done_callback(in_flight.discard)
+
+        chunk: List[Tuple[dict, dict]] = []
+        chunk_bytes = 0
+        try:
+            async for action in actions:
+                meta = {"index": {"_index": action["_index"], "_id": action["_id"], "routing": action["_routing"]}}
+                size = len(json.dumps(meta)) + len(json.dumps(action["_source"], ensure_ascii=False).encode("utf-8")) + 2
+                if chunk and (chunk_bytes + size > max_chunk_bytes or len(chunk) >= max_chunk_docs):
+                    await dispatch(chunk)
+                    chunk, chunk_bytes = [], 0
+                chunk.append((meta, action["_source"]))
+                chunk_bytes += size
+            if chunk:
+                await dispatch(chunk)
+        finally:
+            if in_flight:
+                await asyncio.gather(*in_flight)
+
+        if stats["failed"]:
+            logger.error("Failed to index %d documents.", stats["failed"])
+        return stats
+
+    async def bulk_delete_documents(self, doc_ids: List[str], *, refresh: bool = False):
+        """문서 id(`{dish_id}_{recipe_id}`) 목록을 bulk delete 합니다. 이미 없는 문서(404)는 무시합니다."""
+        actions = [
+            {"_op_type": "delete", "_index": DISHES_INDEX_NAME, "_id": doc_id, "_routing": doc_id.split("_", 1)[0]}
+            for doc_id in doc_ids
+        ]
+        success, failed = await async_bulk(
+            self.es_client, actions, refresh=refresh, raise_on_error=False, ignore_status=(404,)
+        )
+        if failed:
+            logger.error("Failed to delete %d documents.", len(failed))
+        return {"success": success, "failed": len(failed)}
@@ -0,0 +1,82 @@
+# /backend/repositories/search_documents.py
+
+from typing import IO, Iterator, List
+
+from sqlalchemy import func, select, text
+from sqlalchemy.orm import Session
+
+import models
+
+_COPY_QUERIES = {
+    "csv": "COPY (SELECT * FROM search_documents ORDER BY recipe_id) TO STDOUT WITH (FORMAT csv, HEADER true)",
+    # 한 줄에 문서 하나. text 형식은 역슬래시를 다시 이스케이프하므로, 나올 일 없는 구분자/따옴표의 csv 로 그대로 내보냅니다.
+    "ndjson": "COPY (SELECT row_to_json(s) FROM search_documents AS s ORDER BY recipe_id) TO STDOUT "
+              "WITH (FORMAT csv, QUOTE e'\\x01', DELIMITER e'\\x02')",
+}
+
+
+class SearchDocumentRepository:
+    """
+    search_documents materialized view (ES 문서 한 건 = 한 행) 를 다룹니다.
+    재색인/내보내기/디버깅이 ORM 객체 그래프 대신 평평한 행을 읽도록 합니다.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def refresh(self, concurrently: bool = True) -> None:
+        """
+        뷰를 다시 계산합니다. CONCURRENTLY 는 갱신 중에도 읽기를 막지 않지만,
+        한 번도 채워지지 않은 뷰에는 쓸 수 없어 그때는 일반 REFRESH 를 합니다. commit 은 호출하는 쪽에서 합니다.
+        """
+        populated = self.db.scalar(
+            text("SELECT ispopulated FROM pg_matviews WHERE matviewname = 'search_documents'")
+        )
+        if concurrently and populated:
+            self.db.execute(text("REFRESH MATERIALIZED VIEW CONCURRENTLY search_documents"))
+        else:
+            self.db.execute(text("REFRESH MATERIALIZED VIEW search_documents"))
+
+    def count(self) -> int:
+        return self.db.scalar(select(func.count()).select_from(models.search_documents))
+
+    @staticmethod
+    def _rows_stmt():
+        view = models.search_documents
+        return select(
+            view.c.dish_id, view.c.dish_name, view.c.description,
+            view.c.recipe_id, view.c.recipe_title, view.c.recipe_name, view.c.ingredients,
+            view.c.thumbnail_url, view.c.cooking_time, view.c.difficulty,
+        )
+
+    def iter_rows(self, batch_size: int = 1000, after_recipe_id: int = 0) -> Iterator[List[dict]]:
+        """recipe_id 기준 keyset 페이지. 각 행은 DishRepository.iter_search_rows 와 같은 키를 가집니다."""
+        view = models.search_documents
+        stmt = self._rows_stmt().order_by(view.c.recipe_id).limit(batch_size)
+        last_id = after_recipe_id
+        while True:
+            rows = self.db.execute(stmt.where(view.c.recipe_id > last_id)).mappings().all()
+            if not rows:
+                return
+            yield rows
+            last_id = rows[-1]["recipe_id"]
+
+    def iter_rows_by_dish(self, batch_size: int = 1000) -> Iterator[List[dict]]:
+        """dish_id, recipe_id 순으로 한 번의 서버 측 커서에서 batch_size 씩 (dish 단위 문서용)."""
+        view = models.search_documents
+        stmt = (
+            self._rows_stmt()
+            .order_by(view.c.dish_id, view.c.recipe_id)
+            .execution_options(yield_per=batch_size)
+        )
+        yield from self.db.execute(stmt).mappings().partitions()
+
+    def copy_to(self, out: IO[str], fmt: str = "csv") -> None:
+        """뷰 전체를 COPY ... TO STDOUT 으로 out 에 씁니다 (psycopg2 copy_expert)."""
+        if fmt not in _COPY_QUERIES:
+            raise ValueError(f"알 수 없는 내보내기 형식입니다: {fmt}")
+        cursor = self.db.connection().connection.cursor()
+        try:
+            cursor.copy_expert(_COPY_QUERIES[fmt], out)
+        finally:
+            cursor.close()
@@ -1,7 +1,7 @@
 # /backend/schemas/dish.py
 
 from pydantic import BaseModel
-from typing import List, Optional, Any
+from typing import List, Optional, Any, Literal, Union
 
 # --- Recipe 스키마를 이곳에 함께 정의하거나, recipe.py로 분리해도 좋습니다. ---
 
@@ -64,15 +64,26 @@ class Dish(DishBase):
         from_attributes = True
         
         
+# 검색 결과 카드에 바로 그릴 레시피 필드 (ES_CARD_FIELDS 를 켠 인덱스에서만)
+class RecipeCard(BaseModel):
+    recipe_id: int
+    title: Optional[str] = None
+    thumbnail_url: Optional[str] = None
+    cooking_time: Optional[int] = None
+    difficulty: Optional[int] = None
+    ingredient_count: Optional[int] = None
+
 # 검색 결과를 위한 스키마 (Grouped Response)
 class GroupedDishSearchResult(BaseModel):
     dish_id: int
     dish_name: str
     recipe_ids: List[int]
+    recipes: Optional[List[RecipeCard]] = None
 
 class GroupedSearchResponse(BaseModel):
     total: int
     results: List[GroupedDishSearchResult]
+    next_cursor: Optional[str] = None  # paginate/cursor 요청에서 다음 페이지가 있을 때만
 
 # 검색 요청을 위한 스키마 (Request Body)
 class SearchRequest(BaseModel):
@@ -80,5 +91,32 @@ class SearchRequest(BaseModel):
     q: Optional[str] = None
     size: int = 20
     topk: int = 3
-    ing_mode: str = "RATIO"
-    ing_ratio: float = 0.6
\ No newline at end of file
+    ing_mode: str = "RATIO"  # ALL | ANY | RATIO | CORE (소금/물 같은 기본 재료를 빼고 RATIO)
+    ing_ratio: float = 0.6
+    paginate: bool = False  # 첫 페이지: point-in-time 을 열고 next_cursor 를 받음 (캐시 사용 안 함)
+    cursor: Optional[str] = None  # 다음 페이지: 직전 응답의 next_cursor (나머지 조건은 같게, size 는 바꿀 수 있음)
+
+# --- 검색 + 상세 한 번에 (search/hydrated) ---
+
+# 카드에 바로 그릴 레시피 요약 (재료/조리 단계는 읽지 않음)
+class RecipeSummary(BaseModel):
+    id: int
+    title: Optional[str] = None
+    difficulty: Optional[int] = None
+    cooking_time: Optional[int] = None
+    thumbnail_url: Optional[str] = None
+    class Config:
+        from_attributes = True
+
+class HydratedSearchRequest(SearchRequest):
+    detail: Literal["summary", "full"] = "summary"  # summary: RecipeSummary / full: Recipe (재료 포함)
+
+class HydratedDishCard(BaseModel):
+    dish_id: int
+    dish_name: str
+    recipes: List[Union[Recipe, RecipeSummary]]
+
+class HydratedSearchResponse(BaseModel):
+    total: int
+    results: List[HydratedDishCard]
+    next_cursor: Optional[str] = None
@@ -0,0 +1,105 @@
+# /backend/search_cache.py
+"""
+/search/grouped 결과 캐시 (세션과 같은 Redis).
+- 키: search:grouped:<세대>:<정규화한 요청의 해시>. 재료는 공백 정리 + 중복 제거 + 정렬해서 순서가 달라도 같은 키
+- 세대(search:generation): 재색인/롤백/복원/동의어 리로드/outbox 반영 때 bump_generation 으로 올리면 이전 결과가 한 번에 무효화
+Redis 장애 시에는 캐시 없이 ES 로 검색합니다.
+async 라우트에서 부르므로 redis.asyncio 클라이언트를 씁니다 (느린 Redis 가 이벤트 루프를 막지 않도록).
+"""
+import hashlib
+import json
+import logging
+import os
+from typing import Any, Dict, Optional, Tuple
+
+import redis
+import redis.asyncio as aioredis
+
+from search_client import canonical_ingredients
+
+logger = logging.getLogger(__name__)
+
+SEARCH_GENERATION_KEY = "search:generation"
+SEARCH_CACHE_STATS_KEY = "search:cache:stats"  # hash: hits / misses
+SEARCH_CACHE_PREFIX = "search:grouped"
+SEARCH_CACHE_TTL = int(os.getenv("SEARCH_CACHE_TTL", "300"))  # 초
+SEARCH_CACHE_REDIS_TIMEOUT = float(os.getenv("SEARCH_CACHE_REDIS_TIMEOUT", "0.5"))  # 초, 넘으면 캐시 없이 검색
+
+redis_client = aioredis.Redis(
+    host=os.getenv("REDIS_HOST", "redis"), port=6379, db=0, decode_responses=True,
+    socket_timeout=SEARCH_CACHE_REDIS_TIMEOUT, socket_connect_timeout=SEARCH_CACHE_REDIS_TIMEOUT,
+)
+
+
+async def current_generation() -> int:
+    return int(await redis_client.get(SEARCH_GENERATION_KEY) or 0)
+
+
+async def bump_generation() -> Optional[int]:
+    """세대 번호를 올리고 새 번호를 반환합니다. Redis 를 못 쓰면 None."""
+    try:
+        return await redis_client.incr(SEARCH_GENERATION_KEY)
+    except redis.RedisError as e:
+        logger.warning("search cache generation bump failed: %s", e)
+        return None
+
+
+def normalize_search_request(search_request) -> Dict[str, Any]:
+    """SearchRequest → 캐시 키와 실제 검색에 함께 쓰는 정규화된 값."""
+    # 재료는 임포트와 같은 대표 이름으로 ('달걀' 과 '계란' 이 같은 검색/같은 캐시 키)
+    ingredients = sorted(set(canonical_ingredients(search_request.ingredients or [])))
+    return {
+        "ingredients": ingredients,
+        "q": (search_request.q or "").strip() or None,
+        "size": search_request.size,
+        "topk": search_request.topk,
+        "ing_mode": search_request.ing_mode,
+        "ing_ratio": float(search_request.ing_ratio),
+    }
+
+
+def search_cache_key(normalized: Dict[str, Any], generation: int) -> str:
+    digest = hashlib.sha1(
+        json.dumps(normalized, ensure_ascii=False, sort_keys=True).encode("utf-8")
+    ).hexdigest()
+    return f"{SEARCH_CACHE_PREFIX}:{generation}:{digest}"
+
+
+async def get_cached_result(normalized: Dict[str, Any]) -> Tuple[Optional[str], Optional[dict]]:
+    """(캐시 키, 캐시된 결과). 없으면 결과가 None, Redis 를 못 쓰면 키도 None 입니다. hit/miss 를 셉니다."""
+    try:
+        key = search_cache_key(normalized, await current_generation())
+        cached = await redis_client.get(key)
+        await redis_client.hincrby(SEARCH_CACHE_STATS_KEY, "hits" if cached is not None else "misses", 1)
+    except redis.RedisError as e:
+        logger.warning("search cache unavailable: %s", e)
+        return None, None
+    return key, (json.loads(cached) if cached is not None else None)
+
+
+async def store_result(key: Optional[str], result: dict, ttl: int = SEARCH_CACHE_TTL) -> None:
+    if key is None:
+        return
+    try:
+        await redis_client.set(key, json.dumps(result, ensure_ascii=False), ex=ttl)
+    except redis.RedisError as e:
+        logger.warning("search cache store failed: %s", e)
+
+
+async def cache_stats() -> Dict[str, Any]:
+    """hit/miss 누적 수와 현재 세대. Redis 를 못 쓰면 값은 None 이고 error 에 이유를 담습니다."""
+    try:
+        stats = await redis_client.hgetall(SEARCH_CACHE_STATS_KEY)
+        generation = await current_generation()
+    except redis.RedisError as e:
+        logger.warning("search cache stats unavailable: %s", e)
+        return {"hits": None, "misses": None, "hit_ratio": None, "generation": None,
+                "ttl_seconds": SEARCH_CACHE_TTL, "error": str(e)}
+    hits, misses = int(stats.get("hits", 0)), int(stats.get("misses", 0))
+    return {
+        "hits": hits,
+        "misses": misses,
+        "hit_ratio": round(hits / (hits + misses), 4) if hits + misses else 0.0,
+        "generation": generation,
+        "ttl_seconds": SEARCH_CACHE_TTL,
+    }
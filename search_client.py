@@ -1,11 +1,47 @@
-from elasticsearch import AsyncElasticsearch
+from elasticsearch import AsyncElasticsearch, NotFoundError
 from contextlib import asynccontextmanager
-import os, asyncio, logging
+from datetime import datetime, timezone
+import os, asyncio, logging, re
+from typing import Iterable, List, Optional, Tuple
+
+from importer.normalize import IngredientNormalizer
 
 logger = logging.getLogger(__name__)
 es_client = None
 
-DISHES_INDEX_NAME = "dishes"  # 운영 시엔 별칭/버전 인덱스 전략 권장
+DISHES_INDEX_NAME = "dishes"  # 검색/쓰기는 항상 별칭으로. 실제 인덱스는 dishes_v1, dishes_v2, ...
+_VERSION_RE = re.compile(rf"^{DISHES_INDEX_NAME}_v(\d+)$")
+
+# 인덱스 프로필: default(텍스트 분석 위주) / performance(collapse·재료 필터 접근 패턴에 맞춤)
+INDEX_PROFILES = ("default", "performance")
+INDEX_PROFILE = os.getenv("ES_INDEX_PROFILE", "default")
+# 샤드/레플리카 수 (비우면 ES 기본값, performance 프로필은 샤드 1). 문서는 dish_id 로 라우팅하므로 샤드를 늘려도
+# 한 dish 의 레시피는 같은 샤드에 모여 collapse 그룹이 샤드 안에서 완결됩니다. 레플리카는 노드를 늘린 만큼 올리면 검색 처리량이 늘어남
+# 문서 레이아웃: recipe(레시피당 문서 1개, dish_id collapse) / dish(dish당 문서 1개, 레시피는 nested)
+# API·outbox 워커·재색인이 같은 값을 써야 하므로 환경변수 하나로 정합니다.
+INDEX_LAYOUTS = ("recipe", "dish")
+INDEX_LAYOUT = os.getenv("ES_INDEX_LAYOUT", "recipe")
+# 카드 표시 필드(card: 제목/썸네일/조리 시간/난이도/재료 수)를 문서에 넣고 검색 결과로 돌려줄지. 켜면 es reindex 필요
+CARD_FIELDS = os.getenv("ES_CARD_FIELDS", "false").lower() in ("1", "true", "yes")
+NUMBER_OF_SHARDS = os.getenv("ES_NUMBER_OF_SHARDS")
+NUMBER_OF_REPLICAS = os.getenv("ES_NUMBER_OF_REPLICAS")
+PERF_REFRESH_INTERVAL = os.getenv("ES_REFRESH_INTERVAL", "30s")  # 실시간성보다 검색 캐시 유지가 중요
+PIT_KEEP_ALIVE = os.getenv("ES_PIT_KEEP_ALIVE", "2m")  # 커서 페이지네이션: 다음 페이지 요청까지 point-in-time 유지 시간
+
+# 분석기 사전: 저장소의 elasticsearch/dict 가 ES 컨테이너의 config/dict 로 마운트됨 (같은 파일)
+LOCAL_DICT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "elasticsearch", "dict")
+SYNONYM_FILE_PATH = os.path.join(LOCAL_DICT_PATH, "synonym-set.txt")
+USERDICT_FILE_PATH = os.path.join(LOCAL_DICT_PATH, "userdict_ko.txt")
+INGREDIENT_SYNONYM_FILE_PATH = os.path.join(LOCAL_DICT_PATH, "ingredient-synonyms.txt")  # db import 재료 정규화 전용
+STAPLE_FILE_PATH = os.path.join(LOCAL_DICT_PATH, "staples.txt")  # core_ingredients 에서 빼는 기본 재료 (ES 분석기는 쓰지 않음)
+
+# 스냅샷 저장소: ES 컨테이너의 path.repo 에 마운트된 볼륨 (docker-compose 의 elasticsearch_snapshots)
+SNAPSHOT_REPOSITORY = os.getenv("ES_SNAPSHOT_REPOSITORY", "dishes_backup")
+SNAPSHOT_LOCATION = os.getenv("ES_SNAPSHOT_LOCATION", "/usr/share/elasticsearch/snapshots")
+SNAPSHOT_TIMEOUT = 600  # 스냅샷/복원은 끝날 때까지 기다리므로 기본 요청 타임아웃(10초) 대신 사용
+
+def versioned_index_name(version: int) -> str:
+    return f"{DISHES_INDEX_NAME}_v{version}"
 
 async def _wait_for_es(es, retries=6, base=0.25, max_delay=2.0):
     last = None
@@ -19,15 +55,27 @@ async def _wait_for_es(es, retries=6, base=0.25, max_delay=2.0):
             await asyncio.sleep(delay)
     raise RuntimeError(f"ES not reachable: {last}")
 
-async def create_dishes_index(es: AsyncElasticsearch):
+def dishes_index_body(
+    profile: Optional[str] = None,
+    *,
+    layout: Optional[str] = None,
+    shards: Optional[int] = None,
+    replicas: Optional[int] = None,
+) -> Tuple[dict, dict]:
     """
-    nori + 사용자사전/동의어를 쓰는 '텍스트 전용' 인덱스 생성.
+    nori + 사용자사전/동의어를 쓰는 '텍스트 전용' 인덱스의 (settings, mappings).
     - dict/userdict_ko.txt, dict/synonym-set.txt 는 ES 컨테이너 내부 경로여야 함(볼륨 마운트 필수).
+    - profile="performance" 면 _apply_performance_profile 로 접근 패턴용 설정을 덧붙임 (기본: ES_INDEX_PROFILE)
+    - shards/replicas 를 주지 않으면 ES_NUMBER_OF_SHARDS / ES_NUMBER_OF_REPLICAS 를 따름
+    - layout="dish" 면 dish 문서 + nested recipes 매핑 (기본: ES_INDEX_LAYOUT)
+    - 모든 문서는 dish_id 로 라우팅(_routing 필수)
     """
-    exists = await es.indices.exists(index=DISHES_INDEX_NAME)
-    if exists:
-        return
-
+    profile = profile or INDEX_PROFILE
+    layout = layout or INDEX_LAYOUT
+    if profile not in INDEX_PROFILES:
+        raise ValueError(f"알 수 없는 인덱스 프로필입니다: {profile} ({'|'.join(INDEX_PROFILES)})")
+    if layout not in INDEX_LAYOUTS:
+        raise ValueError(f"알 수 없는 인덱스 레이아웃입니다: {layout} ({'|'.join(INDEX_LAYOUTS)})")
     settings = {
         "analysis": {
             "analyzer": {
@@ -77,6 +125,7 @@ async def create_dishes_index(es: AsyncElasticsearch):
     }
 
     mappings = {
+        "_routing": {"required": True},  # 색인/삭제 시 routing=dish_id 를 빠뜨리면 오류로 막음
         "properties": {
             "dish_id":   {"type": "integer"},
             "recipe_id": {"type": "integer"},
@@ -107,6 +156,12 @@ async def create_dishes_index(es: AsyncElasticsearch):
                     }
                 }
             },
+            # 재료 필터용: ingredients + 재료 계층에서 그 아래에 있는 재료 (냉장고의 '삼겹살' 이 '돼지고기' 레시피에 맞도록)
+            "ingredients_expanded": {"type": "keyword"},
+            # CORE 재료 모드용: ingredients_expanded 에서 소금/물 같은 기본 재료(staples.txt)를 뺀 것
+            "core_ingredients": {"type": "keyword"},
+            # 카드 표시용 (ES_CARD_FIELDS). _source 에만 두고 색인하지 않음
+            "card": {"type": "object", "enabled": False},
             "description": {
                 "type": "text",
                 "analyzer": "ko_index_analyzer",
@@ -116,8 +171,244 @@ async def create_dishes_index(es: AsyncElasticsearch):
         }
     }
 
-    await es.indices.create(index=DISHES_INDEX_NAME, settings=settings, mappings=mappings)
-    logger.info("Created index '%s' with nori analyzers.", DISHES_INDEX_NAME)
+    if layout == "dish":
+        props = mappings["properties"]
+        recipe_fields = (
+            "recipe_id", "recipe_title", "recipe_name", "ingredients", "ingredients_expanded", "core_ingredients", "card"
+        )
+        props["recipes"] = {"type": "nested", "properties": {name: props.pop(name) for name in recipe_fields}}
+    mappings["_meta"] = {"layout": layout}
+
+    shards = shards or NUMBER_OF_SHARDS
+    replicas = replicas if replicas is not None else NUMBER_OF_REPLICAS
+    if shards:
+        settings["number_of_shards"] = int(shards)
+    if replicas not in (None, ""):
+        settings["number_of_replicas"] = int(replicas)
+    if profile == "performance":
+        _apply_performance_profile(settings, mappings, layout)
+    return settings, mappings
+
+def _apply_performance_profile(settings: dict, mappings: dict, layout: str = "recipe") -> None:
+    """
+    실제 쿼리 패턴(dish_id collapse, ingredients 필터, dish_id/recipe_id 를 doc values 로 읽기)에 맞춘 설정.
+    - ingredients / ingredients_expanded / core_ingredients: eager_global_ordinals 로 refresh 시점에 global ordinals 를 미리 만듦
+      (dish_id 는 숫자 필드라 global ordinals 가 없음 → 대신 인덱스 정렬로 같은 dish 문서를 붙여 둠)
+    - index.sort = dish_id: collapse 대상 문서가 세그먼트 안에서 연속 → doc values 읽기 지역성 향상
+    - 점수에 길이 정규화가 필요 없는 필드(recipe_name, ingredients.tok)는 norms 끔
+    dish 레이아웃은 collapse 가 없고 nested 필드가 있어 인덱스 정렬은 하지 않습니다.
+    """
+    settings.setdefault("number_of_shards", 1)  # 샤드 수를 따로 정하지 않았으면 단일 샤드
+    settings["refresh_interval"] = PERF_REFRESH_INTERVAL
+    props = mappings["properties"]
+    if layout == "dish":
+        props = props["recipes"]["properties"]
+    else:
+        settings.update({"sort.field": ["dish_id", "recipe_id"], "sort.order": ["asc", "asc"]})
+    props["ingredients"]["eager_global_ordinals"] = True
+    props["ingredients_expanded"]["eager_global_ordinals"] = True
+    props["core_ingredients"]["eager_global_ordinals"] = True
+    props["ingredients"]["fields"]["tok"]["norms"] = False
+    props["recipe_name"]["norms"] = False
+
+def load_staple_ingredients(path: str = STAPLE_FILE_PATH) -> frozenset:
+    """한 줄에 재료 하나, '#' 주석 허용. 파일이 없으면 빈 집합 (core_ingredients == ingredients_expanded)."""
+    if not os.path.exists(path):
+        return frozenset()
+    with open(path, "r", encoding="utf-8") as f:
+        return frozenset(line.strip() for line in f if line.strip() and not line.startswith("#"))
+
+# 색인(core_ingredients)과 검색(CORE 재료 모드)이 같은 목록을 써야 하므로 모듈을 읽을 때 한 번 읽습니다.
+STAPLE_INGREDIENTS = load_staple_ingredients()
+
+# 임포트가 레시피/마스터 재료 이름을 대표 이름으로 바꾸므로, 검색·냉장고 재료도 같은 사전(db import 기본값)으로 바꿔야 맞음
+INGREDIENT_ALIAS_FILE_PATH = os.path.join(os.getenv("FRIDGE_DATA_PATH", "/data"), "재료/aliases.json")
+INGREDIENT_NORMALIZER = IngredientNormalizer.from_files(
+    [INGREDIENT_SYNONYM_FILE_PATH], USERDICT_FILE_PATH, INGREDIENT_ALIAS_FILE_PATH
+)
+
+def canonical_ingredients(names: Iterable[str]) -> List[str]:
+    """사용자가 보낸 재료 이름들 → 대표 재료 이름 ('달걀' → '계란', '파 1대' → '대파'). 빈 값 제거, 순서 유지 중복 제거."""
+    return list(dict.fromkeys(
+        name for name in (INGREDIENT_NORMALIZER.canonical(raw) for raw in names if raw) if name
+    ))
+
+def validate_synonym_file(path: str = SYNONYM_FILE_PATH) -> Tuple[int, List[str]]:
+    """
+    synonym-set.txt 를 ES(solr) 형식으로 검사합니다. 필터가 lenient 라서 잘못된 줄은 ES가 조용히 건너뛰므로 미리 막습니다.
+    - "a, b, c" (동등) 또는 "a, b => c" (치환), '#' 주석/빈 줄 허용
+    반환: (규칙 수, 오류 메시지 목록)
+    """
+    rules, errors = 0, []
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            lines = f.read().splitlines()
+    except (OSError, UnicodeDecodeError) as e:
+        return 0, [f"파일을 읽을 수 없습니다: {e}"]
+    for lineno, line in enumerate(lines, 1):
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        sides = line.split("=>")
+        if len(sides) > 2:
+            errors.append(f"{lineno}행: '=>' 가 두 번 이상 있습니다: {line}")
+            continue
+        terms = [[term.strip() for term in side.split(",")] for side in sides]
+        if any(not term for side in terms for term in side):
+            errors.append(f"{lineno}행: 빈 항목이 있습니다: {line}")
+            continue
+        if len(sides) == 1 and len(terms[0]) < 2:
+            errors.append(f"{lineno}행: 동의어가 하나뿐입니다: {line}")
+            continue
+        rules += 1
+    return rules, errors
+
+async def create_dishes_index(es: AsyncElasticsearch, profile: Optional[str] = None, **body_options):
+    """별칭(또는 예전 방식의 'dishes' 인덱스)이 없을 때만 dishes_v1 을 만들고 별칭을 붙입니다."""
+    if await es.indices.exists(index=DISHES_INDEX_NAME):
+        return
+    index_name = await create_versioned_index(es, profile, **body_options)
+    await es.indices.update_aliases(actions=[{"add": {"index": index_name, "alias": DISHES_INDEX_NAME}}])
+
+# === 버전 인덱스 / 별칭 관리 (blue-green 재색인) ===
+async def dish_index_versions(es: AsyncElasticsearch) -> List[Tuple[int, str]]:
+    """[(버전, 인덱스 이름), ...] 버전 오름차순"""
+    indices = await es.indices.get(index=f"{DISHES_INDEX_NAME}_v*", allow_no_indices=True)
+    versions = []
+    for name in indices:
+        match = _VERSION_RE.match(name)
+        if match:
+            versions.append((int(match.group(1)), name))
+    return sorted(versions)
+
+async def alias_targets(es: AsyncElasticsearch) -> List[str]:
+    """별칭이 가리키는 인덱스 이름들. 별칭이 없으면 빈 목록."""
+    if not await es.indices.exists_alias(name=DISHES_INDEX_NAME):
+        return []
+    return sorted(await es.indices.get_alias(name=DISHES_INDEX_NAME))
+
+async def create_versioned_index(es: AsyncElasticsearch, profile: Optional[str] = None, **body_options) -> str:
+    """지금까지 있던 버전 다음 번호로 빈 인덱스를 만들고 이름을 반환합니다. body_options 는 dishes_index_body 로 전달."""
+    versions = await dish_index_versions(es)
+    index_name = versioned_index_name(versions[-1][0] + 1 if versions else 1)
+    settings, mappings = dishes_index_body(profile, **body_options)
+    await es.indices.create(index=index_name, settings=settings, mappings=mappings)
+    logger.info("Created index '%s' with nori analyzers (profile=%s).", index_name, profile or INDEX_PROFILE)
+    return index_name
+
+async def swap_dishes_alias(es: AsyncElasticsearch, new_index: str) -> List[str]:
+    """
+    별칭을 new_index 로 한 번의 update_aliases 호출로 옮깁니다 (검색 중단 없음).
+    'dishes' 가 별칭이 아닌 실제 인덱스(예전 방식)면 같은 호출에서 remove_index 로 지우고 별칭을 붙입니다.
+    반환: 이전에 별칭이 가리키던 인덱스들
+    """
+    previous = await alias_targets(es)
+    actions = [{"remove": {"index": name, "alias": DISHES_INDEX_NAME}} for name in previous if name != new_index]
+    if not previous and await es.indices.exists(index=DISHES_INDEX_NAME):
+        actions.append({"remove_index": {"index": DISHES_INDEX_NAME}})
+    actions.append({"add": {"index": new_index, "alias": DISHES_INDEX_NAME}})
+    await es.indices.update_aliases(actions=actions)
+    logger.info("Alias '%s' -> '%s' (previous: %s)", DISHES_INDEX_NAME, new_index, previous)
+    return previous
+
+@asynccontextmanager
+async def bulk_load_settings(es: AsyncElasticsearch, index: str):
+    """
+    대량 색인 동안 refresh 를 끄고(-1) replica 를 0 으로 내렸다가, 끝나면(실패해도) 원래 값으로 되돌립니다.
+    원래 값이 없던 항목은 null 로 되돌려 클러스터 기본값을 쓰게 합니다.
+    """
+    current = (await es.indices.get_settings(index=index))[index]["settings"]["index"]
+    original = {
+        "refresh_interval": current.get("refresh_interval"),
+        "number_of_replicas": current.get("number_of_replicas"),
+    }
+    await es.indices.put_settings(index=index, settings={"index": {"refresh_interval": "-1", "number_of_replicas": 0}})
+    try:
+        yield original
+    finally:
+        await es.indices.put_settings(index=index, settings={"index": original})
+
+async def prune_dish_indices(es: AsyncElasticsearch, keep: int) -> List[str]:
+    """별칭이 가리키는 인덱스를 포함해 최신 keep 개 버전만 남기고 나머지를 지웁니다."""
+    live = set(await alias_targets(es))
+    versions = [name for _, name in await dish_index_versions(es)]
+    stale = [name for name in versions[:-keep] if name not in live] if keep > 0 else []
+    for name in stale:
+        await es.indices.delete(index=name)
+        logger.info("Deleted old index '%s'.", name)
+    return stale
+
+# === 스냅샷 / 복원 ===
+async def ensure_snapshot_repository(es: AsyncElasticsearch) -> str:
+    """파일시스템(fs) 스냅샷 저장소가 없으면 등록합니다. 저장소 이름을 반환합니다."""
+    try:
+        await es.snapshot.get_repository(name=SNAPSHOT_REPOSITORY)
+    except NotFoundError:
+        await es.snapshot.create_repository(
+            name=SNAPSHOT_REPOSITORY,
+            repository={"type": "fs", "settings": {"location": SNAPSHOT_LOCATION, "compress": True}},
+        )
+        logger.info("Registered snapshot repository '%s' at %s", SNAPSHOT_REPOSITORY, SNAPSHOT_LOCATION)
+    return SNAPSHOT_REPOSITORY
+
+async def list_dish_snapshots(es: AsyncElasticsearch) -> List[dict]:
+    """저장소의 스냅샷 정보 목록 (오래된 순). 저장소가 없으면 빈 목록."""
+    try:
+        resp = await es.snapshot.get(repository=SNAPSHOT_REPOSITORY, snapshot="_all")
+    except NotFoundError:
+        return []
+    return sorted(resp["snapshots"], key=lambda s: s.get("start_time_in_millis", 0))
+
+async def snapshot_dishes_index(es: AsyncElasticsearch, snapshot: Optional[str] = None) -> dict:
+    """
+    별칭이 가리키는 인덱스(없으면 예전 방식의 'dishes' 인덱스)만 스냅샷으로 남깁니다. 클러스터 전역 상태는 제외.
+    반환: 완료된 스냅샷 정보
+    """
+    indices = await alias_targets(es)
+    if not indices and await es.indices.exists(index=DISHES_INDEX_NAME):
+        indices = [DISHES_INDEX_NAME]
+    if not indices:
+        raise RuntimeError(f"스냅샷할 '{DISHES_INDEX_NAME}' 인덱스가 없습니다.")
+    await ensure_snapshot_repository(es)
+    snapshot = snapshot or f"{DISHES_INDEX_NAME}-{datetime.now(timezone.utc):%Y%m%d-%H%M%S}"
+    resp = await es.options(request_timeout=SNAPSHOT_TIMEOUT).snapshot.create(
+        repository=SNAPSHOT_REPOSITORY,
+        snapshot=snapshot,
+        indices=",".join(indices),
+        include_global_state=False,
+        wait_for_completion=True,
+        metadata={"alias": DISHES_INDEX_NAME, "indices": indices},
+    )
+    info = resp["snapshot"]
+    if info.get("state") != "SUCCESS":
+        raise RuntimeError(f"스냅샷 '{snapshot}' 이 완료되지 않았습니다: {info.get('state')}")
+    logger.info("Snapshot '%s' of %s created.", snapshot, indices)
+    return info
+
+async def restore_dishes_snapshot(es: AsyncElasticsearch, snapshot: str) -> str:
+    """
+    스냅샷의 인덱스를 다음 버전 이름(dishes_vN)으로 복원합니다. 기존 인덱스는 건드리지 않으므로
+    별칭 전환(swap_dishes_alias)은 호출하는 쪽에서 합니다. 반환: 복원된 인덱스 이름
+    """
+    resp = await es.snapshot.get(repository=SNAPSHOT_REPOSITORY, snapshot=snapshot)
+    indices = resp["snapshots"][0]["indices"]
+    if len(indices) != 1:
+        raise RuntimeError(f"스냅샷 '{snapshot}' 에 인덱스가 {len(indices)}개 있습니다: {indices}")
+    source = indices[0]
+    versions = await dish_index_versions(es)
+    target = versioned_index_name(versions[-1][0] + 1 if versions else 1)
+    await es.options(request_timeout=SNAPSHOT_TIMEOUT).snapshot.restore(
+        repository=SNAPSHOT_REPOSITORY,
+        snapshot=snapshot,
+        indices=source,
+        rename_pattern=f"^{re.escape(source)}$",
+        rename_replacement=target,
+        include_aliases=False,
+        include_global_state=False,
+        wait_for_completion=True,
+    )
+    logger.info("Restored '%s' from snapshot '%s' as '%s'.", source, snapshot, target)
+    return target
 
 @asynccontextmanager
 async def lifespan(app):
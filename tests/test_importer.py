@@ -0,0 +1,384 @@
+# tests/test_importer.py
+import json
+
+import pytest
+
+from importer.parsing import RowParseError, parse_recipe_row
+
+
+def _row(data: dict, **columns) -> dict:
+    row = {"data": json.dumps(data, ensure_ascii=False), "category": "", "dish_name": "백종원 김치찌개"}
+    row.update(columns)
+    return row
+
+
+def test_parse_recipe_row_normalizes_fields():
+    """JSON category 우선, 숫자 컬럼 변환, 재료 이름 중복 제거가 적용되는지 테스트"""
+    record = parse_recipe_row(_row(
+        {
+            "category": " 김치찌개 ",
+            "title": "황금 레시피",
+            "ingredients": [
+                {"name": "김치", "quantity": "1/4포기"},
+                {"name": " 김치 ", "quantity": "중복"},
+                {"name": "", "quantity": "무시"},
+            ],
+        },
+        difficulty="2", cooking_time="약 30분",
+    ))
+
+    assert record["dish_name"] == "김치찌개"
+    assert record["difficulty"] == 2
+    assert record["cooking_time"] is None
+    assert record["ingredients"] == [("김치", "1/4포기", "김치")]
+
+
+def test_parse_recipe_row_falls_back_to_csv_category():
+    record = parse_recipe_row(_row({"title": "t"}, category="된장찌개"))
+    assert record["dish_name"] == "된장찌개"
+
+
+@pytest.mark.parametrize("row", [
+    {"data": "{broken", "category": "x", "dish_name": "y"},
+    _row({"title": "t"}),
+    _row({"category": "김치찌개"}, dish_name=" "),
+    {"data": None, "category": "김치찌개", "dish_name": "y"},          # 컬럼이 모자란 짧은 행
+    {"data": "[1, 2]", "category": "김치찌개", "dish_name": "y"},      # 객체가 아닌 JSON
+    _row({"category": "김치찌개", "ingredients": ["김치", "두부"]}),    # 문자열 재료
+    _row({"category": ["김치찌개"]}),                                  # 문자열이 아닌 category
+])
+def test_parse_recipe_row_rejects_invalid_rows(row):
+    with pytest.raises(RowParseError):
+        parse_recipe_row(row)
+
+
+def test_parse_recipe_row_maps_ingredients_to_canonical_names():
+    """별칭/동의어/수량 표기가 대표 재료 하나로 합쳐지고, 원본 이름은 남는지 테스트"""
+    from importer.normalize import IngredientNormalizer
+
+    normalizer = IngredientNormalizer(aliases={"파": "대파", "쪽파": "대파"}, compounds=["돼지고기"])
+    record = parse_recipe_row(_row(
+        {
+            "category": "김치찌개",
+            "ingredients": [
+                {"name": "대파 1대", "quantity": None},
+                {"name": "파", "quantity": "조금"},
+                {"name": "돼지 고기(목살) 300g", "quantity": "300g"},
+                {"name": "재료0", "quantity": "1개"},
+            ],
+        },
+    ), normalizer)
+
+    assert record["ingredients"] == [
+        ("대파", None, "대파 1대"),
+        ("돼지고기", "300g", "돼지 고기(목살) 300g"),
+        ("재료0", "1개", "재료0"),
+    ]
+
+
+def test_iter_recipe_rows_skips_malformed_shape_rows(tmp_path):
+    """모양이 어긋난 행이 임포트 전체를 멈추지 않고 행 번호와 함께 오류로 전달되는지 테스트"""
+    from importer.parsing import iter_recipe_rows
+
+    path = tmp_path / "a.csv"
+    path.write_text(
+        'data,category,dish_name\n'
+        '"{""category"": ""김치찌개"", ""ingredients"": [""김치""]}",,r1\n'
+        '"[1, 2]",김치찌개\n'
+        '"{""category"": ""된장찌개""}",,r3\n',
+        encoding="utf-8",
+    )
+
+    rows = list(iter_recipe_rows(str(path)))
+
+    assert [(r.row_no, r.error is None) for r in rows] == [(1, False), (2, False), (3, True)]
+    assert rows[0].error.startswith("❌ 레시피 형식 오류 (AttributeError")
+    assert rows[2].record["dish_name"] == "된장찌개"
+
+
+def test_iter_parsed_rows_parallel_keeps_per_file_order(tmp_path):
+    """여러 워커로 파싱해도 모든 행이 전달되고, 파일 안의 행 순서는 유지되는지 테스트"""
+    import csv
+    from importer.pipeline import iter_parsed_rows
+
+    paths = []
+    for name in ("a.csv", "b.csv"):
+        path = tmp_path / name
+        with open(path, "w", encoding="utf-8", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=["data", "category", "dish_name"])
+            writer.writeheader()
+            for i in range(5):
+                writer.writerow({"data": json.dumps({"category": "김치찌개"}), "category": "", "dish_name": f"r{i}"})
+            writer.writerow({"data": "{broken", "category": "", "dish_name": "bad"})
+        paths.append(str(path))
+
+    done = {}
+    rows = list(iter_parsed_rows(paths, workers=2, chunk_rows=2, on_file_done=done.__setitem__))
+
+    assert done == {"a.csv": 6, "b.csv": 6}
+    for name in done:
+        file_rows = [r for r in rows if r.source_file == name]
+        assert [r.row_no for r in file_rows] == list(range(1, 7))
+        assert file_rows[-1].error is not None
+
+
+def test_manifest_annotate_disambiguates_duplicate_keys():
+    """같은 파일 안에서 행 키가 겹치면 접미사로 구분하고, 내용이 같으면 해시도 같은지 테스트"""
+    from importer.manifest import ImportManifestStore
+    from importer.parsing import ParsedRow
+
+    store = ImportManifestStore(db=None, base_path="/data")
+    record = parse_recipe_row(_row({"category": "김치찌개", "url": "http://youtu.be/x"}))
+    first = store.annotate("/data/레시피 모음", ParsedRow("a.csv", 1, record))
+    second = store.annotate("/data/레시피 모음", ParsedRow("a.csv", 2, record))
+
+    assert first.meta["source_file"] == "레시피 모음/a.csv"
+    assert (first.meta["row_key"], second.meta["row_key"]) == ("http://youtu.be/x", "http://youtu.be/x#2")
+    assert first.meta["content_hash"] == second.meta["content_hash"]
+
+
+def test_generate_catalog_is_reproducible_and_importable(tmp_path):
+    """합성 데이터셋이 임포트와 같은 파서로 오류 없이 읽히고, 같은 시드면 같은 내용이 나오는지 테스트"""
+    from importer.pipeline import iter_parsed_rows
+    from importer.synthetic import generate_catalog
+
+    summary = generate_catalog(str(tmp_path / "a"), recipes=50, dishes=30, ingredients=60, files=3, seed=7)
+    generate_catalog(str(tmp_path / "b"), recipes=50, dishes=30, ingredients=60, files=3, seed=7)
+
+    recipe_dir = tmp_path / "a" / "레시피 모음"
+    rows = list(iter_parsed_rows(sorted(str(p) for p in recipe_dir.iterdir())))
+    assert summary == {"recipes": 50, "dishes": 30, "ingredients": 60, "files": 3}
+    assert len(rows) == 50 and all(r.error is None for r in rows)
+    for name in ("레시피 모음/recipes_000.csv", "요리 설명/descriptions.json", "재료/ingredients.json"):
+        assert (tmp_path / "a" / name).read_bytes() == (tmp_path / "b" / name).read_bytes()
+
+
+def test_find_near_duplicates_groups_within_dish_only():
+    """재료/제목이 거의 같은 레시피는 같은 dish 안에서만 먼저 나온 레시피로 묶이는지 테스트"""
+    from importer.dedup import find_near_duplicates
+
+    base = ["김치", "돼지고기", "대파", "두부", "양파", "고춧가루", "마늘", "간장"]
+    rows = [
+        (1, 10, "백종원 김치찌개", base),
+        (1, 11, "백종원 김치찌개 2", base),                # 숫자만 다른 제목 → 중복
+        (1, 12, "초간단 된장 레시피", ["된장", "애호박", "감자"]),
+        (2, 13, "백종원 김치찌개", base),                  # 다른 dish 는 비교하지 않음
+    ]
+
+    assert find_near_duplicates(rows, threshold=0.8) == {11: (1, 10)}
+
+
+def test_ingredient_hierarchy_expands_to_narrower_ingredients(tmp_path):
+    """부모 맵 파일이 category 보다 우선하고, 레시피 재료가 계층 아래 재료까지 넓혀지는지 테스트 (순환은 무시)"""
+    from importer.hierarchy import IngredientHierarchy
+
+    path = tmp_path / "hierarchy.json"
+    path.write_text(json.dumps({"돼지고기": ["삼겹살", "목살"], "삼겹살": ["돼지고기"]}, ensure_ascii=False),
+                    encoding="utf-8")
+    hierarchy = IngredientHierarchy.from_sources(
+        [("삼겹살", "육류"), ("돼지고기", "육류"), ("대파", "채소"), ("채소", "채소")], str(path)
+    )
+
+    assert hierarchy.ancestors("삼겹살") == ["돼지고기", "육류"]
+    assert hierarchy.expand(["돼지고기", "대파"]) == ["돼지고기", "대파", "목살", "삼겹살"]
+    assert hierarchy.expand(["육류"]) == ["육류", "돼지고기", "목살", "삼겹살"]
+
+
+def test_checked_in_dictionaries_never_map_ingredients_to_dish_names():
+    """저장소의 기본 사전으로 만든 정규화기가 재료를 요리 이름(synonym-set.txt)으로 합치지 않는지 테스트"""
+    from importer.normalize import IngredientNormalizer
+    from search_client import INGREDIENT_SYNONYM_FILE_PATH, SYNONYM_FILE_PATH, USERDICT_FILE_PATH
+
+    dish_names = set()
+    with open(SYNONYM_FILE_PATH, "r", encoding="utf-8") as f:
+        for line in f:
+            if line.strip() and not line.startswith("#"):
+                dish_names.update(term.strip() for term in line.replace("=>", ",").split(",") if term.strip())
+    normalizer = IngredientNormalizer.from_files([INGREDIENT_SYNONYM_FILE_PATH], USERDICT_FILE_PATH)
+
+    assert normalizer.canonical("파") == normalizer.canonical("대파 1대") == "대파"
+    for raw in ("떡볶이떡", "라면사리", "프라이", "후라이"):
+        assert normalizer.canonical(raw) == raw
+    assert {alias: canonical for alias, canonical in normalizer.aliases.items() if canonical in dish_names} == {}
+
+
+def test_resume_replays_skipped_keys_like_an_uninterrupted_import(tmp_path):
+    """체크포인트 이후부터 재개해도 겹치는 키의 '#N' 번호가 끊김 없는 임포트와 같은지 테스트"""
+    import csv
+    from importer.manifest import ImportManifestStore
+    from importer.parsing import iter_recipe_rows
+
+    path = tmp_path / "a.csv"
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=["data", "category", "dish_name"])
+        writer.writeheader()
+        for name in ("김치찌개", "된장찌개", "{broken", "김치찌개", "김치찌개", "된장찌개"):
+            data = "{broken" if name == "{broken" else json.dumps({"category": name})
+            writer.writerow({"data": data, "category": "", "dish_name": "같은 이름"})
+
+    def keys(store, skip_rows=0):
+        return [store.annotate(str(tmp_path), parsed).meta["row_key"]
+                for parsed in iter_recipe_rows(str(path), skip_rows) if parsed.error is None]
+
+    full = keys(ImportManifestStore(db=None, base_path=str(tmp_path)))
+    resumed_store = ImportManifestStore(db=None, base_path=str(tmp_path))
+    assert resumed_store.replay_keys(str(tmp_path), str(path), row_offset=4) == 3
+    resumed = keys(resumed_store, skip_rows=4)
+
+    assert resumed == full[3:] == ["김치찌개|같은 이름|#3", "된장찌개|같은 이름|#2"]
+
+
+def test_checkpoint_on_batch_records_last_row_per_file():
+    """배치 훅이 파일별 가장 큰 행 번호를, 완료 표시는 파일별 전체 행 수를 기록하는지 테스트"""
+    from unittest.mock import MagicMock
+    from importer.checkpoint import ImportCheckpointStore
+    from importer.parsing import ParsedRow
+
+    store = ImportCheckpointStore(db=MagicMock())
+    store._upsert = MagicMock()
+    store.on_batch([(ParsedRow("a.csv", 3, {}), 1), (ParsedRow("b.csv", 1, {}), 2), (ParsedRow("a.csv", 5, {}), 3)])
+    store.mark_completed(["a.csv"], {"a.csv": 7})
+
+    assert store._upsert.call_args_list[0].args[0] == [
+        {"source_file": "a.csv", "row_offset": 5, "completed": False},
+        {"source_file": "b.csv", "row_offset": 1, "completed": False},
+    ]
+    assert store._upsert.call_args_list[1].args[0] == [{"source_file": "a.csv", "row_offset": 7, "completed": True}]
+    store.db.commit.assert_called_once()
+
+
+def test_upsert_ingredients_sends_chunked_on_conflict_updates():
+    """마스터 재료가 chunk 단위 INSERT ... ON CONFLICT 로 가고, 같은 이름은 마지막 값, 추가/갱신 건수를 세는지 테스트"""
+    from unittest.mock import MagicMock
+    from sqlalchemy.dialects import postgresql
+    from importer.bulk import upsert_dishes, upsert_ingredients
+
+    db = MagicMock()
+    db.execute.side_effect = [[(True,), (False,)], [(True,)]]
+    entries = [{"name": "대파", "category": "채소"}, {"name": "양파"}, {"name": "대파", "category": "파류"}, {"name": "김치"}]
+
+    assert upsert_ingredients(db, entries, chunk_size=2) == (2, 1)
+    assert db.execute.call_count == 2
+    first = db.execute.call_args_list[0].args[0].compile(dialect=postgresql.dialect())
+    assert "ON CONFLICT (name) DO UPDATE" in str(first) and "IS DISTINCT FROM" in str(first)
+    assert (first.params["name_m0"], first.params["category_m0"], first.params["name_m1"]) == ("대파", "파류", "양파")
+
+    db = MagicMock()
+    db.execute.return_value = [(7, True), (3, False)]
+    assert upsert_dishes(db, {"김치찌개": "설명", "된장찌개": "바뀐 설명", "": "무시"}) == ([7], [3])
+
+
+def test_incremental_import_rewrites_only_changed_rows(monkeypatch, tmp_path):
+    """해시가 같은 파일은 읽지 않고, 바뀐 파일 안에서도 새 행/내용이 바뀐 행만 다시 쓰며, 합쳐진 중복 행은 건너뛰는지 테스트"""
+    import csv
+    from unittest.mock import MagicMock
+    import es_db_manage
+    from importer.manifest import record_hash
+
+    rows = {"a.csv": ["김치찌개"], "b.csv": ["김치찌개", "된장찌개", "부대찌개", "부대찌개"]}
+    for name, dishes in rows.items():
+        with open(tmp_path / name, "w", encoding="utf-8", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=["data", "category", "dish_name"])
+            writer.writeheader()
+            for dish in dishes:
+                writer.writerow({"data": json.dumps({"category": dish}), "category": "", "dish_name": "r"})
+    writer = MagicMock(written=0, failed=0, written_dish_ids=set(), written_recipe_ids=set())
+    monkeypatch.setattr(es_db_manage, "BulkRecipeWriter", lambda *args, **kwargs: writer)
+    monkeypatch.setattr(es_db_manage, "RECIPE_DIR_PATH", str(tmp_path))
+    manager = es_db_manage.DBManager({})
+    manager.normalizer = None
+    manager.manifest = es_db_manage.ImportManifestStore(db=None, base_path=str(tmp_path))
+    manager.manifest.file_changed = lambda path: path.endswith("b.csv")
+    unchanged = parse_recipe_row({"data": json.dumps({"category": "김치찌개"}), "category": "", "dish_name": "r"})
+    manager.manifest.row_entries = lambda path: {
+        "김치찌개|r|": (record_hash(unchanged), 10),
+        "된장찌개|r|": ("old-hash", 11),
+        "부대찌개|r|#2": ("merged-hash", None),  # dedup merge 로 지운 중복 (tombstone)
+    }
+    manager._mark_recipe_files = MagicMock()
+
+    manager._upsert_changed_recipes([str(tmp_path / "a.csv"), str(tmp_path / "b.csv")])
+
+    written = [(call.args[0].record["dish_name"], call.kwargs["recipe_id"]) for call in writer.add.call_args_list]
+    assert written == [("된장찌개", 11), ("부대찌개", None)]
+    manager._mark_recipe_files.assert_called_once_with([str(tmp_path / "b.csv")], writer)
+
+
+def test_profiler_accumulates_phases_and_db_round_trips(tmp_path):
+    """단계별 호출 수/행 수/읽은 바이트와, 단계 안에서 실행된 DB 왕복 수를 세어 리포트로 남기는지 테스트"""
+    from sqlalchemy import create_engine, text
+    from utils.profiling import PipelineProfiler
+
+    engine = create_engine("sqlite://")
+    source = tmp_path / "a.csv"
+    source.write_bytes(b"x" * 10)
+    profiler = PipelineProfiler(engine, enabled=True, label="db import_all")
+
+    with engine.connect() as conn:
+        for _ in range(2):
+            with profiler.phase("recipes"):
+                conn.execute(text("SELECT 1"))
+                conn.execute(text("SELECT 2"))
+        conn.execute(text("SELECT 3"))  # 단계 밖
+    profiler.add("recipes", rows=5, files=[str(source), str(tmp_path / "missing.csv")])
+    path = profiler.write(directory=str(tmp_path))
+
+    report = json.loads(open(path, encoding="utf-8").read())
+    (recipes,) = report["phases"]
+    assert (recipes["calls"], recipes["db_round_trips"], recipes["rows"], recipes["bytes_read"]) == (2, 4, 5, 10)
+    assert report["command"] == "db import_all" and report["db_round_trips"] == 5
+    assert PipelineProfiler(engine).write(directory=str(tmp_path)) is None
+
+
+def test_dedup_flag_mode_reports_recipes_no_longer_flagged():
+    """flag 모드에서 이전에 중복으로 표시됐다가 이번에 풀린 레시피를 다시 색인 대상으로 돌려주는지 테스트"""
+    from unittest.mock import MagicMock
+    from importer.dedup import apply_near_duplicates
+
+    base = ["김치", "돼지고기", "대파", "두부", "양파", "고춧가루", "마늘", "간장"]
+    db = MagicMock()
+    db.execute.return_value = [(1, 10, "백종원 김치찌개", base), (1, 11, "백종원 김치찌개 2", base)]
+    db.scalars.return_value = [11, 12]  # 기존 표시: 11 은 다시 표시되고 12 는 풀림
+
+    result = apply_near_duplicates(db, mode="flag", dish_ids=[1])
+
+    assert result.duplicates == {11: 10} and result.removed_docs == [(1, 11)]
+    assert result.restored_ids == [12]
+
+
+def test_dedup_merge_tombstones_manifest_rows():
+    """merge 모드가 중복 레시피의 매니페스트 행을 대표 레시피로 돌리지 않고 recipe_id 를 비우는지 테스트"""
+    from unittest.mock import MagicMock
+    from sqlalchemy.dialects import postgresql
+    from importer.dedup import apply_near_duplicates
+
+    base = ["김치", "돼지고기", "대파", "두부", "양파", "고춧가루", "마늘", "간장"]
+    db = MagicMock()
+    db.execute.return_value = [(1, 10, "백종원 김치찌개", base), (1, 11, "백종원 김치찌개 2", base)]
+    db.scalars.return_value = []
+
+    result = apply_near_duplicates(db, mode="merge", dish_ids=[1])
+
+    statements = [call.args[0].compile(dialect=postgresql.dialect()) for call in db.execute.call_args_list[1:]]
+    manifest = next(stmt for stmt in statements if str(stmt).startswith("UPDATE import_manifest"))
+    assert "SET recipe_id=%(recipe_id)s" in str(manifest) and manifest.params["recipe_id"] is None
+    assert result.duplicates == {11: 10} and result.restored_ids == []
+
+
+async def test_master_ingredients_are_imported_under_canonical_names(monkeypatch, tmp_path):
+    """마스터 재료도 레시피 재료와 같은 대표 이름으로 upsert 되는지 테스트 ('파' 와 '대파' 가 따로 생기지 않음)"""
+    from unittest.mock import MagicMock
+    import es_db_manage
+
+    path = tmp_path / "ingredients.json"
+    path.write_text(json.dumps([{"name": "파", "category": "파류"}, {"name": "달걀"}, {"name": "두부"}]), encoding="utf-8")
+    upsert = MagicMock(return_value=(3, 0))
+    monkeypatch.setattr(es_db_manage, "INGREDIENTS_FILE_PATH", str(path))
+    monkeypatch.setattr(es_db_manage, "upsert_ingredients", upsert)
+    manager = es_db_manage.DBManager({})
+    manager.manifest = MagicMock()
+
+    await manager._import_ingredients()
+
+    assert [entry["name"] for entry in upsert.call_args.args[1]] == ["대파", "계란", "두부"]
+    assert upsert.call_args.args[1][0]["category"] == "파류"
@@ -0,0 +1,58 @@
+# tests/test_outbox.py
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+import models
+from repositories.outbox import OutboxRepository
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://")
+    models.SearchOutbox.__table__.create(engine)
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+
+
+def test_outbox_claims_pending_events_in_order(db):
+    """쓰기 경로가 남긴 이벤트를 순서대로 가져가고, 처리 표시한 이벤트는 다시 가져가지 않는지 테스트"""
+    outbox = OutboxRepository(db)
+    outbox.enqueue(1, [10, 11])
+    outbox.enqueue(2)
+    db.commit()
+
+    events = outbox.claim_batch(limit=2)
+    assert [(e.dish_id, e.recipe_id) for e in events] == [(1, 10), (1, 11)]
+
+    outbox.mark_processed([e.id for e in events])
+    db.commit()
+    assert [(e.dish_id, e.recipe_id) for e in outbox.claim_batch()] == [(2, None)]
+
+    # 처리 여부와 관계없이 재색인 시작 이후 이벤트는 모두 다시 반영 대상
+    assert outbox.touched_since(datetime.utcnow() - timedelta(minutes=1)) == ([2], [10, 11])
+
+
+async def test_outbox_worker_bumps_search_cache_generation_per_batch(db, monkeypatch):
+    """outbox 워커가 반영한 배치마다 검색 결과 캐시 세대를 올리고, 빈 outbox 에서는 올리지 않는지 테스트"""
+    from unittest.mock import AsyncMock
+    import es_db_manage
+
+    bump = AsyncMock(return_value=7)
+    monkeypatch.setattr(es_db_manage, "bump_generation", bump)
+    outbox = OutboxRepository(db)
+    outbox.enqueue(1, [10, 11])
+    outbox.enqueue(2)
+    db.commit()
+    manager = es_db_manage.ESManager({"once": True, "batch-size": "2"})
+    manager.db = db
+    manager._sync_recipes = AsyncMock(return_value=(1, 0))
+
+    await manager._outbox_worker()
+
+    assert manager._sync_recipes.await_count == 2
+    assert bump.await_count == 2
+    assert outbox.claim_batch() == []
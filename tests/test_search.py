@@ -0,0 +1,689 @@
+# tests/test_search.py
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from repositories.search import SearchRepository
+from search_client import dishes_index_body, validate_synonym_file
+
+
+def test_performance_profile_adds_access_pattern_settings():
+    """performance 프로필은 인덱스 정렬/eager global ordinals/norms 설정을 더하고, default 는 그대로인지 테스트"""
+    default_settings, default_mappings = dishes_index_body("default")
+    settings, mappings = dishes_index_body("performance")
+
+    assert "sort.field" not in default_settings
+    assert settings["sort.field"] == ["dish_id", "recipe_id"]
+    assert mappings["properties"]["ingredients"]["eager_global_ordinals"] is True
+    assert mappings["properties"]["ingredients"]["fields"]["tok"]["norms"] is False
+    assert "norms" not in default_mappings["properties"]["recipe_name"]
+
+
+async def test_search_grouped_dishes_reads_doc_values():
+    """collapse 결과를 _source 대신 docvalue_fields(fields) 에서 읽는지 테스트"""
+    es = MagicMock()
+    es.search = AsyncMock(return_value={
+        "hits": {
+            "total": {"value": 1},
+            "hits": [{
+                "fields": {"dish_id": [7], "dish_name.raw": ["김치찌개"]},
+                "inner_hits": {"top_recipes": {"hits": {"hits": [
+                    {"fields": {"recipe_id": [70]}}, {"fields": {"recipe_id": [71]}},
+                ]}}},
+            }],
+        }
+    })
+
+    res = await SearchRepository(es, index="dishes_bench").search_grouped_dishes(None, ["김치"])
+
+    body = es.search.call_args.kwargs["body"]
+    assert es.search.call_args.kwargs["index"] == "dishes_bench"
+    assert body["_source"] is False and body["collapse"]["inner_hits"]["docvalue_fields"] == ["recipe_id"]
+    assert res == {"total": 1, "results": [{"dish_id": 7, "dish_name": "김치찌개", "recipe_ids": [70, 71]}]}
+
+
+def test_documents_are_routed_by_dish_id():
+    """레시피 문서가 dish_id 로 라우팅되고, 샤드/레플리카 수를 지정할 수 있는지 테스트"""
+    action = SearchRepository.build_recipe_document(
+        dish_id=7, dish_name="김치찌개", description=None,
+        recipe_id=70, recipe_title=None, recipe_name=None, ingredients=["김치"],
+    )
+    settings, mappings = dishes_index_body("default", shards=3, replicas=0)
+
+    assert action["_id"] == "7_70" and action["_routing"] == "7"
+    assert mappings["_routing"] == {"required": True}
+    assert settings["number_of_shards"] == 3 and settings["number_of_replicas"] == 0
+
+
+async def test_dish_layout_uses_nested_inner_hits():
+    """dish 레이아웃은 collapse 없이 nested 쿼리 + inner_hits 로 상위 레시피를 받는지 테스트"""
+    es = MagicMock()
+    es.search = AsyncMock(return_value={
+        "hits": {
+            "total": {"value": 1},
+            "hits": [{
+                "fields": {"dish_id": [7], "dish_name.raw": ["김치찌개"]},
+                "inner_hits": {"top_recipes": {"hits": {"hits": [{"fields": {"recipes.recipe_id": [71]}}]}}},
+            }],
+        }
+    })
+
+    res = await SearchRepository(es, layout="dish").search_grouped_dishes("찌개", ["김치"], topk_per_dish=1)
+
+    body = es.search.call_args.kwargs["body"]
+    nested = body["query"]["bool"]["must"][0]["nested"]
+    assert "collapse" not in body
+    assert nested["path"] == "recipes" and nested["inner_hits"]["size"] == 1
+    assert "recipes.ingredients_expanded" in nested["query"]["bool"]["filter"][0]["terms_set"]
+    assert res["results"] == [{"dish_id": 7, "dish_name": "김치찌개", "recipe_ids": [71]}]
+
+
+def test_dish_layout_mapping_nests_recipe_fields():
+    """dish 레이아웃 매핑에서 레시피 필드가 nested recipes 아래로 옮겨지는지 테스트"""
+    _, mappings = dishes_index_body("default", layout="dish")
+    action = SearchRepository.build_dish_document(
+        dish_id=7, dish_name="김치찌개", description=None,
+        recipes=[{"recipe_id": 70, "recipe_title": "t", "recipe_name": None, "ingredients": None}],
+    )
+
+    assert mappings["properties"]["recipes"]["type"] == "nested"
+    assert "ingredients" in mappings["properties"]["recipes"]["properties"]
+    assert "ingredients" not in mappings["properties"] and mappings["_meta"] == {"layout": "dish"}
+    assert action["_id"] == "7" and action["_source"]["recipes"][0]["ingredients"] == []
+
+
+
+def test_core_mode_drops_staples_from_documents_and_query():
+    """CORE 모드는 기본 재료를 뺀 재료로 core_ingredients 에 RATIO 를 걸고, 기본 재료뿐이면 RATIO 로 돌아가는지 테스트"""
+    repo = SearchRepository(MagicMock())
+    action = SearchRepository.build_recipe_document(
+        dish_id=7, dish_name="김치찌개", description=None,
+        recipe_id=70, recipe_title=None, recipe_name=None, ingredients=["김치", "소금", "물"],
+    )
+
+    core = repo._ingredient_filter(["김치", "소금", "돼지고기"], mode="CORE", ratio=0.5)["terms_set"]
+    staples_only = repo._ingredient_filter(["소금", "물"], mode="CORE")["terms_set"]
+
+    assert action["_source"]["core_ingredients"] == ["김치"]
+    assert core["core_ingredients"]["terms"] == ["김치", "돼지고기"]
+    assert staples_only["ingredients_expanded"]["terms"] == ["소금", "물"]
+
+def test_validate_synonym_file_reports_bad_lines(tmp_path):
+    """동의어 파일 검사: 주석/빈 줄은 건너뛰고 잘못된 줄은 줄 번호와 함께 돌려주는지 테스트"""
+    path = tmp_path / "synonyms.txt"
+    path.write_text("# 주석\n\n삼겹살, 돼지고기\n파 => 대파\n계란\n=> 달걀\n", encoding="utf-8")
+
+    rules, errors = validate_synonym_file(str(path))
+
+    assert rules == 2
+    assert [error.split("행")[0] for error in errors] == ["5", "6"]
+
+
+def test_validate_synonym_file_explains_each_error(tmp_path):
+    """오류 종류마다 줄 번호, 이유, 원래 줄을 알려주고, 읽을 수 없는 파일은 규칙 0개와 오류 하나로 돌려주는지 테스트"""
+    path = tmp_path / "synonyms.txt"
+    path.write_text("삼겹살, 돼지고기\na => b => c\n파, , 대파\n계란\n", encoding="utf-8")
+
+    rules, errors = validate_synonym_file(str(path))
+    missing_rules, missing_errors = validate_synonym_file(str(tmp_path / "없는파일.txt"))
+
+    assert rules == 1
+    assert errors == [
+        "2행: '=>' 가 두 번 이상 있습니다: a => b => c",
+        "3행: 빈 항목이 있습니다: 파, , 대파",
+        "4행: 동의어가 하나뿐입니다: 계란",
+    ]
+    assert missing_rules == 0 and len(missing_errors) == 1 and missing_errors[0].startswith("파일을 읽을 수 없습니다")
+
+
+async def test_reload_search_analyzers_clears_request_cache():
+    """분석기 리로드 후 요청 캐시를 비우고, 리로드된 노드/분석기를 모아 돌려주는지 테스트"""
+    es = MagicMock()
+    es.indices.reload_search_analyzers = AsyncMock(return_value={
+        "_shards": {"total": 2, "successful": 2, "failed": 0},
+        "reload_details": [{"index": "dishes_v3", "reloaded_analyzers": ["ko_search_analyzer"],
+                            "reloaded_node_ids": ["n2", "n1"]}],
+    })
+    es.indices.clear_cache = AsyncMock()
+
+    result = await SearchRepository(es).reload_search_analyzers()
+
+    es.indices.clear_cache.assert_awaited_once_with(index="dishes", request=True)
+    assert result == {"indices": ["dishes_v3"], "reloaded_analyzers": ["ko_search_analyzer"],
+                      "reloaded_nodes": ["n1", "n2"], "shards_failed": 0}
+
+
+async def test_search_cache_normalizes_request_and_counts_hits(monkeypatch):
+    """재료 순서/중복/공백이 달라도 같은 캐시 키이고, 세대가 바뀌면 키가 바뀌며, hit/miss 를 세는지 테스트"""
+    import search_cache
+    from schemas.dish import SearchRequest
+
+    first = search_cache.normalize_search_request(SearchRequest(ingredients=["김치", " 양파", "김치"], q=" "))
+    second = search_cache.normalize_search_request(SearchRequest(ingredients=["양파", "김치"]))
+    assert first == second and first["ingredients"] == ["김치", "양파"] and first["q"] is None
+    assert search_cache.search_cache_key(first, 1) != search_cache.search_cache_key(first, 2)
+
+    fake = MagicMock()
+    fake.get = AsyncMock(
+        side_effect=lambda key: "3" if key == search_cache.SEARCH_GENERATION_KEY else '{"total": 0, "results": []}'
+    )
+    fake.hincrby = AsyncMock()
+    monkeypatch.setattr(search_cache, "redis_client", fake)
+
+    key, cached = await search_cache.get_cached_result(first)
+
+    assert key == search_cache.search_cache_key(first, 3)
+    assert cached == {"total": 0, "results": []}
+    fake.hincrby.assert_awaited_once_with(search_cache.SEARCH_CACHE_STATS_KEY, "hits", 1)
+
+
+async def test_slow_search_cache_does_not_block_event_loop(monkeypatch):
+    """Redis 가 느려도 캐시 조회 중에 다른 요청(코루틴)이 계속 진행되는지 테스트"""
+    import asyncio
+    import search_cache
+
+    async def slow_get(key):
+        await asyncio.sleep(0.2)
+        return None
+
+    fake = MagicMock()
+    fake.get = AsyncMock(side_effect=slow_get)
+    fake.hincrby = AsyncMock()
+    monkeypatch.setattr(search_cache, "redis_client", fake)
+    ticks = 0
+
+    async def other_request():
+        nonlocal ticks
+        while True:
+            ticks += 1
+            await asyncio.sleep(0.01)
+
+    other = asyncio.create_task(other_request())
+    key, cached = await search_cache.get_cached_result({"ingredients": ["김치"]})
+    other.cancel()
+
+    assert key is not None and cached is None
+    assert ticks >= 10
+
+
+async def test_search_cache_failures_do_not_fail_requests(monkeypatch):
+    """Redis 장애 시 조회는 캐시 없이, 통계는 error 와 null 로, 동의어 리로드는 generation null 로 성공하는지 테스트"""
+    import redis
+    import search_cache
+    import api.v1.routes.dishes as dishes_routes
+
+    fake = MagicMock()
+    for method in ("get", "incr", "hgetall", "hincrby", "set"):
+        setattr(fake, method, AsyncMock(side_effect=redis.ConnectionError("connection refused")))
+    monkeypatch.setattr(search_cache, "redis_client", fake)
+    monkeypatch.setattr(dishes_routes, "validate_synonym_file", lambda: (3, []))
+    search_repo = MagicMock()
+    search_repo.reload_search_analyzers = AsyncMock(return_value={"shards_failed": 0})
+
+    assert await search_cache.get_cached_result({"ingredients": ["김치"]}) == (None, None)
+    stats = await dishes_routes.get_search_cache_stats(None)
+    reloaded = await dishes_routes.reload_synonyms(search_repo, None)
+
+    assert stats["generation"] is None and stats["hits"] is None and "connection refused" in stats["error"]
+    assert reloaded == {"rules": 3, "shards_failed": 0, "generation": None}
+
+
+async def test_search_hydrated_loads_all_cards_with_one_recipe_query(monkeypatch):
+    """모든 카드의 recipe_ids 를 한 번에 읽고, 카드마다 ES 순서대로 나눠 담는지 테스트 (DB에 없는 id 는 건너뜀)"""
+    from types import SimpleNamespace
+    import api.v1.routes.dishes as dishes_routes
+    from schemas.dish import HydratedSearchRequest, HydratedSearchResponse
+
+    monkeypatch.setattr(dishes_routes, "get_cached_result", AsyncMock(return_value=(None, None)))
+    search_repo = MagicMock()
+    search_repo.search_grouped_dishes = AsyncMock(return_value={"total": 2, "results": [
+        {"dish_id": 1, "dish_name": "김치찌개", "recipe_ids": [12, 10]},
+        {"dish_id": 2, "dish_name": "된장찌개", "recipe_ids": [99, 20]},
+    ]})
+    repo = MagicMock()
+    repo.get_recipes_by_ids_ordered.return_value = [
+        SimpleNamespace(id=rid, title=f"레시피 {rid}", difficulty=None, cooking_time=None, thumbnail_url=None)
+        for rid in (12, 10, 20)
+    ]
+
+    res = await dishes_routes.search_hydrated_dishes(
+        HydratedSearchRequest(ingredients=["김치"]), search_repo, repo, None
+    )
+
+    repo.get_recipes_by_ids_ordered.assert_called_once_with([12, 10, 99, 20], "summary")
+    cards = HydratedSearchResponse.model_validate(res).results
+    assert [[recipe.id for recipe in card.recipes] for card in cards] == [[12, 10], [20]]
+
+
+@pytest.mark.parametrize("second_card, reads_db", [
+    ({"recipe_id": 20, "title": "된장", "thumbnail_url": None, "cooking_time": 10, "difficulty": 1}, False),
+    ({"recipe_id": 20}, True),  # card 없이 색인된 옛 인덱스 문서
+    (None, True),  # recipe_ids 에는 있는데 카드 항목이 없음
+])
+async def test_search_hydrated_summary_uses_cards_only_when_every_recipe_has_one(monkeypatch, second_card, reads_db):
+    """요약 카드는 모든 recipe_ids 에 필드를 갖춘 card 가 있을 때만 ES 결과로 만들고, 아니면 DB 에서 읽는지 테스트"""
+    from types import SimpleNamespace
+    import api.v1.routes.dishes as dishes_routes
+    from schemas.dish import HydratedSearchRequest
+
+    monkeypatch.setattr(dishes_routes, "get_cached_result", AsyncMock(return_value=(None, None)))
+    first_card = {"recipe_id": 10, "title": "김치", "thumbnail_url": "t.jpg", "cooking_time": 20, "difficulty": 2}
+    search_repo = MagicMock()
+    search_repo.search_grouped_dishes = AsyncMock(return_value={"total": 2, "results": [
+        {"dish_id": 1, "dish_name": "김치찌개", "recipe_ids": [10], "recipes": [first_card]},
+        {"dish_id": 2, "dish_name": "된장찌개", "recipe_ids": [20], "recipes": [second_card] if second_card else []},
+    ]})
+    repo = MagicMock()
+    repo.get_recipes_by_ids_ordered.return_value = [
+        SimpleNamespace(id=rid, title=f"레시피 {rid}", difficulty=None, cooking_time=None, thumbnail_url=None)
+        for rid in (10, 20)
+    ]
+
+    res = await dishes_routes.search_hydrated_dishes(
+        HydratedSearchRequest(ingredients=["김치"]), search_repo, repo, None
+    )
+
+    assert repo.get_recipes_by_ids_ordered.called is reads_db
+    assert [[recipe.id for recipe in card["recipes"]] for card in res["results"]] == [[10], [20]]
+    assert res["results"][0]["recipes"][0].title == ("레시피 10" if reads_db else "김치")
+
+
+async def test_card_fields_are_indexed_and_read_from_inner_hits(monkeypatch):
+    """ES_CARD_FIELDS 를 켜면 문서에 card 가 들어가고, 검색 결과 recipes 가 inner_hits _source 에서 채워지는지 테스트"""
+    import repositories.search as search_module
+    monkeypatch.setattr(search_module, "CARD_FIELDS", True)
+    action = SearchRepository.build_recipe_document(
+        dish_id=7, dish_name="김치찌개", description=None, recipe_id=70, recipe_title="백종원 김치찌개",
+        recipe_name=None, ingredients=["김치", "두부"], thumbnail_url="t.jpg", cooking_time=20, difficulty=2,
+    )
+    card = action["_source"]["card"]
+    es = MagicMock()
+    es.search = AsyncMock(return_value={"hits": {"total": {"value": 1}, "hits": [{
+        "fields": {"dish_id": [7], "dish_name.raw": ["김치찌개"]},
+        "inner_hits": {"top_recipes": {"hits": {"hits": [{"fields": {"recipe_id": [70]}, "_source": {"card": card}}]}}},
+    }]}})
+
+    res = await SearchRepository(es, layout="recipe").search_grouped_dishes(None, ["김치"])
+
+    assert card == {"title": "백종원 김치찌개", "thumbnail_url": "t.jpg", "cooking_time": 20, "difficulty": 2,
+                    "ingredient_count": 2}
+    assert es.search.call_args.kwargs["body"]["collapse"]["inner_hits"]["_source"] == {"includes": ["card"]}
+    assert res["results"][0]["recipes"] == [{"recipe_id": 70, **card}]
+
+
+async def test_cursor_pagination_uses_point_in_time():
+    """paginate 는 PIT 를 열고, 커서로 다음 페이지(collapse: from / dish: search_after)를 읽고, 마지막 페이지에서 PIT 를 닫는지 테스트"""
+    def page(dish_ids, nested=False):
+        key = "recipes.recipe_id" if nested else "recipe_id"
+        return {"pit_id": "pit-2", "hits": {"total": {"value": 3}, "hits": [
+            {"fields": {"dish_id": [d], "dish_name.raw": ["d"]}, "sort": [1.0, d],
+             "inner_hits": {"top_recipes": {"hits": {"hits": [{"fields": {key: [d * 10]}}]}}}}
+            for d in dish_ids
+        ]}}
+
+    es = MagicMock()
+    es.open_point_in_time = AsyncMock(return_value={"id": "pit-1"})
+    es.close_point_in_time = AsyncMock()
+    es.search = AsyncMock(side_effect=[page([1, 2]), page([3])])
+    repo = SearchRepository(es, layout="recipe")
+
+    first = await repo.search_grouped_dishes(None, ["김치"], size=2, paginate=True)
+    second = await repo.search_grouped_dishes(None, ["김치"], size=2, cursor=first["next_cursor"])
+
+    bodies = [call.kwargs["body"] for call in es.search.call_args_list]
+    assert "index" not in es.search.call_args.kwargs
+    assert [b["pit"]["id"] for b in bodies] == ["pit-1", "pit-2"] and [b["from"] for b in bodies] == [0, 2]
+    assert second["next_cursor"] is None
+    es.close_point_in_time.assert_awaited_once_with(id="pit-2")
+    with pytest.raises(ValueError):
+        await repo.search_grouped_dishes(None, ["두부"], size=2, cursor=first["next_cursor"])
+
+    es.search = AsyncMock(side_effect=[page([1, 2], nested=True), page([3], nested=True)])
+    dish_repo = SearchRepository(es, layout="dish")
+    first = await dish_repo.search_grouped_dishes(None, ["김치"], size=2, paginate=True)
+    await dish_repo.search_grouped_dishes(None, ["김치"], size=2, cursor=first["next_cursor"])
+
+    body = es.search.call_args.kwargs["body"]
+    assert body["sort"] == [{"_score": "desc"}, {"dish_id": "asc"}] and body["search_after"] == [1.0, 2]
+
+
+@pytest.mark.parametrize("state", [
+    {"pit": "pit-1", "from": "10"},
+    {"pit": "pit-1", "from": -5},
+    {"pit": "pit-1", "from": True},
+    {"pit": "pit-1", "after": "1.0,2"},
+    {"pit": "pit-1", "after": [1.0, -2]},
+    {"pit": "pit-1", "after": [1.0, {"x": 1}]},
+    {"pit": 7},
+])
+async def test_tampered_cursor_fields_are_rejected(state):
+    """디코딩한 커서의 from/search_after/pit 이 잘못된 모양이면 ES 로 보내지 않고 ValueError(→ 400) 인지 테스트"""
+    import base64
+    import json
+
+    es = MagicMock()
+    es.search = AsyncMock()
+    repo = SearchRepository(es, layout="recipe")
+    state = {**state, "fp": repo._request_fingerprint(None, ["김치"], 3, "RATIO", 0.6)}
+    cursor = base64.urlsafe_b64encode(json.dumps(state).encode("utf-8")).decode("ascii")
+
+    with pytest.raises(ValueError, match="잘못된 커서"):
+        await repo.search_grouped_dishes(None, ["김치"], size=2, cursor=cursor)
+    es.search.assert_not_awaited()
+
+
+@pytest.mark.parametrize("cursor, error_type, expected", [
+    ("c", "search_context_missing_exception", 410),
+    (None, "search_context_missing_exception", 503),
+    ("c", "index_not_found_exception", 503),
+])
+async def test_grouped_search_maps_only_missing_pit_to_gone(monkeypatch, cursor, error_type, expected):
+    """만료된 PIT 로 커서를 읽을 때만 410 이고, 인덱스/별칭이 없는 404 는 503 인지 테스트"""
+    from types import SimpleNamespace
+    from elasticsearch import NotFoundError
+    from fastapi import HTTPException
+    import api.v1.routes.dishes as dishes_routes
+    from schemas.dish import SearchRequest
+
+    monkeypatch.setattr(dishes_routes, "get_cached_result", AsyncMock(return_value=(None, None)))
+    body = {"error": {"root_cause": [{"type": error_type}], "type": error_type}, "status": 404}
+    search_repo = MagicMock()
+    search_repo.search_grouped_dishes = AsyncMock(side_effect=NotFoundError(error_type, SimpleNamespace(status=404), body))
+
+    with pytest.raises(HTTPException) as exc:
+        await dishes_routes._grouped_search(SearchRequest(ingredients=["김치"], cursor=cursor), search_repo)
+
+    assert exc.value.status_code == expected
+
+
+def _bulk_actions(count: int):
+    async def actions():
+        for i in range(count):
+            yield {"_index": "dishes_v2", "_id": f"1_{i}", "_routing": "1", "_source": {"recipe_id": i}}
+    return actions()
+
+
+def _bulk_response(*statuses: int) -> dict:
+    return {"items": [{"index": {"_id": f"doc{i}", "status": status}} for i, status in enumerate(statuses)]}
+
+
+async def test_concurrent_bulk_index_resends_only_rejected_items(monkeypatch):
+    """bulk 응답에서 429 로 거절된 문서만 backoff 뒤 다시 보내고, 통계를 세는지 테스트"""
+    import asyncio
+    sleep = AsyncMock()
+    monkeypatch.setattr(asyncio, "sleep", sleep)
+    es = MagicMock()
+    es.bulk = AsyncMock(side_effect=[_bulk_response(201, 429, 201), _bulk_response(201)])
+
+    stats = await SearchRepository(es).concurrent_bulk_index(_bulk_actions(3))
+
+    retried = es.bulk.await_args_list[1].kwargs["operations"]
+    assert retried == [{"index": {"_index": "dishes_v2", "_id": "1_1", "routing": "1"}}, {"recipe_id": 1}]
+    assert stats == {"success": 3, "failed": 0, "rejected": 1, "requests": 2}
+    sleep.assert_awaited_once_with(0.5)
+
+
+async def test_concurrent_bulk_index_backs_off_and_gives_up_on_429(monkeypatch):
+    """요청 전체가 429 면 지수 backoff 로 max_retries 번 다시 보내고, 그래도 안 되면 실패로 세는지 테스트"""
+    import asyncio
+    from types import SimpleNamespace
+    from elasticsearch import ApiError
+    sleep = AsyncMock()
+    monkeypatch.setattr(asyncio, "sleep", sleep)
+    es = MagicMock()
+    es.bulk = AsyncMock(side_effect=ApiError("es_rejected_execution_exception", meta=SimpleNamespace(status=429), body={}))
+
+    stats = await SearchRepository(es).concurrent_bulk_index(_bulk_actions(2), max_retries=2)
+
+    assert es.bulk.await_count == 3
+    assert [call.args[0] for call in sleep.await_args_list] == [0.5, 1.0]
+    assert stats == {"success": 0, "failed": 2, "rejected": 6, "requests": 3}
+
+
+async def test_concurrent_bulk_index_counts_chunks_failed_with_other_errors():
+    """429 가 아닌 오류(ApiError 500, 연결 오류)로 실패한 청크의 문서가 failed 로 세어지는지 테스트 (예외가 묻히지 않음)"""
+    from types import SimpleNamespace
+    from elasticsearch import ApiError, ConnectionError as ESConnectionError
+    es = MagicMock()
+    es.bulk = AsyncMock(side_effect=[
+        ApiError("internal_server_error", meta=SimpleNamespace(status=500), body={}),
+        _bulk_response(201, 201),
+        ESConnectionError("connection reset"),
+        _bulk_response(201, 201),
+        _bulk_response(201, 201),
+    ])
+
+    stats = await SearchRepository(es).concurrent_bulk_index(_bulk_actions(10), concurrency=1, max_chunk_docs=2)
+
+    assert es.bulk.await_count == 5
+    assert stats == {"success": 6, "failed": 4, "rejected": 0, "requests": 4}
+
+
+async def test_concurrent_bulk_index_bounds_in_flight_requests():
+    """청크가 많아도 동시에 날아가는 bulk 요청이 concurrency 개를 넘지 않는지 테스트"""
+    import asyncio
+    in_flight = peak = 0
+
+    async def bulk(operations):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        return _bulk_response(*[201] * (len(operations) // 2))
+
+    es = MagicMock()
+    es.bulk = AsyncMock(side_effect=bulk)
+
+    stats = await SearchRepository(es).concurrent_bulk_index(_bulk_actions(7), concurrency=2, max_chunk_docs=2)
+
+    assert peak == 2
+    assert stats == {"success": 7, "failed": 0, "rejected": 0, "requests": 4}
+
+
+class _FakeIndices:
+    """인덱스 이름과 'dishes' 별칭 대상만 들고 있는 es.indices 대역 (update_aliases 액션을 그대로 적용)"""
+
+    def __init__(self, indices, alias_targets=()):
+        self.indices = set(indices)
+        self.aliased = set(alias_targets)
+        self.actions = []
+
+    async def get(self, index, allow_no_indices=True):
+        return {name: {} for name in self.indices if name.startswith("dishes_v")}
+
+    async def exists_alias(self, name):
+        return bool(self.aliased)
+
+    async def get_alias(self, name):
+        return {index: {"aliases": {name: {}}} for index in self.aliased}
+
+    async def exists(self, index):
+        return index in self.indices or (index == "dishes" and bool(self.aliased))
+
+    async def update_aliases(self, actions):
+        self.actions.append(actions)
+        for action in actions:
+            (kind, spec), = action.items()
+            if kind == "add":
+                self.aliased.add(spec["index"])
+            elif kind == "remove":
+                self.aliased.discard(spec["index"])
+            elif kind == "remove_index":
+                self.indices.discard(spec["index"])
+
+    async def delete(self, index):
+        self.indices.discard(index)
+
+
+def _fake_es(indices, alias_targets=()):
+    es = MagicMock()
+    es.indices = _FakeIndices(indices, alias_targets)
+    return es
+
+
+async def test_swap_alias_moves_alias_in_one_atomic_call():
+    """이전 버전에서 별칭을 떼고 새 버전에 붙이는 액션이 update_aliases 한 번에 들어가는지 테스트"""
+    from search_client import swap_dishes_alias
+    es = _fake_es({"dishes_v1", "dishes_v2"}, alias_targets={"dishes_v1"})
+
+    previous = await swap_dishes_alias(es, "dishes_v2")
+
+    assert previous == ["dishes_v1"]
+    assert es.indices.actions == [[
+        {"remove": {"index": "dishes_v1", "alias": "dishes"}},
+        {"add": {"index": "dishes_v2", "alias": "dishes"}},
+    ]]
+    assert es.indices.aliased == {"dishes_v2"}
+
+
+async def test_swap_alias_replaces_legacy_concrete_index():
+    """'dishes' 가 별칭이 아닌 실제 인덱스면 같은 호출에서 remove_index 로 지우고 별칭을 붙이는지 테스트"""
+    from search_client import swap_dishes_alias
+    es = _fake_es({"dishes", "dishes_v1"})
+
+    previous = await swap_dishes_alias(es, "dishes_v1")
+
+    assert previous == []
+    assert es.indices.actions == [[
+        {"remove_index": {"index": "dishes"}},
+        {"add": {"index": "dishes_v1", "alias": "dishes"}},
+    ]]
+    assert es.indices.indices == {"dishes_v1"} and es.indices.aliased == {"dishes_v1"}
+
+
+async def test_prune_keeps_latest_versions_and_never_deletes_live_index():
+    """최신 keep 개 버전만 남기되, 롤백으로 별칭이 가리키는 오래된 버전은 지우지 않는지 테스트"""
+    from search_client import prune_dish_indices
+    es = _fake_es({f"dishes_v{v}" for v in (1, 2, 3, 4, 10)}, alias_targets={"dishes_v2"})
+
+    pruned = await prune_dish_indices(es, keep=2)
+
+    assert sorted(pruned) == ["dishes_v1", "dishes_v3"]
+    assert es.indices.indices == {"dishes_v2", "dishes_v4", "dishes_v10"}
+    assert await prune_dish_indices(es, keep=0) == []
+
+
+@pytest.mark.parametrize("options, live, expected", [
+    ({}, "dishes_v3", "dishes_v2"),
+    ({"version": "1"}, "dishes_v3", "dishes_v1"),
+    ({}, "dishes_v1", None),
+])
+async def test_rollback_moves_alias_to_previous_version(monkeypatch, options, live, expected):
+    """es rollback 이 직전 버전(또는 --version N)으로 별칭을 옮기고, 더 오래된 버전이 없으면 그대로 두는지 테스트"""
+    import es_db_manage
+    monkeypatch.setattr(es_db_manage, "bump_generation", AsyncMock(return_value=5))
+    manager = es_db_manage.ESManager(options)
+    manager.es_client = _fake_es({"dishes_v1", "dishes_v2", "dishes_v3"}, alias_targets={live})
+
+    await manager._rollback()
+
+    assert manager.es_client.indices.aliased == {expected or live}
+    assert len(manager.es_client.indices.actions) == (1 if expected else 0)
+
+
+def test_search_rows_are_read_in_keyset_pages():
+    """재색인 projection 을 OFFSET 없이 직전 페이지의 마지막 recipe_id 다음부터 읽고, 빈 페이지에서 멈추는지 테스트"""
+    from sqlalchemy.dialects import postgresql
+    from repositories.dishes import DishRepository
+
+    db = MagicMock()
+    db.execute.return_value.mappings.return_value.all.side_effect = [
+        [{"recipe_id": 3}, {"recipe_id": 5}], [{"recipe_id": 9}], [],
+    ]
+
+    pages = list(DishRepository(db).iter_search_rows(batch_size=2, after_recipe_id=1))
+
+    assert [[row["recipe_id"] for row in page] for page in pages] == [[3, 5], [9]]
+    statements = [call.args[0].compile(dialect=postgresql.dialect()) for call in db.execute.call_args_list]
+    assert [stmt.params["id_1"] for stmt in statements] == [1, 5, 9]
+    assert all("OFFSET" not in str(stmt) and "LIMIT" in str(stmt) for stmt in statements)
+    assert "array_agg(ingredients.name)" in str(statements[0]) and "instructions" not in str(statements[0])
+
+
+@pytest.mark.parametrize("populated, concurrently, expected", [
+    (True, True, "REFRESH MATERIALIZED VIEW CONCURRENTLY search_documents"),
+    (False, True, "REFRESH MATERIALIZED VIEW search_documents"),
+    (True, False, "REFRESH MATERIALIZED VIEW search_documents"),
+])
+def test_search_documents_refresh_uses_concurrently_once_populated(populated, concurrently, expected):
+    """채워진 뷰만 CONCURRENTLY 로 갱신하고, 처음(비어 있는 뷰)에는 일반 REFRESH 를 하는지 테스트"""
+    from repositories.search_documents import SearchDocumentRepository
+
+    db = MagicMock()
+    db.scalar.return_value = populated
+
+    SearchDocumentRepository(db).refresh(concurrently=concurrently)
+
+    assert str(db.execute.call_args.args[0]) == expected
+
+
+def test_search_documents_export_streams_copy_to_output():
+    """내보내기가 형식에 맞는 COPY ... TO STDOUT 을 copy_expert 로 out 에 쓰고 커서를 닫는지, 모르는 형식은 막는지 테스트"""
+    import io
+    from repositories.search_documents import SearchDocumentRepository
+
+    db = MagicMock()
+    cursor = db.connection.return_value.connection.cursor.return_value
+    out = io.StringIO()
+    repo = SearchDocumentRepository(db)
+
+    repo.copy_to(out, "ndjson")
+    with pytest.raises(ValueError):
+        repo.copy_to(out, "xml")
+
+    query, target = cursor.copy_expert.call_args.args
+    assert query.startswith("COPY (SELECT row_to_json(s) FROM search_documents") and "TO STDOUT" in query
+    assert target is out
+    cursor.close.assert_called_once()
+
+
+async def test_snapshot_registers_repository_and_snapshots_live_index_only():
+    """저장소가 없으면 fs 저장소를 등록하고, 별칭이 가리키는 인덱스만 전역 상태 없이 스냅샷하는지 테스트"""
+    from types import SimpleNamespace
+    from elasticsearch import NotFoundError
+    from search_client import SNAPSHOT_REPOSITORY, snapshot_dishes_index
+
+    es = _fake_es({"dishes_v1", "dishes_v2"}, alias_targets={"dishes_v2"})
+    es.options.return_value = es
+    es.snapshot.get_repository = AsyncMock(side_effect=NotFoundError("missing", SimpleNamespace(status=404), {}))
+    es.snapshot.create_repository = AsyncMock()
+    es.snapshot.create = AsyncMock(return_value={"snapshot": {"snapshot": "before-deploy", "state": "SUCCESS"}})
+
+    info = await snapshot_dishes_index(es, "before-deploy")
+
+    assert info["state"] == "SUCCESS"
+    assert es.snapshot.create_repository.await_args.kwargs["repository"]["type"] == "fs"
+    create = es.snapshot.create.await_args.kwargs
+    assert (create["repository"], create["snapshot"], create["indices"]) == (SNAPSHOT_REPOSITORY, "before-deploy", "dishes_v2")
+    assert create["include_global_state"] is False and create["wait_for_completion"] is True
+
+
+async def test_restore_renames_snapshot_index_to_next_version():
+    """복원이 스냅샷의 인덱스를 다음 버전 이름으로 바꿔 복원하고, 별칭/전역 상태는 가져오지 않는지 테스트"""
+    from search_client import restore_dishes_snapshot
+
+    es = _fake_es({"dishes_v2", "dishes_v3"}, alias_targets={"dishes_v3"})
+    es.options.return_value = es
+    es.snapshot.get = AsyncMock(return_value={"snapshots": [{"indices": ["dishes_v2"]}]})
+    es.snapshot.restore = AsyncMock()
+
+    target = await restore_dishes_snapshot(es, "before-deploy")
+
+    restore = es.snapshot.restore.await_args.kwargs
+    assert target == "dishes_v4"
+    assert (restore["indices"], restore["rename_pattern"], restore["rename_replacement"]) == ("dishes_v2", "^dishes_v2$", "dishes_v4")
+    assert restore["include_aliases"] is False and restore["include_global_state"] is False
+    assert es.indices.aliased == {"dishes_v3"}
+
+
+def test_search_ingredients_use_the_import_canonical_names():
+    """검색 재료도 임포트와 같은 대표 이름으로 바뀌어 '달걀'/'파 1대' 로 '계란'/'대파' 레시피를 찾는지 테스트"""
+    import search_cache
+    from schemas.dish import SearchRequest
+
+    normalized = search_cache.normalize_search_request(SearchRequest(ingredients=["달걀", "파 1대", "계란"]))
+    ratio = SearchRepository(MagicMock())._ingredient_filter(["달걀", "파"], mode="ANY")
+
+    assert normalized["ingredients"] == ["계란", "대파"]
+    assert [clause["term"]["ingredients_expanded"] for clause in ratio["bool"]["should"]] == ["계란", "대파"]
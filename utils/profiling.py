@@ -0,0 +1,98 @@
+# utils/profiling.py
+"""es_db_manage.py --profile 용 단계별 성능 기록기."""
+import json
+import os
+import time
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from typing import Dict, Iterator, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+
+@dataclass
+class PhaseStats:
+    name: str
+    calls: int = 0            # 같은 단계에 들어간 횟수 (배치마다 들어가는 단계는 누적)
+    seconds: float = 0.0
+    rows: int = 0
+    db_round_trips: int = 0   # 커서 실행 횟수 (executemany 배치 포함)
+    es_requests: int = 0
+    bytes_read: int = 0
+
+    def add_file(self, path: str) -> None:
+        try:
+            self.bytes_read += os.path.getsize(path)
+        except OSError:
+            pass
+
+
+class PipelineProfiler:
+    """
+    단계(phase)별 wall time, 행 수, DB 왕복 수, 읽은 바이트를 모아 JSON 리포트로 남깁니다.
+    enabled=False 이면 통계 객체만 돌려주고 이벤트 리스너나 리포트 파일은 만들지 않습니다.
+    """
+
+    def __init__(self, engine: Optional[Engine] = None, *, enabled: bool = False, label: str = ""):
+        self.enabled = enabled
+        self.label = label
+        self.engine = engine
+        self.phases: Dict[str, PhaseStats] = {}
+        self.started_at = datetime.now()
+        self._started = time.perf_counter()
+        self._round_trips = 0
+        if enabled and engine is not None:
+            event.listen(engine, "before_cursor_execute", self._count_round_trip)
+
+    def _count_round_trip(self, *args, **kwargs) -> None:
+        self._round_trips += 1
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[PhaseStats]:
+        stats = self.phases.setdefault(name, PhaseStats(name))
+        started, trips = time.perf_counter(), self._round_trips
+        try:
+            yield stats
+        finally:
+            stats.calls += 1
+            stats.seconds += time.perf_counter() - started
+            stats.db_round_trips += self._round_trips - trips
+
+    def add(self, name: str, *, rows: int = 0, es_requests: int = 0, files=()) -> None:
+        """단계 안쪽(호출된 메서드)에서 행 수/읽은 파일 등을 더합니다. 시간과 왕복 수는 phase()가 잽니다."""
+        stats = self.phases.setdefault(name, PhaseStats(name))
+        stats.rows += rows
+        stats.es_requests += es_requests
+        for path in files:
+            stats.add_file(path)
+
+    def report(self) -> dict:
+        phases = []
+        for stats in self.phases.values():
+            entry = asdict(stats)
+            entry["seconds"] = round(stats.seconds, 4)
+            entry["rows_per_sec"] = round(stats.rows / stats.seconds, 1) if stats.seconds else None
+            phases.append(entry)
+        return {
+            "command": self.label,
+            "started_at": self.started_at.isoformat(timespec="seconds"),
+            "total_seconds": round(time.perf_counter() - self._started, 4),
+            "db_round_trips": self._round_trips,
+            "phases": phases,
+        }
+
+    def write(self, path: Optional[str] = None, directory: str = ".") -> Optional[str]:
+        """리포트를 JSON으로 저장하고 경로를 반환합니다. 비활성 상태면 아무것도 하지 않습니다."""
+        if not self.enabled:
+            return None
+        if self.engine is not None:
+            event.remove(self.engine, "before_cursor_execute", self._count_round_trip)
+        if not path:
+            slug = self.label.replace(" ", "_") or "run"
+            path = os.path.join(directory, f"profile_{slug}_{self.started_at:%Y%m%d_%H%M%S}.json")
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.report(), f, ensure_ascii=False, indent=2)
+        return path